@@ -0,0 +1,153 @@
+import hashlib
+import logging
+from bc211.models import ImportedRecordHash
+from human_services.locations.models import Location
+from human_services.organizations.models import Organization
+from human_services.services.models import Service
+from qa_tool.models import RelevancyScore
+from search.models import TaskServiceSimilarityScore
+
+LOGGER = logging.getLogger(__name__)
+
+ORGANIZATION = 'organization'
+SERVICE = 'service'
+LOCATION = 'location'
+
+RECORD_TYPES = [ORGANIZATION, SERVICE, LOCATION]
+
+
+def compute_record_hash(*values):
+    hasher = hashlib.sha1()
+    for value in values:
+        # Separated and marked, so that e.g. None and '' or ('a', 'b') and ('ab', '') differ
+        hasher.update(b'\0' if value is None else b'\1' + str(value).encode('utf-8'))
+        hasher.update(b'\2')
+    return hasher.hexdigest()
+
+
+def compute_model_record_hash(record):
+    # Of the fields of a translatable record and of its translation in the current language
+    translated_record = record.get_translation(record.get_current_language())
+    values = [getattr(record, field.attname) for field in record._meta.concrete_fields]
+    values += [getattr(translated_record, field.attname) for field in get_translated_fields(translated_record)]
+    return compute_record_hash(*values)
+
+
+def get_translated_fields(translated_record):
+    return [field for field in translated_record._meta.concrete_fields
+            if field.editable and not field.primary_key and field.name not in ('master', 'language_code')]
+
+
+class RecordChanges:
+    # Compares the organizations, services and locations of an import with their hashes as
+    # of the last differential import, and keeps track of the records created, updated and
+    # deleted. Records that are in the database but not in the import, or are inactive in
+    # it, are deleted at the end, unless the import had errors that may have left records
+    # out. The changed service ids are written to a manifest, one per line, as read by
+    # compute_text_similarity_scores --changed_services
+    def __init__(self):
+        self.stored_hashes = {record_type: dict(ImportedRecordHash.objects.
+                                                filter(record_type=record_type).
+                                                values_list('record_id', 'hash'))
+                              for record_type in RECORD_TYPES}
+        self.incoming_hashes = {record_type: {} for record_type in RECORD_TYPES}
+        self.created = {record_type: set() for record_type in RECORD_TYPES}
+        self.updated = {record_type: set() for record_type in RECORD_TYPES}
+        self.deleted = {record_type: set() for record_type in RECORD_TYPES}
+        self.error_count = 0
+
+    def is_in_import(self, record_type, record_id):
+        return record_id in self.incoming_hashes[record_type]
+
+    def is_unchanged(self, record_type, record_id, record_hash):
+        return self.stored_hashes[record_type].get(record_id) == record_hash
+
+    def add_created(self, record_type, record_id, record_hash):
+        self.incoming_hashes[record_type][record_id] = record_hash
+        self.created[record_type].add(record_id)
+
+    def add_updated(self, record_type, record_id, record_hash):
+        self.incoming_hashes[record_type][record_id] = record_hash
+        self.updated[record_type].add(record_id)
+
+    def add_kept(self, record_type, record_id):
+        # For records left as they are, unchanged or not imported because of errors
+        self.incoming_hashes[record_type][record_id] = self.stored_hashes[record_type].get(record_id)
+
+    def count_error(self):
+        self.error_count += 1
+
+    def finish(self):
+        self.delete_removed_records()
+        self.save_hashes()
+
+    def delete_removed_records(self):
+        if self.error_count:
+            LOGGER.warning('%s errors in import, records missing from it are not deleted', self.error_count)
+            return
+        removed_service_ids = self.find_removed_ids(Service, SERVICE)
+        removed_service_ids -= self.keep_records_with_relevancy_scores(
+            SERVICE, removed_service_ids, 'service_at_location__service_id')
+        TaskServiceSimilarityScore.objects.filter(service_id__in=removed_service_ids).delete()
+        Service.objects.filter(id__in=removed_service_ids).delete()
+        self.deleted[SERVICE] = removed_service_ids
+
+        removed_location_ids = self.find_removed_ids(Location, LOCATION)
+        removed_location_ids -= self.keep_records_with_relevancy_scores(
+            LOCATION, removed_location_ids, 'service_at_location__location_id')
+        Location.objects.filter(id__in=removed_location_ids).delete()
+        self.deleted[LOCATION] = removed_location_ids
+
+        removed_organization_ids = self.find_removed_ids(Organization, ORGANIZATION)
+        removed_organization_ids -= self.keep_organizations_in_use(removed_organization_ids)
+        Organization.objects.filter(id__in=removed_organization_ids).delete()
+        self.deleted[ORGANIZATION] = removed_organization_ids
+
+    def find_removed_ids(self, model, record_type):
+        return set(model.objects.values_list('id', flat=True)) - set(self.incoming_hashes[record_type])
+
+    def keep_records_with_relevancy_scores(self, record_type, record_ids, related_id_field):
+        # The scores of the QA tool are protected, so are not deleted with the records
+        kept_ids = set(RelevancyScore.objects.
+                       filter(**{related_id_field + '__in': record_ids}).
+                       values_list(related_id_field, flat=True))
+        for record_id in kept_ids:
+            LOGGER.warning('%s "%s" is not in the import but has relevancy scores, not deleted', record_type, record_id)
+        return kept_ids
+
+    def keep_organizations_in_use(self, organization_ids):
+        kept_ids = (set(Service.objects.
+                        filter(organization_id__in=organization_ids).
+                        values_list('organization_id', flat=True)) |
+                    set(Location.objects.
+                        filter(organization_id__in=organization_ids).
+                        values_list('organization_id', flat=True)))
+        for organization_id in kept_ids:
+            LOGGER.warning('organization "%s" is not in the import but has services or locations, not deleted',
+                           organization_id)
+        return kept_ids
+
+    def save_hashes(self):
+        for record_type in RECORD_TYPES:
+            changed_ids = self.created[record_type] | self.updated[record_type] | self.deleted[record_type]
+            ImportedRecordHash.objects.filter(record_type=record_type, record_id__in=changed_ids).delete()
+            ImportedRecordHash.objects.bulk_create([
+                ImportedRecordHash(record_type=record_type, record_id=record_id,
+                                   hash=self.incoming_hashes[record_type][record_id])
+                for record_id in self.created[record_type] | self.updated[record_type]
+            ], batch_size=1000)
+
+    def changed_service_ids(self):
+        return sorted(self.created[SERVICE] | self.updated[SERVICE] | self.deleted[SERVICE])
+
+    def write_manifest(self, path):
+        with open(path, 'w') as file:
+            for service_id in self.changed_service_ids():
+                file.write(service_id + '\n')
+
+    def summary(self):
+        return ' '.join('{}s: {} created, {} updated, {} deleted.'.format(record_type,
+                                                                          len(self.created[record_type]),
+                                                                          len(self.updated[record_type]),
+                                                                          len(self.deleted[record_type]))
+                        for record_type in RECORD_TYPES)
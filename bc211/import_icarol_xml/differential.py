@@ -0,0 +1,116 @@
+import logging
+from django.utils import translation
+from bc211.differential_import import ORGANIZATION, SERVICE, LOCATION, compute_record_hash
+from bc211.import_icarol_xml.location import (get_existing_location_or_none, save_location,
+                                              set_latlong_from_address_if_missing)
+from bc211.import_icarol_xml.organization import build_organization_active_record
+from bc211.import_icarol_xml.taxonomy import save_service_taxonomy_terms
+from bc211.is_inactive import is_inactive
+from bc211.service import build_service_active_record, save_service_at_location
+from human_services.locations.models import LocationAddress, ServiceAtLocation
+from human_services.phone_at_location.models import PhoneAtLocation
+
+LOGGER = logging.getLogger(__name__)
+
+
+def update_entire_organization_if_changed(organization, city_latlong_map, counters, changes):
+    # As update_entire_organization(), but updates existing records that changed since the
+    # last differential import, and leaves unchanged ones as they are
+    update_organization_if_changed(organization, counters, changes)
+    for location in organization.locations:
+        if is_inactive(location.description):
+            continue
+        update_location_if_changed(location, city_latlong_map, counters, changes)
+        for service in location.services:
+            if not is_inactive(service.description):
+                update_service_if_changed(service, counters, changes)
+
+
+def update_organization_if_changed(organization, counters, changes):
+    translation.activate('en')
+    record_hash = compute_record_hash(organization.id, organization.name, organization.description,
+                                      organization.website, organization.email)
+    if is_repeated_or_unchanged(ORGANIZATION, organization.id, record_hash, changes):
+        return
+    active_record = build_organization_active_record(organization)
+    created = active_record._state.adding
+    active_record.save()
+    if created:
+        counters.count_organization_created()
+        changes.add_created(ORGANIZATION, organization.id, record_hash)
+    else:
+        changes.add_updated(ORGANIZATION, organization.id, record_hash)
+
+
+def update_location_if_changed(location, city_latlong_map, counters, changes):
+    location = set_latlong_from_address_if_missing(location, city_latlong_map)
+    record_hash = compute_record_hash(location.id, location.name, location.organization_id, location.description,
+                                      *get_spatial_location_values(location.spatial_location),
+                                      *get_address_values(location.physical_address),
+                                      *get_address_values(location.postal_address),
+                                      *[(phone_number.phone_number_type_id, phone_number.phone_number)
+                                        for phone_number in location.phone_numbers])
+    if is_repeated_or_unchanged(LOCATION, location.id, record_hash, changes):
+        return
+    existing = get_existing_location_or_none(location)
+    if existing:
+        # Saved again by save_location()
+        LocationAddress.objects.filter(location=existing).delete()
+        PhoneAtLocation.objects.filter(location=existing).delete()
+        changes.add_updated(LOCATION, location.id, record_hash)
+    else:
+        counters.count_locations_created()
+        changes.add_created(LOCATION, location.id, record_hash)
+    save_location(location, existing, city_latlong_map, counters)
+
+
+def get_spatial_location_values(spatial_location):
+    if spatial_location is None:
+        return [None, None]
+    return [spatial_location.latitude, spatial_location.longitude]
+
+
+def get_address_values(address):
+    if address is None:
+        return [None]
+    return [address.address_lines, address.city, address.state_province, address.postal_code,
+            address.country, address.address_type_id]
+
+
+def update_service_if_changed(service, counters, changes):
+    record_hash = compute_record_hash(service.id, service.name, service.organization_id, service.site_id,
+                                      service.description,
+                                      *sorted((term.taxonomy_id, term.name) for term in service.taxonomy_terms))
+    if is_repeated_or_unchanged(SERVICE, service.id, record_hash, changes):
+        return
+    active_record = build_service_active_record(service)
+    created = active_record._state.adding
+    active_record.save()
+    if created:
+        counters.count_service()
+        changes.add_created(SERVICE, service.id, record_hash)
+        save_service_at_location(service)
+    else:
+        changes.add_updated(SERVICE, service.id, record_hash)
+        update_service_at_location(service)
+        active_record.taxonomy_terms.clear()
+    save_service_taxonomy_terms(service.taxonomy_terms, active_record, counters)
+
+
+def update_service_at_location(service):
+    ServiceAtLocation.objects.get_or_create(service_id=service.id, location_id=service.site_id)
+    # The scores of the QA tool are protected, deleted only with their service or location
+    (ServiceAtLocation.objects.
+     filter(service_id=service.id, relevancyscore=None).
+     exclude(location_id=service.site_id).
+     delete())
+
+
+def is_repeated_or_unchanged(record_type, record_id, record_hash, changes):
+    if changes.is_in_import(record_type, record_id):
+        LOGGER.warning('duplicate %s "%s"', record_type, record_id)
+        return True
+    if changes.is_unchanged(record_type, record_id, record_hash):
+        changes.add_kept(record_type, record_id)
+        return True
+    return False
@@ -1,13 +1,18 @@
 import logging
 import csv
+import importlib
 from bc211.is_inactive import is_inactive
 from bc211.import_icarol_xml.parser import parse_agency
 from bc211.import_icarol_xml.organization import update_entire_organization
+from bc211.import_icarol_xml.differential import update_entire_organization_if_changed
 from django.contrib.gis.geos import Point
+from django.db import transaction
 from bc211.import_icarol_xml.exceptions import XmlParseException
 
 LOGGER = logging.getLogger(__name__)
 
+AGENCY_TAG = 'Agency'
+
 
 def parse_csv(csv_path):
     with open(csv_path, mode='r') as file:
@@ -16,28 +21,60 @@ def parse_csv(csv_path):
         return city_to_latlong
 
 
-def update_all_organizations(nodes, city_latlong_map, counts):
+def iterparse_agencies(file, use_lxml=False):
+    # Yields ('end', element) for each Agency in the file, as etree.iterparse() would, and
+    # clears each one and removes it from its parent once the caller asks for the next, so
+    # that only one agency at a time is kept in memory, however large the file
+    etree = importlib.import_module('lxml.etree' if use_lxml else 'xml.etree.ElementTree')
+    parents = []
+    for event, element in etree.iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == AGENCY_TAG:
+            yield event, element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+
+def update_all_organizations(nodes, city_latlong_map, counts, changes=None):
     last_organization = None
     for _, elem in nodes:
-        if elem.tag == 'Agency':
+        if elem.tag == AGENCY_TAG:
             try:
                 agency = parse_agency(elem)
                 if is_inactive(agency.description):
                     continue
                 last_organization = agency.id
-                update_entire_organization(agency, city_latlong_map, counts)
+                if changes is None:
+                    update_entire_organization(agency, city_latlong_map, counts)
+                else:
+                    update_entire_organization_if_changed(agency, city_latlong_map, counts, changes)
             except XmlParseException as error:
-                handle_xml_parser_exception(error, last_organization)
+                handle_xml_parser_exception(error, last_organization, changes)
             except AttributeError as error:
-                handle_attribute_error(error, last_organization)
+                handle_attribute_error(error, last_organization, changes)
+
+
+def update_changed_organizations(nodes, city_latlong_map, counts, changes):
+    # Agencies missing from the file are deleted at the end, all or nothing
+    with transaction.atomic():
+        update_all_organizations(nodes, city_latlong_map, counts, changes)
+        changes.finish()
 
 
-def handle_xml_parser_exception(error, last_agency_id):
+def handle_xml_parser_exception(error, last_agency_id, changes=None):
+    if changes:
+        changes.count_error()
     LOGGER.error('Parser exception caught when importing the organization immediately after the one with id "%s": "%s"',
                  last_agency_id, error.__str__())
 
 
-def handle_attribute_error(error, last_agency_id):
+def handle_attribute_error(error, last_agency_id, changes=None):
+    if changes:
+        changes.count_error()
     LOGGER.error('Missing field error caught when importing the organization immediately after the one with id "%s": "%s"',
                  last_agency_id, error.__str__())
 
@@ -2,7 +2,9 @@ from django.db import connection
 from django.test import TestCase
 from django.utils import translation
 from bc211.import_icarol_xml import dtos
-from bc211.import_icarol_xml.importer import update_entire_organization, update_all_organizations
+from bc211.differential_import import ORGANIZATION, SERVICE, RecordChanges
+from bc211.import_icarol_xml.importer import (iterparse_agencies, update_entire_organization,
+                                              update_all_organizations, update_changed_organizations)
 from bc211.import_icarol_xml.location import update_locations
 from bc211.import_icarol_xml.import_counters import ImportCounters
 from human_services.addresses.models import Address, AddressType
@@ -37,6 +39,34 @@ class UpdateOrganizationTests(TestCase):
 
         self.assertEqual(counters.organizations_created, 1)
 
+    def test_can_create_organizations_from_streamed_agencies(self):
+        BASELINE = 'bc211/import_icarol_xml/tests/data/BC211_data_excerpt.xml'
+        update_all_organizations(iterparse_agencies(BASELINE), {}, ImportCounters())
+
+        counters = ImportCounters()
+        FILE_WITH_MISSING_ORG = 'bc211/import_icarol_xml/tests/data/BC211_data_excerpt_with_one_more_organization.xml'
+        update_all_organizations(iterparse_agencies(FILE_WITH_MISSING_ORG), {}, counters)
+
+        self.assertEqual(counters.organizations_created, 1)
+
+    def test_differential_import_leaves_unchanged_organizations_as_they_are(self):
+        BASELINE = 'bc211/import_icarol_xml/tests/data/BC211_data_excerpt.xml'
+        update_changed_organizations(iterparse_agencies(BASELINE), {}, ImportCounters(), RecordChanges())
+
+        changes = RecordChanges()
+        FILE_WITH_MISSING_ORG = 'bc211/import_icarol_xml/tests/data/BC211_data_excerpt_with_one_more_organization.xml'
+        update_changed_organizations(iterparse_agencies(FILE_WITH_MISSING_ORG), {}, ImportCounters(), changes)
+
+        self.assertEqual(len(changes.created[ORGANIZATION]), 1)
+        self.assertEqual(len(changes.updated[ORGANIZATION]), 0)
+        self.assertEqual(changes.changed_service_ids(), sorted(changes.created[SERVICE]))
+
+    def test_releases_each_agency_after_it_is_processed(self):
+        BASELINE = 'bc211/import_icarol_xml/tests/data/BC211_data_excerpt.xml'
+        agencies = [agency for _, agency in iterparse_agencies(BASELINE)]
+        self.assertGreater(len(agencies), 0)
+        self.assertTrue(all(len(agency) == 0 for agency in agencies))
+
 
 class LocationsUnderOrganizationTests(TestCase):
 
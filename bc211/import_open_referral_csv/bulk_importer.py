@@ -0,0 +1,476 @@
+import concurrent.futures
+import contextlib
+import csv
+import itertools
+import logging
+import os
+import time
+import django
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import translation
+from bc211.import_open_referral_csv import (organization, service, location, service_at_location,
+                                            address, phone, taxonomy, service_taxonomy, parser)
+from bc211.import_open_referral_csv.exceptions import CsvParseException, InvalidFileCsvImportException
+from bc211.import_open_referral_csv.headers_match_expected_format import headers_match_expected_format
+from human_services.addresses.models import Address, AddressType
+from human_services.locations.models import Location, LocationAddress, ServiceAtLocation
+from human_services.organizations.models import Organization
+from human_services.phone_at_location.models import PhoneNumberType, PhoneAtLocation
+from human_services.services.models import Service
+from taxonomies.models import TaxonomyTerm
+
+LOGGER = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+OPEN_REFERRAL_FILENAMES = ['organizations.csv', 'services.csv', 'location.csv', 'services_at_location.csv',
+                           'addresses.csv', 'phones.csv', 'taxonomy.csv', 'services_taxonomy.csv']
+
+ADDRESS_UNIQUE_FIELDS = ['attention', 'address', 'city', 'state_province', 'postal_code', 'country']
+
+
+def bulk_import_open_referral_files(root_folder, collector, counters, filenames=None, workers=1, timings=None):
+    # Reads and validates the files in up to the given number of processes, then checks the
+    # rows against each other and the database and writes them in this process, all or
+    # nothing, so that a failed import leaves the previous data in place. Imports only the
+    # given files when filenames is set, with the collector then usually loaded from the
+    # inactive records saved by an earlier full import
+    timings = timings or StageTimings()
+    filenames = select_filenames(filenames)
+    with timings.measure('read and validate files'):
+        parsed_files = parse_files(root_folder, filenames, workers)
+    with transaction.atomic(), translation.override('en'):
+        BulkImporter(collector, counters, timings).import_parsed_files(zip(filenames, parsed_files))
+    return timings
+
+
+def select_filenames(filenames):
+    # In the order they are imported in, which is the order of the foreign keys between them
+    return [filename for filename in OPEN_REFERRAL_FILENAMES if filenames is None or filename in filenames]
+
+
+class StageTimings:
+    def __init__(self):
+        self.seconds = {}
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + time.perf_counter() - start_time
+
+
+def parse_files(root_folder, filenames, workers):
+    if workers == 1:
+        return [parse_file(root_folder, filename) for filename in filenames]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        return list(executor.map(parse_file, itertools.repeat(root_folder), filenames))
+
+
+def parse_file(root_folder, filename):
+    # Makes no queries, so that it can run in a worker process
+    expected_headers, parse_row = FILE_PARSERS[filename]
+    with translation.override('en'):
+        return [parse_row(row) for row in read_rows(root_folder, filename, expected_headers)]
+
+
+def read_rows(root_folder, filename, expected_headers):
+    path = os.path.join(root_folder, filename)
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        headers = reader.__next__()
+        if not headers_match_expected_format(headers, expected_headers):
+            raise InvalidFileCsvImportException(
+                'The headers in "{0}": does not match open referral standards.'.format(path)
+            )
+        for row in reader:
+            if row:
+                yield row
+
+
+class RowError:
+    # The error of a record that failed to build or validate in a worker process, reported
+    # only when the importer gets to the row, as the row may belong to an inactive record
+    def __init__(self, error):
+        self.message = str(error)
+        self.is_parse_error = isinstance(error, CsvParseException)
+
+
+def parse_organization_row(row):
+    organization_id = parser.parse_required_field_with_double_escaped_html('organization_id', row[0])
+    description = parser.parse_optional_field_with_double_escaped_html(row[3])
+    record = build_valid_translatable_record(
+        lambda: organization.build_active_record(row, organization_id, description))
+    return organization_id, description, record
+
+
+def parse_service_row(row):
+    service_id = parser.parse_required_field_with_double_escaped_html('service_id', row[0])
+    organization_id = parser.parse_required_field_with_double_escaped_html('organization_id', row[1])
+    description = parser.parse_optional_field_with_double_escaped_html(row[5])
+    record = build_valid_translatable_record(
+        lambda: service.build_service_active_record(row, service_id, organization_id, description),
+        foreign_keys=['organization'])
+    return service_id, organization_id, description, record
+
+
+def parse_location_row(row):
+    location_id = parser.parse_required_field_with_double_escaped_html('location_id', row[0])
+    organization_id = parser.parse_required_field_with_double_escaped_html('organization_id', row[1])
+    description = parser.parse_optional_field_with_double_escaped_html(row[4])
+    record = build_valid_translatable_record(
+        lambda: location.build_location_active_record(row, location_id, organization_id, description),
+        foreign_keys=['organization'])
+    return location_id, organization_id, description, record
+
+
+def parse_address_row(row):
+    # Built even for addresses already imported, which only the importer knows about
+    try:
+        new_address = address.build_address_active_record(row)
+        validate_in_memory(new_address)
+    except (ValidationError, CsvParseException) as error:
+        new_address = RowError(error)
+    return row, new_address
+
+
+def keep_row(row):
+    # For the files with little to parse, which the importer parses as it goes
+    return row
+
+
+def build_valid_translatable_record(build_record, foreign_keys=()):
+    try:
+        record = build_record()
+        validate_in_memory(record, foreign_keys)
+        translated_record = record.get_translation(record.get_current_language())
+        translated_record.clean_fields(exclude=['master'])
+        return record
+    except (ValidationError, CsvParseException) as error:
+        return RowError(error)
+
+
+FILE_PARSERS = {
+    'organizations.csv': (organization.expected_headers, parse_organization_row),
+    'services.csv': (service.expected_headers, parse_service_row),
+    'location.csv': (location.expected_headers, parse_location_row),
+    'services_at_location.csv': (service_at_location.expected_headers, keep_row),
+    'addresses.csv': (address.expected_headers, parse_address_row),
+    'phones.csv': (phone.expected_headers, keep_row),
+    'taxonomy.csv': (taxonomy.expected_headers, keep_row),
+    'services_taxonomy.csv': (service_taxonomy.expected_headers, keep_row),
+}
+
+
+class RecordBatches:
+    # Records waiting to be inserted, updated or deleted, one query per model and kind of
+    # change for each batch. Foreign keys are only checked at the end of the transaction,
+    # so models can be written in any order. Deletes come first, so that records can
+    # replace others with the same unique values
+    def __init__(self, timings):
+        self.records = {}
+        self.updated_records = {}
+        self.updated_fields = {}
+        self.deleted_ids = {}
+        self.timings = timings
+
+    def add(self, record):
+        self.add_to_batch(self.records, type(record), record)
+
+    def update(self, record, fields):
+        self.updated_fields[type(record)] = fields
+        self.add_to_batch(self.updated_records, type(record), record)
+
+    def delete(self, model, record_id):
+        self.add_to_batch(self.deleted_ids, model, record_id)
+
+    def add_to_batch(self, batches, model, item):
+        batch = batches.setdefault(model, [])
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            self.write()
+
+    def write(self):
+        with self.timings.measure('write records'):
+            for model, record_ids in self.deleted_ids.items():
+                model.objects.filter(pk__in=record_ids).delete()
+            for model, records in self.updated_records.items():
+                model.objects.bulk_update(records, self.updated_fields[model], batch_size=BATCH_SIZE)
+            for model, records in self.records.items():
+                model.objects.bulk_create(records, batch_size=BATCH_SIZE)
+        self.records = {}
+        self.updated_records = {}
+        self.deleted_ids = {}
+
+
+class BulkImporter:
+    # Imports the rows of each file, leaving out the rows of inactive records and logging a
+    # warning for each row that is invalid or refers to a missing record. Rows are validated
+    # in memory, against the ids of rows already in the database or imported earlier, rather
+    # than with the queries of full_clean() and get() per row, and are inserted in batches.
+    # Subclasses decide what happens to rows of records already in the database by
+    # overriding add_translatable_record(), add_link_record() and import_known_address()
+    def __init__(self, collector, counters, timings=None):
+        self.collector = collector
+        self.counters = counters
+        self.timings = timings or StageTimings()
+        self.batches = RecordBatches(self.timings)
+        self.organization_ids = get_ids(Organization)
+        self.service_ids = get_ids(Service)
+        self.location_ids = get_ids(Location)
+        self.address_ids = get_ids(Address)
+        self.address_keys = set(Address.objects.values_list(*ADDRESS_UNIQUE_FIELDS))
+        self.address_type_ids = get_ids(AddressType)
+        self.location_address_keys = set(LocationAddress.objects.values_list('location_id', 'address_type_id'))
+        self.phone_number_type_ids = get_ids(PhoneNumberType)
+        self.taxonomy_term_ids = get_ids(TaxonomyTerm)
+        self.taxonomy_terms = set(TaxonomyTerm.objects.values_list('id', 'name', 'taxonomy_id'))
+        self.taxonomy_term_keys = set(TaxonomyTerm.objects.values_list('taxonomy_id', 'name'))
+        self.service_taxonomy_model = Service.taxonomy_terms.through
+        # Rows of these models have no id in the files, and are told apart by these fields
+        self.link_key_fields = {
+            ServiceAtLocation: ['service_id', 'location_id'],
+            LocationAddress: ['location_id', 'address_type_id', 'address_id'],
+            PhoneAtLocation: ['location_id', 'phone_number', 'phone_number_type_id'],
+            self.service_taxonomy_model: ['service_id', 'taxonomyterm_id'],
+        }
+        self.link_keys = {model: set(model.objects.values_list(*key_fields))
+                          for model, key_fields in self.link_key_fields.items()}
+
+    def import_parsed_files(self, parsed_files):
+        # Takes (filename, parsed rows) in the order of select_filenames(), so that rows are
+        # checked against the ids of the rows they refer to, written with earlier files
+        import_row_functions = {
+            'organizations.csv': self.import_organization,
+            'services.csv': self.import_service,
+            'location.csv': self.import_location,
+            'services_at_location.csv': self.import_service_at_location,
+            'addresses.csv': self.import_address,
+            'phones.csv': self.import_phone,
+            'taxonomy.csv': self.import_taxonomy_term,
+            'services_taxonomy.csv': self.import_service_taxonomy,
+        }
+        for filename, parsed_rows in parsed_files:
+            import_row = import_row_functions[filename]
+            with self.timings.measure('check {}'.format(filename)):
+                for parsed_row in parsed_rows:
+                    import_row(parsed_row)
+            self.batches.write()
+
+    def import_organization(self, parsed_row):
+        organization_id, description, record = parsed_row
+        if self.collector.organization_has_inactive_data(organization_id, description):
+            return
+        if isinstance(record, RowError):
+            self.report_invalid_record(Organization, organization_id, record)
+        elif self.add_translatable_record(record, self.organization_ids):
+            self.counters.count_organization_created()
+
+    def import_service(self, parsed_row):
+        service_id, organization_id, description, record = parsed_row
+        if self.collector.service_has_inactive_data(organization_id, service_id, description):
+            return
+        if not self.has_known_organization(Service, organization_id):
+            return
+        if isinstance(record, RowError):
+            self.report_invalid_record(Service, service_id, record)
+        elif self.add_translatable_record(record, self.service_ids):
+            self.counters.count_service()
+
+    def import_location(self, parsed_row):
+        location_id, organization_id, description, record = parsed_row
+        if self.collector.location_has_inactive_data(organization_id, location_id, description):
+            return
+        if not self.has_known_organization(Location, organization_id):
+            return
+        if isinstance(record, RowError):
+            self.report_invalid_record(Location, location_id, record)
+        elif self.add_translatable_record(record, self.location_ids):
+            self.counters.count_locations_created()
+
+    def has_known_organization(self, model, organization_id):
+        try:
+            check_related_id(model(organization_id=organization_id), 'organization', self.organization_ids)
+            return True
+        except ValidationError as error:
+            LOGGER.warning('%s', error.__str__())
+            return False
+
+    def report_invalid_record(self, model, record_id, error):
+        message = '{} with id "{}" not imported: {}'.format(model.__name__, record_id, error.message)
+        if error.is_parse_error:
+            raise CsvParseException(message)
+        LOGGER.warning('%s', message)
+
+    def add_translatable_record(self, record, known_ids):
+        # Returns False for records that are already in the database or earlier in the file,
+        # saving those one row at a time failed on the unique translation anyway
+        if record.id in known_ids:
+            LOGGER.warning('%s with id "%s" already exists, not imported again', type(record).__name__, record.id)
+            return False
+        translated_record = record.get_translation(record.get_current_language())
+        translated_record.master = record
+        self.batches.add(record)
+        self.batches.add(translated_record)
+        known_ids.add(record.id)
+        return True
+
+    def get_link_key(self, record):
+        return tuple(getattr(record, field_name) for field_name in self.link_key_fields[type(record)])
+
+    def add_link_record(self, record):
+        # Returns False for records left out of the import, those already in the database or
+        # earlier in the files, so that importing only some files again adds no duplicates
+        model = type(record)
+        key = self.get_link_key(record)
+        if key in self.link_keys[model]:
+            return False
+        self.link_keys[model].add(key)
+        self.batches.add(record)
+        return True
+
+    def import_service_at_location(self, row):
+        if service_at_location.service_at_location_has_inactive_data(row, self.collector):
+            return
+        try:
+            record = service_at_location.build_service_at_location_active_record(row)
+            check_related_id(record, 'service', self.service_ids)
+            check_related_id(record, 'location', self.location_ids)
+            validate_in_memory(record, ['service', 'location'])
+            if self.add_link_record(record):
+                self.counters.count_service_at_location()
+        except ValidationError as error:
+            LOGGER.warning('%s', error.__str__())
+
+    def import_address(self, parsed_row):
+        row, new_address = parsed_row
+        address_id = (self.import_known_address(row[0], new_address) if row[0] in self.address_ids
+                      else self.import_new_address(new_address))
+        location_id = parser.parse_required_field_with_double_escaped_html('location_id', row[2])
+        if self.collector.has_inactive_location_id(location_id):
+            return
+        try:
+            address_type = parser.parse_required_field_with_double_escaped_html('address_type', row[1])
+            record = LocationAddress(address_id=address_id, location_id=location_id, address_type_id=address_type)
+            check_related_id(record, 'address', self.address_ids)
+            check_related_id(record, 'location', self.location_ids)
+            check_related_id(record, 'address_type', self.address_type_ids)
+            validate_in_memory(record, ['address', 'location', 'address_type'])
+            if self.get_link_key(record) not in self.link_keys[LocationAddress]:
+                check_unique(record, ['location', 'address_type'], self.location_address_keys)
+            if self.add_link_record(record):
+                self.counters.count_location_address()
+        except ValidationError as error:
+            LOGGER.warning(
+                'ValidationError in row with location id "%s" and address "%s": %s',
+                location_id, address_id, error)
+
+    def import_known_address(self, address_id, record):
+        # Called for addresses already in the database or earlier in the file, with the
+        # address built from the row or its RowError, and returns the id to link the location
+        # to. Here they are left as they are, DifferentialImporter updates changed addresses
+        return address_id
+
+    def import_new_address(self, record):
+        if isinstance(record, RowError):
+            LOGGER.warning('%s', record.message)
+            return None
+        try:
+            check_unique(record, ADDRESS_UNIQUE_FIELDS, self.address_keys)
+            self.batches.add(record)
+            self.address_ids.add(record.id)
+            self.counters.count_address()
+            return record.id
+        except ValidationError as error:
+            LOGGER.warning('%s', error.__str__())
+            return None
+
+    def import_phone(self, row):
+        try:
+            location_id = parser.parse_required_field_with_double_escaped_html('location_id', row[1])
+            phone_type = parser.parse_required_field_with_double_escaped_html('phone_type', row[8])
+            if phone_type not in self.phone_number_type_ids:
+                self.batches.add(PhoneNumberType(id=phone_type))
+                self.phone_number_type_ids.add(phone_type)
+                self.counters.count_phone_number_types()
+            if self.collector.has_inactive_location_id(location_id):
+                return
+            record = PhoneAtLocation(location_id=location_id,
+                                     phone_number=parser.parse_phone_number(row[6]),
+                                     phone_number_type_id=phone_type)
+            check_related_id(record, 'location', self.location_ids)
+            if self.add_link_record(record):
+                self.counters.count_phone_at_location()
+        except ValidationError as error:
+            LOGGER.warning('%s', error.__str__())
+        except CsvParseException:
+            # Phone types are missing in many csv rows
+            pass
+
+    def import_taxonomy_term(self, row):
+        if (row[0], row[1], row[4]) in self.taxonomy_terms:
+            return
+        record = taxonomy.build_taxonomy_active_record(row)
+        if record.id in self.taxonomy_term_ids:
+            # Renamed, updated one row at a time, as rarely needed
+            self.batches.write()
+            record.save()
+        elif (record.taxonomy_id, record.name) in self.taxonomy_term_keys:
+            LOGGER.warning('Taxonomy term "%s" in "%s" already exists with another id than %s',
+                           record.name, record.taxonomy_id, record.id)
+            return
+        else:
+            self.batches.add(record)
+            self.taxonomy_term_ids.add(record.id)
+        self.taxonomy_terms.add((record.id, record.name, record.taxonomy_id))
+        self.taxonomy_term_keys.add((record.taxonomy_id, record.name))
+        self.counters.count_taxonomy_term()
+
+    def import_service_taxonomy(self, row):
+        try:
+            service_id = parser.parse_required_field_with_double_escaped_html('service_id', row[1])
+            if self.collector.has_inactive_service_id(service_id):
+                return
+            taxonomy_id = parser.parse_required_field_with_double_escaped_html('taxonomy_id', row[2])
+            record = self.service_taxonomy_model(service_id=service_id, taxonomyterm_id=taxonomy_id)
+            check_related_id(record, 'service', self.service_ids)
+            check_related_id(record, 'taxonomyterm', self.taxonomy_term_ids)
+            self.add_link_record(record)
+        except ValidationError as error:
+            LOGGER.warning('%s', error.__str__())
+
+
+def get_ids(model):
+    return set(model.objects.values_list('pk', flat=True))
+
+
+def validate_in_memory(record, foreign_keys=()):
+    # As ValidateOnSaveMixin.save() does, except for the queries full_clean() makes for
+    # foreign keys and unique fields, which callers check against known ids instead
+    try:
+        record.clean_fields(exclude=foreign_keys)
+        record.clean()
+    except ValidationError as error:
+        raise record.build_validation_error_no_throw(error)
+
+
+def check_related_id(record, field_name, known_ids):
+    field = record._meta.get_field(field_name)
+    related_id = getattr(record, field.attname)
+    if related_id not in known_ids:
+        raise ValidationError('type={} {} instance with id {} does not exist'.format(
+            type(record).__name__, field.related_model.__name__, related_id))
+
+
+def check_unique(record, field_names, known_keys):
+    # Records with NULL in any of the fields are never equal, as in the database
+    key = tuple(getattr(record, record._meta.get_field(name).attname) for name in field_names)
+    if None in key:
+        return
+    if key in known_keys:
+        raise ValidationError('type={} {} with these values already exists: {}'.format(
+            type(record).__name__, ', '.join(field_names), key))
+    known_keys.add(key)
@@ -0,0 +1,153 @@
+import logging
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import translation
+from bc211.differential_import import (ORGANIZATION, SERVICE, LOCATION, compute_model_record_hash,
+                                       get_translated_fields)
+from bc211.import_open_referral_csv.bulk_importer import (ADDRESS_UNIQUE_FIELDS, BulkImporter, RowError,
+                                                          StageTimings, check_unique, parse_files,
+                                                          select_filenames)
+from human_services.addresses.models import Address
+from human_services.locations.models import Location, LocationAddress, ServiceAtLocation
+from human_services.organizations.models import Organization
+from human_services.services.models import Service
+
+LOGGER = logging.getLogger(__name__)
+
+RECORD_TYPES_BY_MODEL = {Organization: ORGANIZATION, Service: SERVICE, Location: LOCATION}
+
+
+def differential_import_open_referral_files(root_folder, collector, counters, changes, workers=1, timings=None):
+    # Always of all files, as records missing from them are deleted
+    timings = timings or StageTimings()
+    filenames = select_filenames(None)
+    with timings.measure('read and validate files'):
+        parsed_files = parse_files(root_folder, filenames, workers)
+    with transaction.atomic(), translation.override('en'):
+        importer = DifferentialImporter(collector, counters, changes, timings)
+        importer.import_parsed_files(zip(filenames, parsed_files))
+        with timings.measure('delete removed records'):
+            importer.finish()
+    return timings
+
+
+class DifferentialImporter(BulkImporter):
+    # Imports the same rows as BulkImporter, but rather than leaving out organizations,
+    # services and locations already in the database, updates those that changed since the
+    # last differential import, as found by RecordChanges, as well as addresses whose fields
+    # changed. Rows of services at locations, addresses of locations, phone numbers and
+    # service taxonomy terms that are already in the database are left as they are, and
+    # those no longer in the files are deleted
+    def __init__(self, collector, counters, changes, timings=None):
+        super().__init__(collector, counters, timings)
+        self.changes = changes
+        language = translation.get_language()
+        self.translation_ids = {model: dict(model._parler_meta.root_model.objects.
+                                            filter(language_code=language).
+                                            values_list('master_id', 'id'))
+                                for model in RECORD_TYPES_BY_MODEL}
+        self.existing_link_ids = {model: get_ids_by_key(model, key_fields)
+                                  for model, key_fields in self.link_key_fields.items()}
+        self.link_keys_in_import = {model: set() for model in self.link_key_fields}
+        self.location_address_ids_by_type = {(location_id, address_type_id): record_id
+                                             for (location_id, address_type_id, _), record_ids
+                                             in self.existing_link_ids[LocationAddress].items()
+                                             for record_id in record_ids}
+        self.stored_address_values = {values[0]: values[1:] for values
+                                      in Address.objects.values_list('pk', *ADDRESS_UNIQUE_FIELDS)}
+        # Only rows repeated within the files are left out, those in the database are
+        # checked by add_link_record()
+        self.location_address_keys = set()
+
+    def report_invalid_record(self, model, record_id, error):
+        self.changes.add_kept(RECORD_TYPES_BY_MODEL[model], record_id)
+        super().report_invalid_record(model, record_id, error)
+
+    def add_translatable_record(self, record, known_ids):
+        record_type = RECORD_TYPES_BY_MODEL[type(record)]
+        if self.changes.is_in_import(record_type, record.id):
+            LOGGER.warning('%s with id "%s" is repeated in the import, imported once', type(record).__name__, record.id)
+            return False
+        record_hash = compute_model_record_hash(record)
+        if record.id not in known_ids:
+            self.changes.add_created(record_type, record.id, record_hash)
+            return super().add_translatable_record(record, known_ids)
+        if self.changes.is_unchanged(record_type, record.id, record_hash):
+            self.changes.add_kept(record_type, record.id)
+        else:
+            self.update_translatable_record(record)
+            self.changes.add_updated(record_type, record.id, record_hash)
+        return False
+
+    def update_translatable_record(self, record):
+        model = type(record)
+        self.batches.update(record, [field.name for field in model._meta.concrete_fields if not field.primary_key])
+        translated_record = record.get_translation(record.get_current_language())
+        translated_record.master = record
+        translated_record.pk = self.translation_ids[model].get(record.id)
+        if translated_record.pk is None:
+            self.batches.add(translated_record)
+        else:
+            self.batches.update(translated_record,
+                                [field.name for field in get_translated_fields(translated_record)])
+
+    def import_known_address(self, address_id, record):
+        # Addresses are not hashed with their locations, so their fields are compared with
+        # the stored ones instead, once per address, and updated if they changed
+        stored_values = self.stored_address_values.pop(address_id, None)
+        if stored_values is None:
+            return address_id
+        if isinstance(record, RowError):
+            LOGGER.warning('%s', record.message)
+            return address_id
+        values = tuple(getattr(record, field_name) for field_name in ADDRESS_UNIQUE_FIELDS)
+        if values == stored_values:
+            return address_id
+        self.address_keys.discard(stored_values)
+        try:
+            check_unique(record, ADDRESS_UNIQUE_FIELDS, self.address_keys)
+        except ValidationError as error:
+            self.address_keys.add(stored_values)
+            LOGGER.warning('%s', error.__str__())
+            return address_id
+        self.batches.update(record, ADDRESS_UNIQUE_FIELDS)
+        return address_id
+
+    def add_link_record(self, record):
+        model = type(record)
+        key = self.get_link_key(record)
+        if key in self.link_keys_in_import[model]:
+            return False
+        self.link_keys_in_import[model].add(key)
+        if key in self.existing_link_ids[model]:
+            return False
+        if model is LocationAddress:
+            self.delete_replaced_location_address(record)
+        self.batches.add(record)
+        return True
+
+    def delete_replaced_location_address(self, record):
+        # There is one address of each type per location
+        replaced_id = self.location_address_ids_by_type.get((record.location_id, record.address_type_id))
+        if replaced_id is not None:
+            self.batches.delete(LocationAddress, replaced_id)
+
+    def finish(self):
+        self.batches.write()
+        for model, ids_by_key in self.existing_link_ids.items():
+            removed_ids = [record_id
+                           for key, record_ids in ids_by_key.items() if key not in self.link_keys_in_import[model]
+                           for record_id in record_ids]
+            removed_records = model.objects.filter(pk__in=removed_ids)
+            if model is ServiceAtLocation:
+                # The scores of the QA tool are protected, deleted only with their service or location
+                removed_records = removed_records.filter(relevancyscore=None)
+            removed_records.delete()
+        self.changes.finish()
+
+
+def get_ids_by_key(model, key_fields):
+    ids_by_key = {}
+    for values in model.objects.values_list('pk', *key_fields):
+        ids_by_key.setdefault(tuple(values[1:]), []).append(values[0])
+    return ids_by_key
@@ -1,20 +1,21 @@
+import json
 from bc211.is_inactive import is_inactive
 
 
 class InactiveRecordsCollector:
     def __init__(self):
-        self.inactive_organizations_ids = []
-        self.inactive_services_ids = []
-        self.inactive_locations_ids = []
+        self.inactive_organizations_ids = set()
+        self.inactive_services_ids = set()
+        self.inactive_locations_ids = set()
 
     def add_inactive_organization_id(self, organization_id):
-        self.inactive_organizations_ids.append(organization_id)
+        self.inactive_organizations_ids.add(organization_id)
 
     def add_inactive_service_id(self, service_id):
-        self.inactive_services_ids.append(service_id)
+        self.inactive_services_ids.add(service_id)
 
     def add_inactive_location_id(self, location_id):
-        self.inactive_locations_ids.append(location_id)
+        self.inactive_locations_ids.add(location_id)
 
     def organization_has_inactive_data(self, organization_id, description):
         if is_inactive(description):
@@ -42,3 +43,24 @@ class InactiveRecordsCollector:
 
     def has_inactive_location_id(self, location_id):
         return location_id in self.inactive_locations_ids
+
+    # Saved after a full import, so that a later import of only some of the files, e.g.
+    # phones.csv, can leave out rows of inactive records without reading organizations.csv,
+    # services.csv and location.csv again
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump({
+                'organizations': sorted(self.inactive_organizations_ids),
+                'services': sorted(self.inactive_services_ids),
+                'locations': sorted(self.inactive_locations_ids),
+            }, file, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as file:
+            ids = json.load(file)
+        collector = cls()
+        collector.inactive_organizations_ids.update(ids['organizations'])
+        collector.inactive_services_ids.update(ids['services'])
+        collector.inactive_locations_ids.update(ids['locations'])
+        return collector
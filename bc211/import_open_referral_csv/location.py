@@ -1,64 +1,14 @@
-import csv
-import os
 import logging
-from django.utils import translation
 from django.contrib.gis.geos import Point
-from django.core.exceptions import ValidationError
 from human_services.locations.models import Location
 from bc211.import_open_referral_csv import parser
-from bc211.import_open_referral_csv.headers_match_expected_format import (
-    headers_match_expected_format)
-from bc211.import_open_referral_csv.exceptions import InvalidFileCsvImportException
 
 LOGGER = logging.getLogger(__name__)
 
-
-def import_locations_file(root_folder, collector, counters):
-    filename = 'location.csv'
-    path = os.path.join(root_folder, filename)
-    read_file(path, collector, counters)
-
-
-def read_file(path, collector, counters):
-    with open(path, 'r', newline='') as file:
-        reader = csv.reader(file)
-        headers = reader.__next__()
-        if not headers_match_expected_format(headers, expected_headers):
-            raise InvalidFileCsvImportException(
-                'The headers in "{0}": does not match open referral standards.'.format(path)
-            )
-        read_and_import_row(reader, collector, counters)
-
-
 expected_headers = ['id', 'organization_id', 'name', 'alternate_name', 'description',
                 'transportation', 'latitude', 'longitude']
 
 
-def read_and_import_row(reader, collector, counters):
-    for row in reader:
-        if not row:
-            continue
-        import_location(row, collector, counters)
-
-
-def import_location(row, collector, counters):
-    try:
-        translation.activate('en')
-        location_id = parser.parse_required_field_with_double_escaped_html('location_id', row[0])
-        organization_id = parser.parse_required_field_with_double_escaped_html(
-            'organization_id',
-            row[1]
-        )
-        description = parser.parse_optional_field_with_double_escaped_html(row[4])
-        if collector.location_has_inactive_data(organization_id, location_id, description):
-            return
-        active_record = build_location_active_record(row, location_id, organization_id, description)
-        active_record.save()
-        counters.count_locations_created()
-    except ValidationError as error:
-        LOGGER.warning('%s', error.__str__())
-
-
 def build_location_active_record(row, location_id, organization_id, description):
     location_id = parser.parse_required_field_with_double_escaped_html('location_id', row[0])
     active_record = Location()
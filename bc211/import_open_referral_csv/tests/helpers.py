@@ -1,9 +1,22 @@
 from datetime import date
 import string
+from django.utils import translation
+from bc211.import_icarol_xml.import_counters import ImportCounters
+from bc211.import_open_referral_csv.bulk_importer import FILE_PARSERS, BulkImporter
+from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
 from common.testhelpers.random_test_values import (a_string, an_email_address, a_website_address,
                                                    a_latitude, a_longitude, a_phone_number, an_integer)
 
 
+def import_rows(filename, rows, collector=None, counters=None):
+    # Imports the rows as the bulk import does when they are read from the named file
+    _, parse_row = FILE_PARSERS[filename]
+    with translation.override('en'):
+        parsed_rows = [parse_row(row) for row in rows]
+        importer = BulkImporter(collector or InactiveRecordsCollector(), counters or ImportCounters())
+        importer.import_parsed_files([(filename, parsed_rows)])
+
+
 class OpenReferralCsvOrganizationBuilder:
     def __init__(self):
         self.organization_id = a_string()
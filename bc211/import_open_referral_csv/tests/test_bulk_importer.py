@@ -0,0 +1,196 @@
+import csv
+import os
+import tempfile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from bc211.import_icarol_xml.import_counters import ImportCounters
+from bc211.import_open_referral_csv import (organization, service, location, service_at_location,
+                                            address, phone, taxonomy, service_taxonomy)
+from bc211.import_open_referral_csv.bulk_importer import bulk_import_open_referral_files
+from bc211.import_open_referral_csv.exceptions import CsvParseException
+from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
+from bc211.import_open_referral_csv.tests.helpers import (
+    OpenReferralCsvOrganizationBuilder, OpenReferralCsvServiceBuilder,
+    OpenReferralCsvLocationBuilder, OpenReferralCsvServiceAtLocationBuilder,
+    OpenReferralCsvAddressBuilder, OpenReferralCsvPhoneBuilder, OpenReferralCsvTaxonomyBuilder,
+    OpenReferralCsvServiceTaxonomyBuilder)
+from common.testhelpers.random_test_values import a_string
+from human_services.locations.models import Location, LocationAddress, ServiceAtLocation
+from human_services.locations.tests.helpers import LocationBuilder
+from human_services.organizations.models import Organization
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.phone_at_location.models import PhoneAtLocation
+from human_services.services.models import Service
+from human_services.services.tests.helpers import ServiceBuilder
+from taxonomies.models import TaxonomyTerm
+
+FILES = [('organizations.csv', organization.expected_headers),
+         ('services.csv', service.expected_headers),
+         ('location.csv', location.expected_headers),
+         ('services_at_location.csv', service_at_location.expected_headers),
+         ('addresses.csv', address.expected_headers),
+         ('phones.csv', phone.expected_headers),
+         ('taxonomy.csv', taxonomy.expected_headers),
+         ('services_taxonomy.csv', service_taxonomy.expected_headers)]
+
+
+class OpenReferralCsvFilesMixin:
+    def setUp(self):
+        self.rows = {filename: [] for filename, _ in FILES}
+
+    def add_organization(self):
+        the_organization = OrganizationBuilder().build()
+        self.rows['organizations.csv'].append(OpenReferralCsvOrganizationBuilder().
+                                              with_id(the_organization.id).
+                                              build())
+        return the_organization
+
+    def add_service_at_location(self, the_organization):
+        the_service = ServiceBuilder(the_organization).build()
+        the_location = LocationBuilder(the_organization).build()
+        self.rows['services.csv'].append(OpenReferralCsvServiceBuilder(the_organization).
+                                         with_id(the_service.id).
+                                         build())
+        self.rows['location.csv'].append(OpenReferralCsvLocationBuilder(the_organization).
+                                         with_id(the_location.id).
+                                         build())
+        self.rows['services_at_location.csv'].append(
+            OpenReferralCsvServiceAtLocationBuilder(the_service, the_location).build())
+        self.rows['addresses.csv'].append(OpenReferralCsvAddressBuilder(the_location).build())
+        self.rows['phones.csv'].append(OpenReferralCsvPhoneBuilder(the_location).build())
+        taxonomy_term_id = a_string()
+        self.rows['taxonomy.csv'].append(OpenReferralCsvTaxonomyBuilder().
+                                         with_taxonomy_term_id(taxonomy_term_id).
+                                         build())
+        self.rows['services_taxonomy.csv'].append(OpenReferralCsvServiceTaxonomyBuilder().
+                                                  with_service_id(the_service.id).
+                                                  with_taxonomy_term_id(taxonomy_term_id).
+                                                  build())
+        return the_service, the_location
+
+    def write_files(self, root_folder):
+        for filename, headers in FILES:
+            with open(os.path.join(root_folder, filename), 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(headers)
+                writer.writerows(self.rows[filename])
+
+
+class BulkImporterTests(OpenReferralCsvFilesMixin, TestCase):
+    def import_files(self, collector=None, filenames=None, workers=1):
+        counters = ImportCounters()
+        with tempfile.TemporaryDirectory() as root_folder:
+            self.write_files(root_folder)
+            bulk_import_open_referral_files(root_folder, collector or InactiveRecordsCollector(), counters,
+                                            filenames, workers)
+        return counters
+
+    def test_imports_records_in_all_files(self):
+        the_organization = self.add_organization()
+        the_service, the_location = self.add_service_at_location(the_organization)
+
+        counters = self.import_files()
+
+        self.assertEqual(Organization.objects.get().id, the_organization.id)
+        self.assertEqual(Service.objects.get().organization_id, the_organization.id)
+        self.assertEqual(Location.objects.get().organization_id, the_organization.id)
+        self.assertEqual(ServiceAtLocation.objects.get().service_id, the_service.id)
+        self.assertEqual(LocationAddress.objects.get().location_id, the_location.id)
+        self.assertEqual(PhoneAtLocation.objects.get().location_id, the_location.id)
+        self.assertEqual(Service.objects.get().taxonomy_terms.get(), TaxonomyTerm.objects.get())
+        self.assertEqual(counters.services_created, 1)
+
+    def test_imports_records_read_in_worker_processes(self):
+        the_organization = self.add_organization()
+        the_service, _ = self.add_service_at_location(the_organization)
+
+        counters = self.import_files(workers=2)
+
+        self.assertEqual(Service.objects.get().id, the_service.id)
+        self.assertEqual(Service.objects.language('en').get().name, self.rows['services.csv'][0][3])
+        self.assertEqual(ServiceAtLocation.objects.get().service_id, the_service.id)
+        self.assertEqual(counters.services_created, 1)
+
+    def test_imports_translated_fields(self):
+        the_name = a_string()
+        self.rows['organizations.csv'].append(OpenReferralCsvOrganizationBuilder().
+                                              with_name(the_name).
+                                              build())
+        self.import_files()
+        self.assertEqual(Organization.objects.language('en').get().name, the_name)
+
+    def test_does_not_import_services_of_unknown_organizations(self):
+        self.add_service_at_location(OrganizationBuilder().build())
+        self.import_files()
+        self.assertEqual(Service.objects.count(), 0)
+        self.assertEqual(ServiceAtLocation.objects.count(), 0)
+        self.assertEqual(PhoneAtLocation.objects.count(), 0)
+
+    def test_reports_model_and_id_of_invalid_records(self):
+        the_id = a_string()
+        self.rows['organizations.csv'].append(OpenReferralCsvOrganizationBuilder().
+                                              with_id(the_id).
+                                              with_name('').
+                                              build())
+        with self.assertRaises(CsvParseException) as context:
+            self.import_files()
+        self.assertIn('Organization with id "{}"'.format(the_id), str(context.exception))
+
+    def test_does_not_import_inactive_organizations(self):
+        self.rows['organizations.csv'].append(OpenReferralCsvOrganizationBuilder().
+                                              with_description('DEL ' + a_string()).
+                                              build())
+        self.import_files()
+        self.assertEqual(Organization.objects.count(), 0)
+
+    def test_imports_services_of_organizations_already_in_database(self):
+        existing_organization = OrganizationBuilder().create()
+        self.rows['organizations.csv'].append(OpenReferralCsvOrganizationBuilder().
+                                              with_id(existing_organization.id).
+                                              build())
+        self.add_service_at_location(existing_organization)
+        self.import_files()
+        self.assertEqual(Organization.objects.count(), 1)
+        self.assertEqual(Service.objects.get().organization_id, existing_organization.id)
+
+    def test_imports_only_given_files_leaving_out_saved_inactive_locations(self):
+        the_organization = OrganizationBuilder().create()
+        active_location = LocationBuilder(the_organization).create()
+        inactive_location = LocationBuilder(the_organization).create()
+        self.add_organization()
+        self.rows['phones.csv'].append(OpenReferralCsvPhoneBuilder(active_location).build())
+        self.rows['phones.csv'].append(OpenReferralCsvPhoneBuilder(inactive_location).build())
+        collector = InactiveRecordsCollector()
+        collector.add_inactive_location_id(inactive_location.id)
+
+        self.import_files(collector, filenames=['phones.csv'])
+
+        self.assertEqual(Organization.objects.count(), 1)
+        self.assertEqual(PhoneAtLocation.objects.get().location_id, active_location.id)
+
+    def test_does_not_duplicate_rows_when_importing_given_files_again(self):
+        self.add_service_at_location(self.add_organization())
+        self.import_files()
+
+        counters = self.import_files(filenames=['services_at_location.csv', 'addresses.csv', 'phones.csv'])
+
+        self.assertEqual(ServiceAtLocation.objects.count(), 1)
+        self.assertEqual(LocationAddress.objects.count(), 1)
+        self.assertEqual(PhoneAtLocation.objects.count(), 1)
+        self.assertEqual(counters.phone_at_location_count, 0)
+
+    def test_number_of_queries_does_not_grow_with_number_of_rows(self):
+        self.add_service_at_location(self.add_organization())
+        with CaptureQueriesContext(connection) as context:
+            self.import_files()
+        query_count_for_one_row = len(context.captured_queries)
+
+        self.setUp()
+        for _ in range(5):
+            self.add_service_at_location(self.add_organization())
+        with CaptureQueriesContext(connection) as context:
+            self.import_files()
+
+        self.assertEqual(Service.objects.count(), 6)
+        self.assertEqual(len(context.captured_queries), query_count_for_one_row)
@@ -0,0 +1,102 @@
+import tempfile
+from django.test import TestCase
+from bc211.differential_import import RecordChanges
+from bc211.import_icarol_xml.import_counters import ImportCounters
+from bc211.import_open_referral_csv.differential_importer import differential_import_open_referral_files
+from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
+from bc211.import_open_referral_csv.tests.test_bulk_importer import OpenReferralCsvFilesMixin
+from common.testhelpers.random_test_values import a_string
+from human_services.addresses.models import Address
+from human_services.locations.models import Location, LocationAddress, ServiceAtLocation
+from human_services.organizations.models import Organization
+from human_services.phone_at_location.models import PhoneAtLocation
+from human_services.services.models import Service
+from human_services.services_at_location.tests.helpers import set_service_similarity_score
+from newcomers_guide.tests.helpers import create_topic
+from search.models import TaskServiceSimilarityScore
+
+SERVICE_NAME_COLUMN = 3
+PHONE_NUMBER_COLUMN = 6
+ADDRESS_CITY_COLUMN = 8
+
+
+class DifferentialImporterTests(OpenReferralCsvFilesMixin, TestCase):
+    def import_files(self):
+        changes = RecordChanges()
+        with tempfile.TemporaryDirectory() as root_folder:
+            self.write_files(root_folder)
+            differential_import_open_referral_files(root_folder, InactiveRecordsCollector(), ImportCounters(),
+                                                    changes)
+        return changes
+
+    def test_creates_new_records(self):
+        the_service, the_location = self.add_service_at_location(self.add_organization())
+
+        changes = self.import_files()
+
+        self.assertEqual(Service.objects.get().id, the_service.id)
+        self.assertEqual(ServiceAtLocation.objects.get().location_id, the_location.id)
+        self.assertEqual(changes.changed_service_ids(), [the_service.id])
+
+    def test_leaves_unchanged_records_as_they_are(self):
+        self.add_service_at_location(self.add_organization())
+        self.import_files()
+
+        changes = self.import_files()
+
+        self.assertEqual(changes.changed_service_ids(), [])
+        self.assertEqual(Service.objects.count(), 1)
+        self.assertEqual(ServiceAtLocation.objects.count(), 1)
+        self.assertEqual(LocationAddress.objects.count(), 1)
+        self.assertEqual(PhoneAtLocation.objects.count(), 1)
+        self.assertEqual(Service.objects.get().taxonomy_terms.count(), 1)
+
+    def test_updates_changed_service_keeping_its_similarity_scores(self):
+        the_service, _ = self.add_service_at_location(self.add_organization())
+        self.import_files()
+        topic = create_topic(a_string())
+        set_service_similarity_score(topic.id, the_service.id, 0.5)
+        new_name = a_string()
+        self.rows['services.csv'][0][SERVICE_NAME_COLUMN] = new_name
+
+        changes = self.import_files()
+
+        self.assertEqual(Service.objects.language('en').get().name, new_name)
+        self.assertEqual(changes.changed_service_ids(), [the_service.id])
+        self.assertEqual(TaskServiceSimilarityScore.objects.get().service_id, the_service.id)
+
+    def test_replaces_changed_phone_numbers(self):
+        self.add_service_at_location(self.add_organization())
+        self.import_files()
+        old_phone_number = PhoneAtLocation.objects.get().phone_number
+        self.rows['phones.csv'][0][PHONE_NUMBER_COLUMN] = '604-555-0199'
+
+        self.import_files()
+
+        self.assertEqual(PhoneAtLocation.objects.count(), 1)
+        self.assertNotEqual(PhoneAtLocation.objects.get().phone_number, old_phone_number)
+
+    def test_updates_changed_address(self):
+        self.add_service_at_location(self.add_organization())
+        self.import_files()
+        new_city = a_string()
+        self.rows['addresses.csv'][0][ADDRESS_CITY_COLUMN] = new_city
+
+        self.import_files()
+
+        self.assertEqual(Address.objects.get().city, new_city)
+        self.assertEqual(LocationAddress.objects.count(), 1)
+
+    def test_deletes_records_missing_from_import(self):
+        the_service, _ = self.add_service_at_location(self.add_organization())
+        self.import_files()
+        organization_row = self.rows['organizations.csv'][0]
+        self.setUp()
+        self.rows['organizations.csv'].append(organization_row)
+
+        changes = self.import_files()
+
+        self.assertEqual(Organization.objects.count(), 1)
+        self.assertEqual(Service.objects.count(), 0)
+        self.assertEqual(Location.objects.count(), 0)
+        self.assertEqual(changes.changed_service_ids(), [the_service.id])
@@ -1,12 +1,7 @@
 from django.test import TestCase
 from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
 from bc211.import_icarol_xml.import_counters import ImportCounters
-from bc211.import_open_referral_csv.organization import read_and_import_rows as import_organization
-from bc211.import_open_referral_csv.location import read_and_import_row as import_locations
-from bc211.import_open_referral_csv.service import read_and_import_rows as import_services
-from bc211.import_open_referral_csv.address import read_and_import_rows as import_addresses
-from bc211.import_open_referral_csv.taxonomy import read_and_import_rows as import_taxonomy_terms
-from bc211.import_open_referral_csv.service_taxonomy import read_and_import_rows as import_service_taxonomy
+from bc211.import_open_referral_csv.tests.helpers import import_rows
 from human_services.organizations.models import Organization
 from human_services.services.models import Service
 from human_services.addresses.models import Address
@@ -90,7 +85,7 @@ class EndToEndTest(TestCase):
         organization_id_with_region = f'{the_organization_id}_{the_region}'
         collector = InactiveRecordsCollector()
         counters = ImportCounters()
-        import_organization(open_referral_csv_data, collector, counters)
+        import_rows('organizations.csv', open_referral_csv_data, collector, counters)
         result_from_db = Organization.objects.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, organization_id_with_region)
@@ -105,7 +100,7 @@ class EndToEndTest(TestCase):
             # latitude,longitude
             0, 0]
                 for r in parsed_data.locations]
-        import_locations(open_referral_csv_data, collector, counters)
+        import_rows('location.csv', open_referral_csv_data, collector, counters)
         result_from_db = Location.objects.all()
         self.assertEqual(len(result_from_db), 2)
 
@@ -123,7 +118,7 @@ class EndToEndTest(TestCase):
             # fees,accreditations,licenses, taxonomy_ids,last_verified_on-x
             '', '', '', '', '']
                 for r in parsed_data.services]
-        import_services(open_referral_csv_data, collector, counters)
+        import_rows('services.csv', open_referral_csv_data, collector, counters)
         result_from_db = Service.objects.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, f'{the_service_id}_{the_region}')
@@ -143,7 +138,7 @@ class EndToEndTest(TestCase):
             # country
             r['country']]
                 for r in parsed_data.addresses]
-        import_addresses(open_referral_csv_data, collector, counters)
+        import_rows('addresses.csv', open_referral_csv_data, collector, counters)
         result_from_db = Address.objects.all()
         self.assertEqual(len(result_from_db), 2)
 
@@ -238,7 +233,7 @@ class EndToEndTest(TestCase):
                 for r in parsed_data.organizations]
         collector = InactiveRecordsCollector()
         counters = ImportCounters()
-        import_organization(open_referral_csv_data, collector, counters)
+        import_rows('organizations.csv', open_referral_csv_data, collector, counters)
         result_from_db = Organization.objects.all()
         self.assertEqual(len(result_from_db), 2)
         self.assertEqual({r.id for r in result_from_db}, {
@@ -254,7 +249,7 @@ class EndToEndTest(TestCase):
             # latitude,longitude
             0, 0]
                 for r in parsed_data.locations]
-        import_locations(open_referral_csv_data, collector, counters)
+        import_rows('location.csv', open_referral_csv_data, collector, counters)
         result_from_db = Location.objects.all()
         self.assertEqual(len(result_from_db), 2)
         self.assertEqual({r.name for r in result_from_db}, {first_name, second_name})
@@ -273,7 +268,7 @@ class EndToEndTest(TestCase):
             # fees,accreditations,licenses, taxonomy_ids,last_verified_on-x
             '', '', '', '', '']
                 for r in parsed_data.services]
-        import_services(open_referral_csv_data, collector, counters)
+        import_rows('services.csv', open_referral_csv_data, collector, counters)
         result_from_db = Service.objects.all()
         self.assertEqual(len(result_from_db), 2)
         self.assertEqual({r.id for r in result_from_db}, {f'{first_service_id}_{the_region}',
@@ -295,7 +290,7 @@ class EndToEndTest(TestCase):
             # country
             r['country']]
                 for r in parsed_data.addresses]
-        import_addresses(open_referral_csv_data, collector, counters)
+        import_rows('addresses.csv', open_referral_csv_data, collector, counters)
         result_from_db = Address.objects.all()
         self.assertEqual(len(result_from_db), 2)
         self.assertEqual(result_from_db[0].address[0:20], mailing_address_1[0:20])
@@ -351,7 +346,7 @@ class EndToEndTest(TestCase):
                 for r in parsed_data.organizations]
         collector = InactiveRecordsCollector()
         counters = ImportCounters()
-        import_organization(open_referral_csv_data, collector, counters)
+        import_rows('organizations.csv', open_referral_csv_data, collector, counters)
         result_from_db = Organization.objects.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, f'{the_organization_id}_{the_region}')
@@ -370,7 +365,7 @@ class EndToEndTest(TestCase):
             # fees,accreditations,licenses, taxonomy_ids,last_verified_on-x
             '', '', '', '', '']
                 for r in parsed_data.services]
-        import_services(open_referral_csv_data, collector, counters)
+        import_rows('services.csv', open_referral_csv_data, collector, counters)
         result_from_db = Service.objects.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, f'{the_service_id}_{the_region}')
@@ -384,7 +379,7 @@ class EndToEndTest(TestCase):
             # parent_name,vocabulary
             '', r['vocabulary']]
                 for r in parsed_data.taxonomy_terms]
-        import_taxonomy_terms(open_referral_csv_data, counters)
+        import_rows('taxonomy.csv', open_referral_csv_data, collector, counters)
         result_from_db = TaxonomyTerm.objects.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, taxonomy_term_id)
@@ -397,7 +392,7 @@ class EndToEndTest(TestCase):
             # id,service_id,taxonomy_id, taxonomy_detail
             r['id'], r['service_id'], r['taxonomy_id'], '']
                 for r in parsed_data.services_taxonomy]
-        import_service_taxonomy(open_referral_csv_data, collector)
+        import_rows('services_taxonomy.csv', open_referral_csv_data, collector, counters)
         result_from_db = Service.objects.all()[0].taxonomy_terms.all()
         self.assertEqual(len(result_from_db), 1)
         self.assertEqual(result_from_db[0].id, taxonomy_term_id)
@@ -1,21 +1,11 @@
 import string
 from datetime import date
 from django.test import TestCase
-from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
-from bc211.import_icarol_xml.import_counters import ImportCounters
-from bc211.import_open_referral_csv.organization import import_organization
-from bc211.import_open_referral_csv.service import import_service
-from bc211.import_open_referral_csv.location import import_location
-from bc211.import_open_referral_csv.service_at_location import import_service_at_location
-from bc211.import_open_referral_csv.address import import_address, import_location_address
-from bc211.import_open_referral_csv.phone import import_phone
-from bc211.import_open_referral_csv.taxonomy import import_taxonomy
-from bc211.import_open_referral_csv.service_taxonomy import read_and_import_rows
 from bc211.import_open_referral_csv.tests.helpers import (
     OpenReferralCsvOrganizationBuilder, OpenReferralCsvServiceBuilder,
     OpenReferralCsvLocationBuilder, OpenReferralCsvServiceAtLocationBuilder,
     OpenReferralCsvAddressBuilder, OpenReferralCsvPhoneBuilder, OpenReferralCsvTaxonomyBuilder,
-    OpenReferralCsvServiceTaxonomyBuilder)
+    OpenReferralCsvServiceTaxonomyBuilder, import_rows)
 from common.testhelpers.random_test_values import (a_string, an_email_address, a_website_address,
                                                    a_latitude, a_longitude, a_phone_number, a_country_code)
 from human_services.organizations.models import Organization
@@ -37,14 +27,14 @@ class OrganizationImporterTests(TestCase):
     def test_can_import_id(self):
         the_id = a_string()
         organization_data = OpenReferralCsvOrganizationBuilder().with_id(the_id).build()
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].id, the_id)
 
     def test_can_import_name(self):
         the_name = a_string()
         organization_data = OpenReferralCsvOrganizationBuilder().with_name(the_name).build()
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].name, the_name)
 
@@ -53,7 +43,7 @@ class OrganizationImporterTests(TestCase):
         organization_data = (OpenReferralCsvOrganizationBuilder().
                              with_alternate_name(the_alternate_name).
                              build())
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].alternate_name, the_alternate_name)
 
@@ -62,21 +52,21 @@ class OrganizationImporterTests(TestCase):
         organization_data = (OpenReferralCsvOrganizationBuilder().
                              with_description(the_description).
                              build())
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].description, the_description)
 
     def test_can_import_email(self):
         the_email = an_email_address()
         organization_data = OpenReferralCsvOrganizationBuilder().with_email(the_email).build()
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].email, the_email)
 
     def test_can_import_website(self):
         the_website = a_website_address()
         organization_data = OpenReferralCsvOrganizationBuilder().with_url(the_website).build()
-        import_organization(organization_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('organizations.csv', [organization_data])
         organizations = Organization.objects.all()
         self.assertEqual(organizations[0].website, the_website)
 
@@ -89,20 +79,20 @@ class ServiceImporterTests(TestCase):
     def test_can_import_id(self):
         the_id = a_string()
         service_data = OpenReferralCsvServiceBuilder(self.organization).with_id(the_id).build()
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].id, the_id)
 
     def test_can_import_organization_id(self):
         service_data = OpenReferralCsvServiceBuilder(self.organization).build()
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].organization_id, self.organization_id)
 
     def test_can_import_name(self):
         the_name = a_string()
         service_data = OpenReferralCsvServiceBuilder(self.organization).with_name(the_name).build()
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].name, the_name)
 
@@ -111,7 +101,7 @@ class ServiceImporterTests(TestCase):
         service_data = (OpenReferralCsvServiceBuilder(self.organization).
                         with_alternate_name(the_alternate_name).
                         build())
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].alternate_name, the_alternate_name)
 
@@ -120,7 +110,7 @@ class ServiceImporterTests(TestCase):
         service_data = (OpenReferralCsvServiceBuilder(self.organization).
                         with_description(the_description).
                         build())
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].description, the_description)
 
@@ -129,7 +119,7 @@ class ServiceImporterTests(TestCase):
         service_data = (OpenReferralCsvServiceBuilder(self.organization).
                         with_url(the_website).
                         build())
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].website, the_website)
 
@@ -138,7 +128,7 @@ class ServiceImporterTests(TestCase):
         service_data = (OpenReferralCsvServiceBuilder(self.organization).
                         with_email(the_email).
                         build())
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(services[0].email, the_email)
 
@@ -147,7 +137,7 @@ class ServiceImporterTests(TestCase):
         service_data = (OpenReferralCsvServiceBuilder(self.organization).
                         with_last_verified_on(the_date).
                         build())
-        import_service(service_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('services.csv', [service_data])
         services = Service.objects.all()
         self.assertEqual(date.strftime(services[0].last_verified_date, "%Y-%m-%d"), the_date)
 
@@ -160,13 +150,13 @@ class LocationImporterTests(TestCase):
     def test_can_import_id(self):
         the_id = a_string()
         location_data = OpenReferralCsvLocationBuilder(self.organization).with_id(the_id).build()
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].id, the_id)
 
     def test_can_import_organization_id(self):
         location_data = OpenReferralCsvLocationBuilder(self.organization).build()
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].organization_id, self.organization_id)
 
@@ -175,7 +165,7 @@ class LocationImporterTests(TestCase):
         location_data = (OpenReferralCsvLocationBuilder(self.organization).
                         with_name(the_name).
                         build())
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].name, the_name)
 
@@ -184,7 +174,7 @@ class LocationImporterTests(TestCase):
         location_data = (OpenReferralCsvLocationBuilder(self.organization).
                         with_alternate_name(the_alternate_name).
                         build())
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].alternate_name, the_alternate_name)
 
@@ -193,7 +183,7 @@ class LocationImporterTests(TestCase):
         location_data = (OpenReferralCsvLocationBuilder(self.organization).
                         with_description(the_description).
                         build())
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].description, the_description)
 
@@ -204,7 +194,7 @@ class LocationImporterTests(TestCase):
                         with_latitude(str(the_latitude)).
                         with_longitude(str(the_longitude)).
                         build())
-        import_location(location_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('location.csv', [location_data])
         locations = Location.objects.all()
         self.assertEqual(locations[0].point.x, the_longitude)
         self.assertEqual(locations[0].point.y, the_latitude)
@@ -220,13 +210,13 @@ class ServiceAtLocationImporterTests(TestCase):
 
     def test_can_import_service_id(self):
         service_data = OpenReferralCsvServiceAtLocationBuilder(self.service, self.location).build()
-        import_service_at_location(service_data, ImportCounters())
+        import_rows('services_at_location.csv', [service_data])
         services_at_location = ServiceAtLocation.objects.all()
         self.assertEqual(services_at_location[0].service_id, self.service_id)
 
     def test_can_import_location_id(self):
         service_data = OpenReferralCsvServiceAtLocationBuilder(self.service, self.location).build()
-        import_service_at_location(service_data, ImportCounters())
+        import_rows('services_at_location.csv', [service_data])
         services_at_location = ServiceAtLocation.objects.all()
         self.assertEqual(services_at_location[0].location_id, self.location_id)
 
@@ -240,15 +230,14 @@ class AddressImporterTests(TestCase):
     def test_can_import_id(self):
         the_id = a_string()
         address_data = OpenReferralCsvAddressBuilder(self.location).with_address_id(the_id).build()
-        import_address(address_data, ImportCounters()
-        )
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].id, the_id)
 
     def test_can_import_city(self):
         the_city = a_string()
         address_data = OpenReferralCsvAddressBuilder(self.location).with_city(the_city).build()
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].city, the_city)
 
@@ -257,7 +246,7 @@ class AddressImporterTests(TestCase):
         address_data = (OpenReferralCsvAddressBuilder(self.location).
                         with_country(the_country).
                         build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].country, the_country)
 
@@ -266,7 +255,7 @@ class AddressImporterTests(TestCase):
         address_data = (OpenReferralCsvAddressBuilder(self.location).
                         with_attention(the_attention).
                         build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].attention, the_attention)
 
@@ -275,7 +264,7 @@ class AddressImporterTests(TestCase):
         address_data = (OpenReferralCsvAddressBuilder(self.location).
                         with_address_1(the_address_1).
                         build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].address, the_address_1)
 
@@ -290,7 +279,7 @@ class AddressImporterTests(TestCase):
                         with_address_3(the_address_3).
                         with_address_4(the_address_4).
                         build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(
             addresses[0].address,
@@ -302,7 +291,7 @@ class AddressImporterTests(TestCase):
         address_data = (OpenReferralCsvAddressBuilder(self.location).
                         with_state_province(the_state_province).
                         build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].state_province, the_state_province)
 
@@ -311,7 +300,7 @@ class AddressImporterTests(TestCase):
         address_data = (OpenReferralCsvAddressBuilder(self.location).
                             with_postal_code(the_postal_code).
                             build())
-        import_address(address_data, ImportCounters())
+        import_rows('addresses.csv', [address_data])
         addresses = Address.objects.all()
         self.assertEqual(addresses[0].postal_code, the_postal_code)
 
@@ -327,33 +316,17 @@ class LocationAddressImporterTests(TestCase):
                                 with_address_id(self.address_id).
                                 with_address_type(self.address_type).
                                 build())
-        import_address(self.address_data, ImportCounters())
-        self.address = Address.objects.get(pk=self.address_id)
+        import_rows('addresses.csv', [self.address_data])
 
     def test_can_import_address_id(self):
-        import_location_address(
-            self.address_data,
-            self.address,
-            InactiveRecordsCollector(),
-            ImportCounters())
         location_addresses = LocationAddress.objects.all()
         self.assertEqual(location_addresses[0].address_id, self.address_id)
 
     def test_can_import_location_id(self):
-        import_location_address(
-            self.address_data,
-            self.address,
-            InactiveRecordsCollector(),
-            ImportCounters())
         location_addresses = LocationAddress.objects.all()
         self.assertEqual(location_addresses[0].location_id, self.location_id)
 
     def test_can_import_address_type(self):
-        import_location_address(
-            self.address_data,
-            self.address,
-            InactiveRecordsCollector(),
-            ImportCounters())
         location_addresses = LocationAddress.objects.all()
         the_address_type_instance = AddressType.objects.get(pk=self.address_type)
         self.assertEqual(location_addresses[0].address_type, the_address_type_instance)
@@ -367,7 +340,7 @@ class PhoneAtLocationImporterTests(TestCase):
 
     def test_can_import_location_id(self):
         phone_data = OpenReferralCsvPhoneBuilder(self.location).build()
-        import_phone(phone_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('phones.csv', [phone_data])
         phones_at_location = PhoneAtLocation.objects.all()
         self.assertEqual(phones_at_location[0].location_id, self.location_id)
 
@@ -376,7 +349,7 @@ class PhoneAtLocationImporterTests(TestCase):
         phone_data = (OpenReferralCsvPhoneBuilder(self.location).
                         with_phone_type(the_phone_type).
                         build())
-        import_phone(phone_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('phones.csv', [phone_data])
         phones_at_location = PhoneAtLocation.objects.all()
         the_phone_number_type_instance = PhoneNumberType.objects.get(pk=the_phone_type)
         self.assertEqual(phones_at_location[0].phone_number_type, the_phone_number_type_instance)
@@ -386,7 +359,7 @@ class PhoneAtLocationImporterTests(TestCase):
         phone_data = (OpenReferralCsvPhoneBuilder(self.location).
                         with_number(the_phone_number).
                         build())
-        import_phone(phone_data, InactiveRecordsCollector(), ImportCounters())
+        import_rows('phones.csv', [phone_data])
         phones_at_location = PhoneAtLocation.objects.all()
         self.assertEqual(phones_at_location[0].phone_number, the_phone_number)
 
@@ -395,21 +368,21 @@ class TaxonomyImporterTests(TestCase):
     def test_can_import_taxonomy_id_aka_the_vocabulary(self):
         vocabulary = a_string()
         taxonomy_data = OpenReferralCsvTaxonomyBuilder().with_vocabulary(vocabulary).build()
-        import_taxonomy(taxonomy_data, ImportCounters())
+        import_rows('taxonomy.csv', [taxonomy_data])
         taxonomy_terms = TaxonomyTerm.objects.all()
         self.assertEqual(taxonomy_terms[0].taxonomy_id, vocabulary)
 
     def test_can_import_name(self):
         the_name = a_string()
         taxonomy_data = OpenReferralCsvTaxonomyBuilder().with_name(the_name).build()
-        import_taxonomy(taxonomy_data, ImportCounters())
+        import_rows('taxonomy.csv', [taxonomy_data])
         taxonomy_terms = TaxonomyTerm.objects.all()
         self.assertEqual(taxonomy_terms[0].name, the_name)
 
     def test_can_import_taxonomy_term_id(self):
         the_id = a_string()
         taxonomy_data = OpenReferralCsvTaxonomyBuilder().with_taxonomy_term_id(the_id).build()
-        import_taxonomy(taxonomy_data, ImportCounters())
+        import_rows('taxonomy.csv', [taxonomy_data])
         taxonomy_terms = TaxonomyTerm.objects.all()
         self.assertEqual(taxonomy_terms[0].id, the_id)
 
@@ -428,7 +401,7 @@ class ServiceTaxonomyImporterTests(TestCase):
                                  with_taxonomy_term_id(self.taxonomy_term_id).
                                  build())
         csv_data = [service_taxonomy_data]
-        read_and_import_rows(csv_data, InactiveRecordsCollector())
+        import_rows('services_taxonomy.csv', csv_data)
         service = Service.objects.get(pk=self.service_id)
         service_taxonomy_terms = service.taxonomy_terms.all()
         self.assertEqual(service_taxonomy_terms[0], self.taxonomy_term)
@@ -445,7 +418,7 @@ class ServiceTaxonomyImporterTests(TestCase):
                                         with_taxonomy_term_id(second_taxonomy_term_id).
                                         build())
         csv_data = [first_service_taxonomy_data, second_service_taxonomy_data]
-        read_and_import_rows(csv_data, InactiveRecordsCollector())
+        import_rows('services_taxonomy.csv', csv_data)
         service_active_record = Service.objects.get(pk=self.service_id)
         service_taxonomy_terms = service_active_record.taxonomy_terms.all()
         self.assertEqual({self.taxonomy_term.id, second_taxonomy_term.id}, {r.id for r in service_taxonomy_terms})
@@ -464,7 +437,7 @@ class ServiceTaxonomyImporterTests(TestCase):
                                         with_taxonomy_term_id(second_taxonomy_id).
                                         build())
         csv_data = [first_service_taxonomy_data, second_service_taxonomy_data]
-        read_and_import_rows(csv_data, InactiveRecordsCollector())
+        import_rows('services_taxonomy.csv', csv_data)
         first_service = Service.objects.get(pk=self.service_id)
         first_service_taxonomy_terms = first_service.taxonomy_terms.all()
         self.assertEqual(len(first_service_taxonomy_terms), 1)
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from django.test import TestCase
 from common.testhelpers.random_test_values import a_string, an_integer
 from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
@@ -14,12 +16,12 @@ class TestInactiveRecordsCollector(TestCase):
     def test_can_add_inactive_organization_id(self):
         the_id = a_string()
         self.collector.organization_has_inactive_data(the_id, self.the_description)
-        self.assertEqual(self.collector.inactive_organizations_ids[0], the_id)
+        self.assertIn(the_id, self.collector.inactive_organizations_ids)
 
     def test_can_add_inactive_service_id(self):
         the_id = a_string()
         self.collector.service_has_inactive_data(self.organization_id, the_id, self.the_description)
-        self.assertEqual(self.collector.inactive_services_ids[0], the_id)
+        self.assertIn(the_id, self.collector.inactive_services_ids)
 
     def test_can_add_inactive_location_id(self):
         the_id = a_string()
@@ -27,7 +29,7 @@ class TestInactiveRecordsCollector(TestCase):
             self.organization_id,
             the_id,
             self.the_description)
-        self.assertEqual(self.collector.inactive_locations_ids[0], the_id)
+        self.assertIn(the_id, self.collector.inactive_locations_ids)
 
     def test_returns_true_when_organization_id_is_in_inactive_organizations_list(self):
         organization_id = a_string()
@@ -49,3 +51,17 @@ class TestInactiveRecordsCollector(TestCase):
         self.collector.add_inactive_location_id(a_string())
         self.collector.add_inactive_location_id(location_id)
         self.assertTrue(self.collector.has_inactive_location_id(location_id))
+
+    def test_can_save_and_load_inactive_ids(self):
+        organization_id, service_id, location_id = a_string(), a_string(), a_string()
+        self.collector.add_inactive_organization_id(organization_id)
+        self.collector.add_inactive_service_id(service_id)
+        self.collector.add_inactive_location_id(location_id)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'inactive_records.json')
+            self.collector.save(path)
+            loaded_collector = InactiveRecordsCollector.load(path)
+        self.assertTrue(loaded_collector.has_inactive_organization_id(organization_id))
+        self.assertTrue(loaded_collector.has_inactive_service_id(service_id))
+        self.assertTrue(loaded_collector.has_inactive_location_id(location_id))
+        self.assertFalse(loaded_collector.has_inactive_service_id(a_string()))
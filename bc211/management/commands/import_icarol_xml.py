@@ -1,11 +1,19 @@
 import argparse
-from django.core.management.base import BaseCommand
-from bc211.import_icarol_xml.importer import parse_csv, update_all_organizations
+import importlib.util
+import resource
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from bc211.differential_import import RecordChanges
+from bc211.import_icarol_xml.importer import (parse_csv, iterparse_agencies, update_all_organizations,
+                                              update_changed_organizations)
 from bc211.import_icarol_xml.import_counters import ImportCounters
-import xml.etree.ElementTree as etree
+from human_services.locations.search_records import refresh_service_at_location_search_records
+from common.response_cache import bump_data_version
 
 # invoke as follows:
 # python manage.py import_icarol_xml path/to/bc211.xml
+# add --lxml to parse with lxml, which is faster, if installed
+# add --differential to update only what changed since the last differential import
 
 
 class Command(BaseCommand):
@@ -13,12 +21,23 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('file',
-                            type=argparse.FileType('r'),
+                            type=argparse.FileType('rb'),
                             metavar='file',
                             help='Path to XML file containing BC-211 data')
         parser.add_argument('--cityLatLongs',
                             metavar='cityLatLongs',
                             help='Path to CSV file containing city to latlong dictionary')
+        parser.add_argument('--lxml',
+                            action='store_true',
+                            help='Parse the XML with lxml, which must be installed')
+        parser.add_argument('--differential',
+                            action='store_true',
+                            help=('Create, update and delete only the organizations, services and locations '
+                                  'that changed since the last differential import'))
+        parser.add_argument('--manifest',
+                            metavar='manifest',
+                            help=('Path to file to write the ids of created, updated and deleted services to, '
+                                  'one per line, for compute_text_similarity_scores --changed_services'))
 
     def handle(self, *args, **options):
         file = options['file']
@@ -26,10 +45,28 @@ class Command(BaseCommand):
             city_latlong_map = parse_csv(options['cityLatLongs'])
         else:
             city_latlong_map = {}
+        if options['lxml']:
+            check_lxml_installed()
+        if options['manifest'] and not options['differential']:
+            raise CommandError('--manifest is only written with --differential')
         counts = ImportCounters()
-        nodes = etree.iterparse(file, events=('end',))
-        update_all_organizations(nodes, city_latlong_map, counts)
+        nodes = iterparse_agencies(file, use_lxml=options['lxml'])
+        if options['differential']:
+            changes = RecordChanges()
+            update_changed_organizations(nodes, city_latlong_map, counts, changes)
+            self.stdout.write(changes.summary())
+            if options['manifest']:
+                changes.write_manifest(options['manifest'])
+        else:
+            update_all_organizations(nodes, city_latlong_map, counts)
         self.print_status_message(counts)
+        self.stdout.write('Peak memory use {:.0f} MB'.format(get_peak_memory_use_mb()))
+        self.refresh_search_records()
+        bump_data_version()
+
+    def refresh_search_records(self):
+        record_count = refresh_service_at_location_search_records()
+        self.stdout.write('{} service at location search records saved'.format(record_count))
 
     def print_status_message(self, counts):
         message = f'{counts.organizations_created} organizations created. '
@@ -41,3 +78,16 @@ class Command(BaseCommand):
         message += f'and {counts.phone_number_types_count} phone number types created. '
 
         self.stdout.write(self.style.SUCCESS(message))
+
+
+def check_lxml_installed():
+    if importlib.util.find_spec('lxml') is None:
+        raise CommandError('lxml is not installed, install it or leave out --lxml')
+
+
+def get_peak_memory_use_mb():
+    # The most resident memory used by this process so far, reported by the OS in
+    # kilobytes on Linux and in bytes on macOS
+    peak_memory_use = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    bytes_per_unit = 1 if sys.platform == 'darwin' else 1024
+    return peak_memory_use * bytes_per_unit / (1024 * 1024)
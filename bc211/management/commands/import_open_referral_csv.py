@@ -1,11 +1,20 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from bc211.differential_import import RecordChanges
 from bc211.import_icarol_xml.importer import parse_csv
 from bc211.import_icarol_xml.import_counters import ImportCounters
+from bc211.import_open_referral_csv.bulk_importer import OPEN_REFERRAL_FILENAMES
 from bc211.import_open_referral_csv.importer import import_open_referral_files
 from bc211.import_open_referral_csv.inactive_records_collector import InactiveRecordsCollector
+from human_services.locations.search_records import refresh_service_at_location_search_records
+from common.response_cache import bump_data_version
 
 # invoke as follows:
 # python manage.py import_open_referral_csv_data path/to/open/referral/files
+# to save the ids of inactive records for importing some of the files again later:
+# python manage.py import_open_referral_csv_data path/to/files --saveInactiveRecords inactive.json
+# python manage.py import_open_referral_csv_data path/to/files --files phones.csv --loadInactiveRecords inactive.json
+# to update only what changed since the last differential import:
+# python manage.py import_open_referral_csv_data path/to/files --differential --manifest changed_services.txt
 
 
 class Command(BaseCommand):
@@ -18,9 +27,36 @@ class Command(BaseCommand):
         parser.add_argument('--cityLatLongs',
                             metavar='cityLatLongs',
                             help='Path to CSV file containing city to latlong dictionary')
+        parser.add_argument('--files',
+                            nargs='+',
+                            choices=OPEN_REFERRAL_FILENAMES,
+                            help='Import only these files, by default all are imported')
+        parser.add_argument('--saveInactiveRecords',
+                            metavar='saveInactiveRecords',
+                            help='Path to JSON file to save the ids of inactive records to after importing')
+        parser.add_argument('--loadInactiveRecords',
+                            metavar='loadInactiveRecords',
+                            help='Path to JSON file with ids of inactive records saved by an earlier import')
+        parser.add_argument('--workers',
+                            dest='workers',
+                            type=int,
+                            default=1,
+                            help='number of processes to use for reading and validating the files')
+        parser.add_argument('--differential',
+                            action='store_true',
+                            help=('Create, update and delete only the organizations, services and locations '
+                                  'that changed since the last differential import, not used with --files'))
+        parser.add_argument('--manifest',
+                            metavar='manifest',
+                            help=('Path to file to write the ids of created, updated and deleted services to, '
+                                  'one per line, for compute_text_similarity_scores --changed_services'))
 
     def handle(self, *args, **options):
         root_folder = options['path']
+        if options['differential'] and options['files']:
+            raise CommandError('--differential imports all files, and deletes records missing from them')
+        if options['manifest'] and not options['differential']:
+            raise CommandError('--manifest is only written with --differential')
 
         if options['cityLatLongs']:
             city_latlong_map = parse_csv(options['cityLatLongs'])
@@ -28,10 +64,32 @@ class Command(BaseCommand):
             city_latlong_map = {}
 
         self.stdout.write('Importing open referral CSV data from {}'.format(root_folder))
-        collector = InactiveRecordsCollector()
+        if options['loadInactiveRecords']:
+            collector = InactiveRecordsCollector.load(options['loadInactiveRecords'])
+        else:
+            collector = InactiveRecordsCollector()
         counters = ImportCounters()
-        import_open_referral_files(root_folder, collector, counters, city_latlong_map)
+        changes = RecordChanges() if options['differential'] else None
+        timings = import_open_referral_files(root_folder, collector, counters, city_latlong_map,
+                                             options['files'], options['workers'], changes)
         self.print_status_message(counters)
+        if changes:
+            self.stdout.write(changes.summary())
+        if options['manifest']:
+            changes.write_manifest(options['manifest'])
+        self.print_timings(timings)
+        if options['saveInactiveRecords']:
+            collector.save(options['saveInactiveRecords'])
+        self.refresh_search_records()
+        bump_data_version()
+
+    def refresh_search_records(self):
+        record_count = refresh_service_at_location_search_records()
+        self.stdout.write('{} service at location search records saved'.format(record_count))
+
+    def print_timings(self, timings):
+        for stage, seconds in timings.seconds.items():
+            self.stdout.write('{}: {:.1f} seconds'.format(stage, seconds))
 
     def print_status_message(self, counters):
         message = f'{counters.organizations_created} organizations created. '
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRecordHash',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(max_length=20)),
+                ('record_id', models.CharField(max_length=200)),
+                ('hash', models.CharField(max_length=40)),
+            ],
+            options={
+                'unique_together': {('record_type', 'record_id')},
+            },
+        ),
+    ]
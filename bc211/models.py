@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class ImportedRecordHash(models.Model):
+    # The hash of an organization, service or location as of the last differential import,
+    # compared with the hash of the same record in the next import to find what changed
+    record_type = models.CharField(max_length=20)
+    record_id = models.CharField(max_length=200)
+    hash = models.CharField(max_length=40)
+
+    class Meta:
+        unique_together = ('record_type', 'record_id')
@@ -0,0 +1,66 @@
+import os
+import tempfile
+from django.test import TestCase
+from bc211.differential_import import SERVICE, ORGANIZATION, RecordChanges, compute_record_hash
+from bc211.models import ImportedRecordHash
+from common.testhelpers.random_test_values import a_string
+from human_services.organizations.models import Organization
+from human_services.organizations.tests.helpers import OrganizationBuilder
+
+
+class TestComputeRecordHash(TestCase):
+    def test_is_same_for_same_values(self):
+        self.assertEqual(compute_record_hash('a', None, 1.5), compute_record_hash('a', None, 1.5))
+
+    def test_tells_none_from_empty_string(self):
+        self.assertNotEqual(compute_record_hash(None), compute_record_hash(''))
+
+    def test_tells_values_apart_however_joined(self):
+        self.assertNotEqual(compute_record_hash('a', 'b'), compute_record_hash('ab', ''))
+
+
+class TestRecordChanges(TestCase):
+    def test_finds_records_unchanged_since_last_import(self):
+        record_id, record_hash = a_string(), a_string()
+        changes = RecordChanges()
+        changes.add_created(SERVICE, record_id, record_hash)
+        changes.save_hashes()
+
+        changes = RecordChanges()
+
+        self.assertTrue(changes.is_unchanged(SERVICE, record_id, record_hash))
+        self.assertFalse(changes.is_unchanged(SERVICE, record_id, a_string()))
+        self.assertEqual(ImportedRecordHash.objects.get().record_id, record_id)
+
+    def test_writes_changed_service_ids_one_per_line(self):
+        created_id, updated_id = 'b' + a_string(), 'a' + a_string()
+        changes = RecordChanges()
+        changes.add_created(SERVICE, created_id, a_string())
+        changes.add_updated(SERVICE, updated_id, a_string())
+        changes.add_kept(SERVICE, a_string())
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'changed_services.txt')
+            changes.write_manifest(path)
+            with open(path) as file:
+                self.assertEqual(file.read(), updated_id + '\n' + created_id + '\n')
+
+    def test_deletes_records_missing_from_import(self):
+        kept_organization = OrganizationBuilder().create()
+        removed_organization = OrganizationBuilder().create()
+        changes = RecordChanges()
+        changes.add_kept(ORGANIZATION, kept_organization.id)
+
+        changes.delete_removed_records()
+
+        self.assertEqual(Organization.objects.get().id, kept_organization.id)
+        self.assertEqual(changes.deleted[ORGANIZATION], {removed_organization.id})
+
+    def test_does_not_delete_records_after_errors(self):
+        OrganizationBuilder().create()
+        changes = RecordChanges()
+        changes.count_error()
+
+        changes.delete_removed_records()
+
+        self.assertEqual(Organization.objects.count(), 1)
@@ -1,4 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save
+from common.response_cache import bump_data_version
 
 class CommonConfig(AppConfig):
     name = 'common'
+
+    def ready(self):
+        # Changes made in the admin site are logged, which is when cached API responses
+        # need to be invalidated outside of the import commands
+        from django.contrib.admin.models import LogEntry
+        post_save.connect(bump_data_version_on_admin_change, sender=LogEntry,
+                          dispatch_uid='bump_data_version_on_admin_change')
+
+
+def bump_data_version_on_admin_change(**kwargs):
+    bump_data_version()
@@ -1,4 +1,5 @@
 from drf_yasg2 import openapi
+from common.text_search import SEARCH_MODES
 
 
 def get_proximity_sort_manual_parameter():
@@ -58,6 +59,17 @@ def get_taxonomy_terms_manual_parameter():
                               pattern=r'^[\w\-]+\.[\w\-]+(\W*,\W*[\w\-]+\.[\w\-]+)*$'))
 
 
+def get_search_mode_manual_parameter():
+    return (openapi.Parameter('search_mode',
+                              openapi.IN_QUERY,
+                              description=('How to match the search terms. With "full_text", the default, '
+                                           'terms match words in names and descriptions. With "fuzzy", the '
+                                           'terms match names with similar spelling, for finding services '
+                                           'when the terms are misspelled.'),
+                              type=openapi.TYPE_STRING,
+                              enum=SEARCH_MODES))
+
+
 def get_page_manual_parameter():
     return (openapi.Parameter('page',
                               openapi.IN_QUERY,
@@ -70,6 +82,29 @@ def get_page_manual_parameter():
                               pattern=r'^[1-9][0-9]*$'))
 
 
+def get_cursor_pagination_manual_parameters():
+    return [openapi.Parameter('pagination',
+                              openapi.IN_QUERY,
+                              description=('Set to "cursor" to page through the result with the next links in the '
+                                           'Link header instead of by page number, which is faster for pages deep '
+                                           'into the result. The Link header then has links to the first and next '
+                                           'pages only.'),
+                              type=openapi.TYPE_STRING,
+                              enum=['cursor']),
+            openapi.Parameter('cursor',
+                              openapi.IN_QUERY,
+                              description=('Position in the result with pagination=cursor, taken from the links in '
+                                           'the Link header of the previous page.'),
+                              type=openapi.TYPE_STRING),
+            openapi.Parameter('count',
+                              openapi.IN_QUERY,
+                              description=('With pagination=cursor, whether the Count header has the "exact" number '
+                                           'of entries in the result, the default, an "estimate", which is faster, '
+                                           'or is left out with "none".'),
+                              type=openapi.TYPE_STRING,
+                              enum=['exact', 'estimate', 'none'])]
+
+
 def get_region_filter_manual_parameter():
     return (openapi.Parameter('region',
                               openapi.IN_QUERY,
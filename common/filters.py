@@ -1,13 +1,19 @@
 from rest_framework import filters, serializers
 from config.settings.base import SRID
+from django.conf import settings
 from django.contrib.gis.geos import Point
-from django.db.models import F
-from django.contrib.gis.db.models.functions import Distance
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.gis.measure import Distance as DistanceMeasure
 from content.models import Alert
 from common.filter_parameter_parsers import ProximityParser, TaxonomyParser
+from common.geography import distance_from_point, within_meters_of_point
+from common.text_search import (search_translations, fuzzy_search_translations, SEARCH_RANK_FIELD,
+                                SEARCH_MODES, FULL_TEXT_SEARCH_MODE, FUZZY_SEARCH_MODE)
 from human_services.locations.models import ServiceAtLocation
+from human_services.locations.search_records import to_search_record_taxonomy_term
 from human_services.services.models import Service
+from search.models import TaskServiceSimilarityScore
 
 
 class MultiFieldOrderingFilter(filters.OrderingFilter):
@@ -37,11 +43,50 @@ class MultiFieldOrderingFilter(filters.OrderingFilter):
         return self.REVERSE_SORT_PREFIX + argument if reverse_sort else argument
 
 
+def uses_search_records(view):
+    # Views listing services at location can answer from the denormalized search records
+    # instead of joining services, locations, translations and taxonomy terms
+    return getattr(view, 'uses_search_records', False)
+
+
+def filter_by_search_record(queryset, record_matches, fallback_matches):
+    # Services at location without a search record, added since the records were rebuilt or
+    # whose record was deleted by the triggers of locations migration 0026 when the data it
+    # was copied from changed, are matched on the other tables instead of left out
+    return queryset.filter(record_matches | (Q(search_record__isnull=True) & fallback_matches))
+
+
+def get_point_field(view):
+    if uses_search_records(view):
+        return Coalesce(F('search_record__point'), F('location__point'))
+    return 'location__point'
+
+
 class SearchFilter(filters.SearchFilter):
     search_description = ('Search terms for full text search. Enter one or more terms separated '
-                          'by space or comma. Logical AND is implied among the terms. TODO '
-                          'currently only looks in name and description, make it look more '
-                          'widely.')
+                          'by space or comma. Logical AND is implied among the terms. A term '
+                          'matches words with the same stem in the language of the text, and words '
+                          'starting with the term. Results are sorted by relevance, use '
+                          + SEARCH_RANK_FIELD + ' to sort by relevance among other fields. TODO '
+                          'currently only looks in name, alternate name and description, make it '
+                          'look more widely.')
+
+    def filter_queryset(self, request, queryset, view):
+        text_search_fields = getattr(view, 'text_search_fields', None)
+        if not text_search_fields:
+            return super().filter_queryset(request, queryset, view)
+        terms = self.get_search_terms(request)
+        if self.get_search_mode(request) == FUZZY_SEARCH_MODE:
+            return fuzzy_search_translations(queryset, text_search_fields, terms,
+                                             settings.FUZZY_SEARCH_SIMILARITY_THRESHOLD)
+        return search_translations(queryset, text_search_fields, terms)
+
+    def get_search_mode(self, request):
+        search_mode = request.query_params.get('search_mode', FULL_TEXT_SEARCH_MODE)
+        if search_mode not in SEARCH_MODES:
+            message = 'Invalid value for search_mode, must be one of ' + ', '.join(SEARCH_MODES)
+            raise serializers.ValidationError(message)
+        return search_mode
 
 
 class TopicSimilarityAndProximitySortFilter(filters.BaseFilterBackend):
@@ -58,24 +103,39 @@ class TopicSimilarityAndProximitySortFilter(filters.BaseFilterBackend):
         topic_id = request.query_params.get('related_to_topic', None)
 
         if proximity_parameter and topic_id:
-            return self.sort_by_proximity_and_topic(queryset, proximity_parameter, topic_id)
+            return self.sort_by_proximity_and_topic(queryset, proximity_parameter, topic_id,
+                                                    get_point_field(view))
 
         if topic_id:
             return self.sort_by_topic_similarity(queryset, topic_id)
 
         if proximity_parameter:
-            return self.sort_by_proximity(queryset, proximity_parameter)
+            return self.sort_by_proximity(queryset, proximity_parameter, get_point_field(view))
 
         return queryset
 
-    def sort_by_proximity_and_topic(self, queryset, proximity_parameter, topic_id):
+    def sort_by_proximity_and_topic(self, queryset, proximity_parameter, topic_id, point_field):
+        # Ranks by distance in meters divided by similarity to the topic. Only services with a
+        # score for the topic are looked at, found from the unique index on task and service,
+        # and of those only the TOPIC_PROXIMITY_CANDIDATE_COUNT nearest, read from the spatial
+        # index, are ranked. Must run after all other filters, so that the nearest candidates
+        # are picked among the rows that are returned
         reference_point = self.to_point(proximity_parameter)
+        distance = distance_from_point(point_field, reference_point)
+        scores = TaskServiceSimilarityScore.objects.filter(task_id=topic_id)
+        queryset = queryset.filter(service_id__in=scores.values('service_id'))
+
+        candidate_count = settings.TOPIC_PROXIMITY_CANDIDATE_COUNT
+        if candidate_count:
+            candidates = queryset.order_by(distance).values('pk')[:candidate_count]
+            queryset = queryset.filter(pk__in=candidates)
+
+        score = scores.filter(service_id=OuterRef('service_id')).values('similarity_score')[:1]
         return (queryset.
-                annotate(distance=Distance('location__point', reference_point)).
-                annotate(inverse_score=F('distance')/F('service__taskservicesimilarityscore__similarity_score')).
-                annotate(task_id=F('service__taskservicesimilarityscore__task_id')).
-                filter(task_id__exact=topic_id).
-                order_by('inverse_score'))
+                annotate(distance=distance).
+                annotate(similarity_score=Subquery(score)).
+                annotate(inverse_score=F('distance')/F('similarity_score')).
+                order_by('inverse_score', 'pk'))
 
     def to_point(self, proximity_parameter):
         proximity = ProximityParser(proximity_parameter)
@@ -88,10 +148,10 @@ class TopicSimilarityAndProximitySortFilter(filters.BaseFilterBackend):
                 filter(task_id__exact=topic_id).
                 order_by('-score'))
 
-    def sort_by_proximity(self, queryset, proximity_parameter):
+    def sort_by_proximity(self, queryset, proximity_parameter, point_field):
         reference_point = self.to_point(proximity_parameter)
         return (queryset
-                .annotate(distance=Distance('location__point', reference_point))
+                .annotate(distance=distance_from_point(point_field, reference_point))
                 .order_by('distance'))
 
 
@@ -106,9 +166,15 @@ class ProximityCutoffFilter(filters.BaseFilterBackend):
             radius_km = self.get_valid_radius_km(request)
             location = ProximityParser(user_location)
             location_point = Point(location.latitude, location.longitude, srid=SRID)
-            queryset = (queryset
-                        .annotate(distance=Distance('location__point', location_point))
-                        .filter(distance__lte=DistanceMeasure(km=radius_km)))
+            meters = DistanceMeasure(km=radius_km).m
+            if uses_search_records(view):
+                # Rather than get_point_field(), so that each condition is answered from an index
+                return filter_by_search_record(queryset,
+                                               Q(within_meters_of_point('search_record__point', location_point,
+                                                                        meters)),
+                                               Q(within_meters_of_point('location__point', location_point,
+                                                                        meters)))
+            queryset = queryset.filter(within_meters_of_point(get_point_field(view), location_point, meters))
         return queryset
 
     def get_valid_radius_km(self, request):
@@ -138,6 +204,14 @@ class TaxonomyFilter(filters.BaseFilterBackend):
         taxonomy_parameter = request.query_params.get('taxonomy_terms', None)
         if taxonomy_parameter:
             taxonomy_terms = TaxonomyParser(taxonomy_parameter).terms
+            if queryset.model is ServiceAtLocation and uses_search_records(view):
+                terms = [to_search_record_taxonomy_term(term[0], term[1]) for term in taxonomy_terms]
+                services = Service.objects.all()
+                for term in taxonomy_terms:
+                    services = services.filter(taxonomy_terms__taxonomy_id=term[0], taxonomy_terms__name=term[1])
+                return filter_by_search_record(queryset,
+                                               Q(search_record__taxonomy_terms__contains=terms),
+                                               Q(service_id__in=services.values('id')))
             for term in taxonomy_terms:
                 if queryset.model is Service:
                     queryset = queryset.filter(taxonomy_terms__taxonomy_id=term[0],
@@ -193,7 +267,11 @@ class RegionFilter(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
         region = request.query_params.get('region', None)
         if region:
-            if queryset.model is ServiceAtLocation:
-                service_id_suffix = '_{0}'.format(region.lower())
+            service_id_suffix = '_{0}'.format(region.lower())
+            if queryset.model is ServiceAtLocation and uses_search_records(view):
+                queryset = filter_by_search_record(queryset,
+                                                   Q(search_record__region=region.lower()),
+                                                   Q(service_id__id__endswith=service_id_suffix))
+            elif queryset.model is ServiceAtLocation:
                 queryset = queryset.filter(service_id__id__endswith=service_id_suffix)
         return queryset
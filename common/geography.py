@@ -0,0 +1,43 @@
+from django.contrib.gis.db.models import PointField
+from django.db.models import BooleanField, F, FloatField, Func, Value
+
+# Matches the expression of the GiST index added in locations migration 0022, queries
+# must use the same cast for the index to be used
+GEOGRAPHY_CAST = '%(expressions)s::geography'
+
+
+class ToGeography(Func):
+    template = GEOGRAPHY_CAST
+    output_field = PointField(geography=True)
+
+
+class GeographyDistance(Func):
+    # The PostGIS KNN operator, distance in meters on the spheroid. When ordered by,
+    # the rows are read from the GiST index nearest first, rather than computing the
+    # distance to every row and sorting
+    arg_joiner = ' <-> '
+    template = '%(expressions)s'
+    output_field = FloatField()
+
+
+class WithinGeographyDistance(Func):
+    # True for rows within the given number of meters, answered from the GiST index
+    function = 'ST_DWithin'
+    output_field = BooleanField()
+
+
+def to_geography(point):
+    return ToGeography(Value(point.ewkt))
+
+
+def to_point_expression(field):
+    # Fields are given by name or as an expression, e.g. to use one of two point fields
+    return F(field) if isinstance(field, str) else field
+
+
+def distance_from_point(field, point):
+    return GeographyDistance(ToGeography(to_point_expression(field)), to_geography(point))
+
+
+def within_meters_of_point(field, point, meters):
+    return WithinGeographyDistance(ToGeography(to_point_expression(field)), to_geography(point), Value(meters))
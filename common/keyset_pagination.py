@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ParseError
+
+# Types of sort keys that can be written to a cursor and compared in a query, with None
+# for NULL, e.g. the distance to locations without a point
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None))
+
+errors = {
+    'invalid_cursor': 'Invalid cursor, use the links returned with the previous page',
+    'unsupported_ordering': 'Cursor pagination is not available for this sort order',
+}
+
+
+def get_keyset_ordering(queryset):
+    # The sort keys of the queryset as (field name, descending) pairs, with the primary key
+    # added last unless already there, so that the order of all rows is well defined
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not all(isinstance(field, str) for field in ordering):
+        raise ParseError(errors['unsupported_ordering'])
+
+    result = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+    primary_key_names = ('pk', queryset.model._meta.pk.name)
+    if not any(name in primary_key_names for name, _ in result):
+        result.append(('pk', False))
+    if any('__' in name or name == '?' for name, _ in result):
+        raise ParseError(errors['unsupported_ordering'])
+    return result
+
+
+def order_by_keyset(queryset, ordering):
+    # NULLs sort last in both directions, as filter_after_keyset() expects
+    return queryset.order_by(*[F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+                               for name, descending in ordering])
+
+
+def filter_after_keyset(queryset, ordering, values):
+    # Rows sorting after the given values, i.e. a > x, or a = x and b > y, etc., with
+    # < for descending keys. NULLs sort after all values, and equal each other. Indexes on
+    # the sort keys answer this without an OFFSET scan
+    after = Q()
+    equal = Q()
+    for (name, descending), value in zip(ordering, values):
+        if value is None:
+            equal &= Q(**{name + '__isnull': True})
+            continue
+        lookup = name + ('__lt' if descending else '__gt')
+        after |= equal & (Q(**{lookup: value}) | Q(**{name + '__isnull': True}))
+        equal &= Q(**{name: value})
+    return queryset.filter(after)
+
+
+def get_keyset_values(instance, ordering):
+    values = [getattr(instance, name) for name, _ in ordering]
+    if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise ParseError(errors['unsupported_ordering'])
+    return values
+
+
+def encode_cursor(ordering, values):
+    data = {'ordering': [[name, descending] for name, descending in ordering], 'values': values}
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, ordering):
+    # Returns the sort key values in the cursor, which must be for the same sort order
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        cursor_ordering = [(name, descending) for name, descending in data['ordering']]
+        values = data['values']
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ParseError(errors['invalid_cursor'])
+    if cursor_ordering != ordering or len(values) != len(ordering):
+        raise ParseError(errors['invalid_cursor'])
+    return values
+
+
+def estimate_count(queryset):
+    # The number of rows the query planner expects, from table statistics, which is far
+    # cheaper than counting the rows but can be off, especially with many filters
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
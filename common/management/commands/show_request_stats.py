@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from common.request_stats import get_request_stats, reset_request_stats
+
+# invoke as follows, with INSTRUMENT_API_REQUESTS set for the server:
+# python manage.py show_request_stats --sort db
+
+
+SORT_COLUMNS = {
+    'requests': lambda totals: totals['requests'],
+    'queries': lambda totals: average(totals, 'queries'),
+    'db': lambda totals: average(totals, 'db_us'),
+    'serialize': lambda totals: average(totals, 'serialize_us'),
+    'total': lambda totals: average(totals, 'total_us'),
+}
+
+
+class Command(BaseCommand):
+    help = ('Show the number of requests and the average query count, database time, serializer '
+            'time, rendering time, total time and response size per route under /v1/, as recorded '
+            'since the last reset when INSTRUMENT_API_REQUESTS is set')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort',
+                            dest='sort',
+                            choices=sorted(SORT_COLUMNS),
+                            default='total',
+                            help='column to sort routes by, largest first')
+        parser.add_argument('--reset',
+                            action='store_true',
+                            help='clear the totals after showing them')
+
+    def handle(self, *args, **options):
+        stats = get_request_stats()
+        by_sort_column = SORT_COLUMNS[options['sort']]
+        self.stdout.write('{:>8} {:>8} {:>8} {:>13} {:>10} {:>9} {:>9}  {}'.format(
+            'requests', 'queries', 'db ms', 'serialize ms', 'render ms', 'total ms', 'kB', 'route'))
+        for route, totals in sorted(stats.items(), key=lambda item: by_sort_column(item[1]), reverse=True):
+            self.stdout.write('{:>8} {:>8.1f} {:>8.1f} {:>13.1f} {:>10.1f} {:>9.1f} {:>9.1f}  {}'.format(
+                totals['requests'],
+                average(totals, 'queries'),
+                average(totals, 'db_us') / 1000,
+                average(totals, 'serialize_us') / 1000,
+                average(totals, 'render_us') / 1000,
+                average(totals, 'total_us') / 1000,
+                average(totals, 'bytes') / 1024,
+                route))
+        if options['reset']:
+            reset_request_stats()
+            self.stdout.write(self.style.SUCCESS('Request stats reset'))
+
+
+def average(totals, metric):
+    return totals[metric] / totals['requests'] if totals['requests'] else 0.0
@@ -0,0 +1,76 @@
+import contextlib
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from common.request_stats import QueryTimer, RequestStats
+
+INSTRUMENTED_PATH_PREFIX = '/v1/'
+
+
+class RequestTimingMiddleware:
+    # Measures the queries, database time, serializer time, rendering time and size of
+    # responses under /v1/, sends them in a Server-Timing header, and adds them to the
+    # totals per route shown by the show_request_stats command. Left out of the middleware
+    # chain entirely unless INSTRUMENT_API_REQUESTS is set. Serializer time is recorded by
+    # common.view.SerializerTimingMixin, and includes the time of the queries serializers
+    # make, which also count as database time
+    def __init__(self, get_response):
+        if not settings.INSTRUMENT_API_REQUESTS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.stats = RequestStats(settings.API_REQUEST_STATS_FLUSH_INTERVAL)
+
+    def __call__(self, request):
+        if not request.path.startswith(INSTRUMENTED_PATH_PREFIX):
+            return self.get_response(request)
+
+        start_time = time.perf_counter()
+        query_timer = QueryTimer()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_timer))
+            response = self.get_response(request)
+        total_time = time.perf_counter() - start_time
+
+        serializer_time = getattr(request, 'serializer_time', 0.0)
+        render_time = getattr(request, 'render_time', 0.0)
+        response['Server-Timing'] = ', '.join([
+            'db;dur={:.1f};desc="{} queries"'.format(1000 * query_timer.duration, query_timer.count),
+            'serialize;dur={:.1f}'.format(1000 * serializer_time),
+            'render;dur={:.1f}'.format(1000 * render_time),
+            'total;dur={:.1f}'.format(1000 * total_time),
+        ])
+        self.stats.add(get_route(request), {
+            'requests': 1,
+            'queries': query_timer.count,
+            'db_us': to_microseconds(query_timer.duration),
+            'serialize_us': to_microseconds(serializer_time),
+            'render_us': to_microseconds(render_time),
+            'total_us': to_microseconds(total_time),
+            'bytes': 0 if response.streaming else len(response.content),
+        })
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before rendering responses that render late, as REST framework
+        # responses do
+        start_time = time.perf_counter()
+
+        def set_render_time(response):
+            request.render_time = time.perf_counter() - start_time
+
+        response.add_post_render_callback(set_render_time)
+        return response
+
+
+def get_route(request):
+    # The URL pattern, so that all requests for e.g. one topic count together
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return 'unresolved'
+    return resolver_match.route or resolver_match.view_name
+
+
+def to_microseconds(seconds):
+    return int(seconds * 1000000)
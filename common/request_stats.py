@@ -0,0 +1,90 @@
+import threading
+import time
+from django.core.cache import cache
+
+STATS_KEY_PREFIX = 'request_stats'
+ROUTES_KEY = STATS_KEY_PREFIX + ':routes'
+
+# Totals kept per route, times are in microseconds so that they can be added up with
+# cache.incr, which only works on integers
+METRICS = ['requests', 'queries', 'db_us', 'serialize_us', 'render_us', 'total_us', 'bytes']
+
+
+class QueryTimer:
+    # For connection.execute_wrapper(), counts the queries and adds up their time
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start_time
+            self.count += 1
+
+
+class RequestStats:
+    # Totals per route for this process, added to the totals in the cache at most once
+    # per flush interval, so that requests do not wait on the cache. The totals in the
+    # cache are for all processes, as long as the cache is shared, as in production
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.totals = {}
+        self.last_flush_time = time.monotonic()
+
+    def add(self, route, measurements):
+        with self.lock:
+            totals = self.totals.setdefault(route, dict.fromkeys(METRICS, 0))
+            for metric, value in measurements.items():
+                totals[metric] += value
+            if time.monotonic() - self.last_flush_time < self.flush_interval:
+                return
+            totals_to_flush, self.totals = self.totals, {}
+            self.last_flush_time = time.monotonic()
+        self.flush(totals_to_flush)
+
+    def flush(self, totals):
+        add_routes(totals.keys())
+        for route, route_totals in totals.items():
+            for metric, value in route_totals.items():
+                increment(build_stats_key(route, metric), value)
+
+
+def build_stats_key(route, metric):
+    return '{}:{}:{}'.format(STATS_KEY_PREFIX, metric, route)
+
+
+def increment(key, value):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        # Evicted since added
+        cache.set(key, value, timeout=None)
+
+
+def add_routes(routes):
+    known_routes = set(cache.get(ROUTES_KEY, []))
+    if not known_routes.issuperset(routes):
+        cache.set(ROUTES_KEY, sorted(known_routes.union(routes)), timeout=None)
+
+
+def get_request_stats():
+    # Totals per route in the cache, as a dict of dicts keyed by route and metric
+    routes = cache.get(ROUTES_KEY, [])
+    keys = {build_stats_key(route, metric): (route, metric) for route in routes for metric in METRICS}
+    values = cache.get_many(list(keys))
+    result = {route: dict.fromkeys(METRICS, 0) for route in routes}
+    for key, value in values.items():
+        route, metric = keys[key]
+        result[route][metric] = value
+    return result
+
+
+def reset_request_stats():
+    routes = cache.get(ROUTES_KEY, [])
+    cache.delete_many([build_stats_key(route, metric) for route in routes for metric in METRICS])
+    cache.delete(ROUTES_KEY)
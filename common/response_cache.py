@@ -0,0 +1,99 @@
+import datetime
+import hashlib
+import time
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+
+DATA_VERSION_KEY = 'data_version'
+RESPONSE_KEY_PREFIX = 'response'
+
+# Set by common.view.Pagination, which also sets the links that the Link header is built
+# from. Those are cached instead of the header, whose URLs are those of the request
+CACHED_HEADERS = ['Count']
+
+COORDINATE_PARAMETERS = ['proximity', 'user_location']
+
+
+def get_data_version():
+    # The data version is also the time of the last change, in milliseconds since the epoch
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        version = new_data_version()
+        if not cache.add(DATA_VERSION_KEY, version, timeout=None):
+            version = cache.get(DATA_VERSION_KEY, version)
+    return version
+
+
+def bump_data_version():
+    # Call after changing data that is served by the API. Responses cached for earlier
+    # versions are not read again, and are left to expire
+    cache.set(DATA_VERSION_KEY, max(get_data_version() + 1, new_data_version()), timeout=None)
+
+
+def new_data_version():
+    # Used when the cache has no version, e.g. after a restart or an eviction. Based on
+    # the time, so as not to reuse versions of responses that may still be cached
+    return int(time.time() * 1000)
+
+
+def get_data_modified_time(request, *args, **kwargs):
+    return datetime.datetime.fromtimestamp(get_data_version() / 1000, tz=datetime.timezone.utc)
+
+
+def build_etag(request, *args, **kwargs):
+    # Strong, since responses are the same for the same data version and normalized
+    # request, coordinates are not rounded as they are for the cache key
+    parts = [str(get_data_version()), request.get_host(), request.path, translation.get_language() or '',
+             normalize_query_parameters(request.query_params, coordinate_decimals=None)]
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def build_response_key(request):
+    # Responses differ by language, and by host through the links in the Link header, which
+    # are otherwise built for each request
+    parts = [request.get_host(), request.path, translation.get_language() or '',
+             normalize_query_parameters(request.query_params,
+                                        settings.API_RESPONSE_CACHE_COORDINATE_DECIMALS)]
+    digest = hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+    return RESPONSE_KEY_PREFIX + ':' + digest
+
+
+def normalize_query_parameters(query_params, coordinate_decimals):
+    parameters = []
+    for name in sorted(query_params.keys()):
+        values = (normalize_query_parameter(name, value, coordinate_decimals)
+                  for value in query_params.getlist(name))
+        parameters += [(name, value) for value in sorted(values)]
+    return urlencode(parameters)
+
+
+def normalize_query_parameter(name, value, coordinate_decimals):
+    value = ' '.join(value.split())
+    if name in COORDINATE_PARAMETERS and coordinate_decimals is not None:
+        return round_coordinates(value, coordinate_decimals)
+    return value
+
+
+def round_coordinates(value, decimals):
+    # Points closer than the precision share responses, so one response is computed for
+    # all of them. Values that are not coordinates are left for the filters to reject
+    try:
+        coordinates = [float(coordinate) for coordinate in value.split(',')]
+    except ValueError:
+        return value
+    return ','.join('{:.{}f}'.format(coordinate, decimals) for coordinate in coordinates)
+
+
+def get_cached_response_data(request, version):
+    # Returns the data, headers and pagination links of the response cached for the
+    # request, or None
+    return cache.get(build_response_key(request), version=version)
+
+
+def cache_response_data(request, response, version):
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    links = getattr(response, 'pagination_links', [])
+    cache.set(build_response_key(request), (response.data, headers, links),
+              timeout=settings.API_RESPONSE_CACHE_TIMEOUT, version=version)
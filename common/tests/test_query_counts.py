@@ -0,0 +1,110 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import test as rest_test
+from rest_framework import status
+from common.testhelpers.random_test_values import a_string, a_float
+from content.tests.helpers import AlertBuilder
+from human_services.addresses.models import AddressType
+from human_services.addresses.tests.helpers import AddressBuilder
+from human_services.locations.models import LocationAddress, ServiceAtLocation
+from human_services.locations.tests.helpers import LocationBuilder
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.phone_at_location.tests.helpers import PhoneAtLocationBuilder
+from human_services.services.tests.helpers import ServiceBuilder
+from human_services.services_at_location.tests.helpers import set_service_similarity_score
+from newcomers_guide.tests.helpers import create_topic
+from search.models import TaskSimilarityScore
+
+
+# The number of queries to serve a page must not grow with the number of rows on it,
+# each test checks that a page of three rows takes as many queries as a page of one
+class QueryCountTests(rest_test.APITestCase):
+    def setUp(self):
+        self.organization = OrganizationBuilder().create()
+        self.topic = create_topic(a_string())
+
+    def create_service(self):
+        service = ServiceBuilder(self.organization).create()
+        set_service_similarity_score(self.topic.id, service.id, a_float())
+        return service
+
+    def create_location(self, organization=None):
+        location = LocationBuilder(organization or self.organization).create()
+        LocationAddress(location=location,
+                        address=AddressBuilder().create(),
+                        address_type=AddressType.objects.get(pk='physical_address')).save()
+        PhoneAtLocationBuilder(location).create()
+        return location
+
+    def create_service_at_location(self):
+        organization = OrganizationBuilder().create()
+        ServiceAtLocation.objects.create(service=ServiceBuilder(organization).create(),
+                                         location=self.create_location(organization))
+
+    def create_related_topic(self):
+        TaskSimilarityScore(first_task=self.topic, second_task=create_topic(a_string()),
+                            similarity_score=a_float()).save()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def assert_query_count_does_not_grow(self, url, create_row):
+        create_row()
+        query_count_for_one_row = self.count_queries(url)
+        create_row()
+        create_row()
+        self.assertEqual(len(self.client.get(url).json()), 3)
+        self.assertEqual(self.count_queries(url), query_count_for_one_row)
+
+    def test_services(self):
+        self.assert_query_count_does_not_grow('/v1/services/', self.create_service)
+
+    def test_services_under_organization(self):
+        url = '/v1/organizations/{0}/services/'.format(self.organization.id)
+        self.assert_query_count_does_not_grow(url, self.create_service)
+
+    def test_locations(self):
+        self.assert_query_count_does_not_grow('/v1/locations/', self.create_location)
+
+    def test_locations_under_organization(self):
+        url = '/v1/organizations/{0}/locations/'.format(self.organization.id)
+        self.assert_query_count_does_not_grow(url, self.create_location)
+
+    def test_organizations(self):
+        # setUp creates the first organization
+        self.organization.delete()
+        self.assert_query_count_does_not_grow('/v1/organizations/',
+                                              lambda: OrganizationBuilder().create())
+
+    def test_services_at_location(self):
+        self.assert_query_count_does_not_grow('/v1/services_at_location/',
+                                              self.create_service_at_location)
+
+    def test_topics(self):
+        self.topic.delete()
+        self.assert_query_count_does_not_grow('/v1/topics/', lambda: create_topic(a_string()))
+
+    def test_related_topics(self):
+        url = '/v1/topics/{0}/related_topics/'.format(self.topic.id)
+        self.assert_query_count_does_not_grow(url, self.create_related_topic)
+
+    def test_related_services(self):
+        url = '/v1/topics/{0}/related_services/'.format(self.topic.id)
+        self.assert_query_count_does_not_grow(url, self.create_service)
+
+    def test_topics_for_service(self):
+        service = ServiceBuilder(self.organization).create()
+        url = '/v1/services/{0}/related_topics/'.format(service.id)
+
+        def create_related_topic():
+            set_service_similarity_score(create_topic(a_string()).id, service.id, a_float())
+
+        self.topic.delete()
+        self.assert_query_count_does_not_grow(url, create_related_topic)
+
+    def test_alerts(self):
+        self.assert_query_count_does_not_grow('/v1/content/alerts/en/',
+                                              lambda: AlertBuilder().create())
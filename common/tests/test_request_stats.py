@@ -0,0 +1,77 @@
+import io
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import test as rest_test
+from common.request_stats import RequestStats, get_request_stats, reset_request_stats
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.services.tests.helpers import ServiceBuilder
+
+
+class TestRequestStats(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_adds_totals_to_cache_after_flush_interval(self):
+        stats = RequestStats(flush_interval=0)
+        stats.add('route', {'requests': 1, 'queries': 3})
+        stats.add('route', {'requests': 1, 'queries': 5})
+        self.assertEqual(get_request_stats()['route']['requests'], 2)
+        self.assertEqual(get_request_stats()['route']['queries'], 8)
+
+    def test_keeps_totals_in_process_until_flush_interval(self):
+        stats = RequestStats(flush_interval=60)
+        stats.add('route', {'requests': 1, 'queries': 3})
+        self.assertEqual(get_request_stats(), {})
+
+    def test_adds_totals_from_different_processes(self):
+        RequestStats(flush_interval=0).add('route', {'requests': 1})
+        RequestStats(flush_interval=0).add('route', {'requests': 1})
+        self.assertEqual(get_request_stats()['route']['requests'], 2)
+
+    def test_can_reset_totals(self):
+        stats = RequestStats(flush_interval=0)
+        stats.add('route', {'requests': 1})
+        reset_request_stats()
+        self.assertEqual(get_request_stats(), {})
+        stats.add('route', {'requests': 1})
+        self.assertEqual(get_request_stats()['route']['requests'], 1)
+
+
+@override_settings(INSTRUMENT_API_REQUESTS=True, API_REQUEST_STATS_FLUSH_INTERVAL=0)
+class TestRequestTimingMiddleware(rest_test.APITestCase):
+    def setUp(self):
+        cache.clear()
+        organization = OrganizationBuilder().create()
+        ServiceBuilder(organization).create()
+
+    def test_sends_server_timing_header(self):
+        server_timing = self.client.get('/v1/services/')['Server-Timing']
+        self.assertRegex(server_timing, r'db;dur=[0-9.]+;desc="[1-9][0-9]* queries"')
+        self.assertRegex(server_timing, r'serialize;dur=[0-9.]+')
+        self.assertRegex(server_timing, r'render;dur=[0-9.]+')
+        self.assertRegex(server_timing, r'total;dur=[0-9.]+')
+
+    def test_records_totals_per_route(self):
+        response = self.client.get('/v1/services/')
+        self.client.get('/v1/services/')
+        self.client.get('/v1/organizations/')
+
+        services_stats = [totals for route, totals in get_request_stats().items() if 'services' in route]
+        self.assertEqual(len(services_stats), 1)
+        self.assertEqual(services_stats[0]['requests'], 2)
+        self.assertEqual(services_stats[0]['bytes'], 2 * len(response.content))
+        self.assertGreater(services_stats[0]['queries'], 0)
+        self.assertGreater(services_stats[0]['serialize_us'], 0)
+
+    def test_can_show_totals(self):
+        self.client.get('/v1/services/')
+        output = io.StringIO()
+        call_command('show_request_stats', stdout=output)
+        self.assertIn('services', output.getvalue())
+
+    @override_settings(INSTRUMENT_API_REQUESTS=False)
+    def test_does_nothing_when_disabled(self):
+        response = self.client.get('/v1/services/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(get_request_stats(), {})
@@ -0,0 +1,172 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework import test as rest_test
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from common.response_cache import (get_data_version, bump_data_version, normalize_query_parameters,
+                                   build_response_key)
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.services.tests.helpers import ServiceBuilder
+
+
+def build_request(url):
+    return Request(APIRequestFactory().get(url))
+
+
+class TestNormalizingQueryParameters(TestCase):
+    def test_sorts_parameters_by_name(self):
+        first = build_request('/v1/services/?search=food&page=2').query_params
+        second = build_request('/v1/services/?page=2&search=food').query_params
+
+        self.assertEqual(normalize_query_parameters(first, 4), normalize_query_parameters(second, 4))
+
+    def test_collapses_white_space(self):
+        first = build_request('/v1/services/?search=%20food%20%20bank').query_params
+        second = build_request('/v1/services/?search=food%20bank').query_params
+
+        self.assertEqual(normalize_query_parameters(first, 4), normalize_query_parameters(second, 4))
+
+    def test_rounds_proximity(self):
+        first = build_request('/v1/services_at_location/?proximity=-123.1207,%2B49.2827').query_params
+        second = build_request('/v1/services_at_location/?proximity=-123.12,49.28').query_params
+
+        self.assertEqual(normalize_query_parameters(first, 2), normalize_query_parameters(second, 2))
+
+    def test_does_not_round_proximity_without_decimals(self):
+        first = build_request('/v1/services_at_location/?proximity=-123.1207,49.2827').query_params
+        second = build_request('/v1/services_at_location/?proximity=-123.12,49.28').query_params
+
+        self.assertNotEqual(normalize_query_parameters(first, None), normalize_query_parameters(second, None))
+
+    def test_keeps_different_values_apart(self):
+        first = build_request('/v1/services/?search=food').query_params
+        second = build_request('/v1/services/?search=bank').query_params
+
+        self.assertNotEqual(normalize_query_parameters(first, 4), normalize_query_parameters(second, 4))
+
+    def test_keeps_different_paths_apart(self):
+        first = build_request('/v1/services/?search=food')
+        second = build_request('/v1/locations/?search=food')
+
+        self.assertNotEqual(build_response_key(first), build_response_key(second))
+
+
+class TestDataVersion(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bumping_changes_version(self):
+        version = get_data_version()
+        bump_data_version()
+
+        self.assertNotEqual(get_data_version(), version)
+
+    def test_version_is_kept_until_bumped(self):
+        self.assertEqual(get_data_version(), get_data_version())
+
+    def test_bumping_without_version_sets_version(self):
+        bump_data_version()
+
+        self.assertIsNotNone(get_data_version())
+
+
+@override_settings(CACHE_API_RESPONSES=True)
+class TestCachedResponses(rest_test.APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organization = OrganizationBuilder().create()
+
+    def test_returns_cached_response_until_data_version_is_bumped(self):
+        ServiceBuilder(self.organization).create()
+        self.assertEqual(len(self.client.get('/v1/services/').json()), 1)
+
+        ServiceBuilder(self.organization).create()
+        self.assertEqual(len(self.client.get('/v1/services/').json()), 1)
+
+        bump_data_version()
+        self.assertEqual(len(self.client.get('/v1/services/').json()), 2)
+
+    def test_returns_cached_response_for_parameters_in_different_order(self):
+        ServiceBuilder(self.organization).create()
+        self.client.get('/v1/services/?per_page=5&page=1')
+
+        ServiceBuilder(self.organization).create()
+        response = self.client.get('/v1/services/?page=1&per_page=5')
+
+        self.assertEqual(len(response.json()), 1)
+
+    def test_cached_response_has_pagination_headers(self):
+        for _ in range(3):
+            ServiceBuilder(self.organization).create()
+        response = self.client.get('/v1/services/?per_page=2')
+
+        cached_response = self.client.get('/v1/services/?per_page=2')
+
+        self.assertEqual(cached_response['Link'], response['Link'])
+        self.assertEqual(cached_response['Count'], response['Count'])
+
+    def test_cached_response_has_links_to_url_of_request(self):
+        for _ in range(3):
+            ServiceBuilder(self.organization).create()
+        self.client.get('/v1/services/?per_page=2&tag=a%20%20b')
+
+        cached_response = self.client.get('/v1/services/?per_page=2&tag=a%20b')
+
+        self.assertIn('tag=a+b>', cached_response['Link'])
+        self.assertNotIn('tag=a++b>', cached_response['Link'])
+
+    def test_does_not_cache_error_responses(self):
+        self.assertEqual(self.client.get('/v1/services/missing/').status_code, 404)
+        service = ServiceBuilder(self.organization).with_id('missing').create()
+
+        response = self.client.get('/v1/services/missing/')
+
+        self.assertEqual(response.json()['id'], service.id)
+
+
+@override_settings(SEND_API_RESPONSE_ETAGS=True)
+class TestConditionalResponses(rest_test.APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organization = OrganizationBuilder().create()
+        ServiceBuilder(self.organization).create()
+
+    def test_response_has_etag_and_last_modified(self):
+        response = self.client.get('/v1/services/')
+
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_etag_differs_by_query(self):
+        first = self.client.get('/v1/services/?search=food')
+        second = self.client.get('/v1/services/?search=bank')
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_returns_304_without_queries_for_current_etag(self):
+        etag = self.client.get('/v1/services/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/v1/services/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual([query['sql'] for query in queries.captured_queries if 'SELECT' in query['sql']], [])
+
+    def test_returns_200_for_etag_of_earlier_data_version(self):
+        etag = self.client.get('/v1/services/')['ETag']
+        bump_data_version()
+
+        response = self.client.get('/v1/services/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_returns_304_if_not_modified_since_last_modified(self):
+        last_modified = self.client.get('/v1/services/')['Last-Modified']
+
+        response = self.client.get('/v1/services/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
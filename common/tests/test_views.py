@@ -1,7 +1,23 @@
 from rest_framework import test as rest_test
 from human_services.organizations.tests.helpers import OrganizationBuilder
 from human_services.services.tests.helpers import ServiceBuilder
-from common.testhelpers.random_test_values import an_integer
+from common.testhelpers.random_test_values import a_string, an_integer
+
+
+def get_name_from_rel(rel):
+    return rel.strip()[5:-1]
+
+
+def strip_url(url):
+    return url.strip()[1:-1]
+
+
+def get_links(response):
+    if not response.has_header('Link'):
+        return {}
+    urls_and_rels = [link.split(';') for link in response['Link'].split(',')]
+    return {get_name_from_rel(rel): strip_url(url) for (url, rel) in urls_and_rels}
+
 
 # pylint: disable=too-many-public-methods
 class TestPagination(rest_test.APITestCase):
@@ -16,15 +32,8 @@ class TestPagination(rest_test.APITestCase):
             ServiceBuilder(self.organization).with_id(id_with_zero_prefix).create()
 
     def test_link_header_contains_links_to_pages(self):
-        get_name_from_rel = lambda rel: rel.strip()[5:-1]
-        strip_url = lambda url: url.strip()[1:-1]
-
         self.create_many_services(10)
-        link_header = self.client.get('/v1/services/?per_page=2&page=3')['Link']
-
-        links = link_header.split(',')
-        urls_and_rels = [link.split(';') for link in links]
-        link_map = {get_name_from_rel(rel): strip_url(url) for (url, rel) in urls_and_rels}
+        link_map = get_links(self.client.get('/v1/services/?per_page=2&page=3'))
 
         self.assertNotRegex(link_map['first'], r'\bpage=')
         self.assertRegex(link_map['prev'], r'\bpage=2\b')
@@ -181,3 +190,118 @@ class TestPagination(rest_test.APITestCase):
 
         self.assertIn(response.json()[0]['id'], ids_on_the_first_page)
         self.assertIn(response.json()[1]['id'], ids_on_the_first_page)
+
+
+class TestCursorPagination(rest_test.APITestCase):
+    def setUp(self):
+        self.organization = OrganizationBuilder().create()
+
+    def create_many_services(self, count):
+        for i in range(0, count):
+            ServiceBuilder(self.organization).with_id(('00' + str(i + 1))[-3:]).create()
+
+    def get_ids(self, response):
+        return [service['id'] for service in response.json()]
+
+    def test_returns_first_page_without_cursor(self):
+        self.create_many_services(10)
+
+        response = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+
+        self.assertEqual(self.get_ids(response), ['001', '002', '003'])
+
+    def test_next_link_returns_next_page(self):
+        self.create_many_services(10)
+        first_page = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+
+        second_page = self.client.get(get_links(first_page)['next'])
+
+        self.assertEqual(self.get_ids(second_page), ['004', '005', '006'])
+
+    def test_pages_through_all_records_once(self):
+        self.create_many_services(10)
+        ids = []
+
+        url = '/v1/services/?pagination=cursor&per_page=3'
+        while url:
+            response = self.client.get(url)
+            ids += self.get_ids(response)
+            url = get_links(response).get('next')
+
+        self.assertEqual(ids, ['{:03}'.format(i) for i in range(1, 11)])
+
+    def test_pages_in_descending_order(self):
+        self.create_many_services(5)
+        first_page = self.client.get('/v1/services/?pagination=cursor&per_page=3&sort_by=-id')
+
+        second_page = self.client.get(get_links(first_page)['next'])
+
+        self.assertEqual(self.get_ids(first_page), ['005', '004', '003'])
+        self.assertEqual(self.get_ids(second_page), ['002', '001'])
+
+    def test_includes_first_and_next_links_only(self):
+        self.create_many_services(10)
+        first_page = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+
+        second_page = self.client.get(get_links(first_page)['next'])
+
+        self.assertEqual(set(get_links(first_page).keys()), {'next'})
+        self.assertEqual(set(get_links(second_page).keys()), {'first', 'next'})
+        self.assertNotRegex(get_links(second_page)['first'], r'\bcursor=')
+
+    def test_includes_no_next_link_for_last_page(self):
+        self.create_many_services(3)
+
+        response = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+
+        self.assertEqual(get_links(response), {})
+
+    def test_includes_exact_count_by_default(self):
+        self.create_many_services(10)
+
+        response = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+
+        self.assertEqual(response['Count'], '10')
+
+    def test_can_leave_out_count(self):
+        self.create_many_services(10)
+
+        response = self.client.get('/v1/services/?pagination=cursor&per_page=3&count=none')
+
+        self.assertFalse(response.has_header('Count'))
+
+    def test_can_estimate_count(self):
+        self.create_many_services(10)
+
+        response = self.client.get('/v1/services/?pagination=cursor&per_page=3&count=estimate')
+
+        self.assertGreater(int(response['Count']), 0)
+
+    def test_pages_through_search_results_by_rank(self):
+        the_search_term = a_string()
+        for i in range(1, 6):
+            ServiceBuilder(self.organization).with_id('00' + str(i)).with_name(' '.join([the_search_term] * i)).create()
+        ServiceBuilder(self.organization).with_id('006').with_description(the_search_term).create()
+        ids = []
+
+        url = '/v1/services/?search={0}&pagination=cursor&per_page=2'.format(the_search_term)
+        while url:
+            response = self.client.get(url)
+            ids += self.get_ids(response)
+            url = get_links(response).get('next')
+
+        self.assertCountEqual(ids, ['001', '002', '003', '004', '005', '006'])
+
+    def test_returns_400_for_invalid_cursor(self):
+        response = self.client.get('/v1/services/?pagination=cursor&cursor=invalid')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_returns_400_for_cursor_from_other_sort_order(self):
+        self.create_many_services(5)
+        first_page = self.client.get('/v1/services/?pagination=cursor&per_page=3')
+        next_url = get_links(first_page)['next']
+
+        response = self.client.get(next_url + '&sort_by=-id')
+
+        self.assertEqual(response.status_code, 400)
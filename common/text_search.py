@@ -0,0 +1,117 @@
+import functools
+import operator
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import BooleanField, F, FloatField, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+SEARCH_RANK_FIELD = 'search_rank'
+
+FULL_TEXT_SEARCH_MODE = 'full_text'
+FUZZY_SEARCH_MODE = 'fuzzy'
+SEARCH_MODES = [FULL_TEXT_SEARCH_MODE, FUZZY_SEARCH_MODE]
+
+
+class SearchConfigForLanguage(Func):
+    # The database function from services migration 0014, which is also used to build
+    # the stored search vectors, so that queries are parsed the same way as the text
+    function = 'search_config_for_language'
+
+
+class TrigramWordSimilar(Func):
+    # The pg_trgm operator, true when the first argument is similar to some words in the
+    # second by at least pg_trgm.word_similarity_threshold, answered from the trigram
+    # indexes added in services migration 0015 and locations migration 0025
+    arg_joiner = ' <%% '
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+
+class TrigramWordSimilarity(Func):
+    function = 'word_similarity'
+    output_field = FloatField()
+
+
+def to_term_queries(terms):
+    # A query for each term, matching it either as a word in the language of the
+    # translation, so that "clinics" finds "clinic", or as the start of a word, so that
+    # "immig" finds "immigrant"
+    term_queries = []
+    for term in terms:
+        words = re.findall(r'\w+', term)
+        if not words:
+            continue
+        prefixes = ' & '.join(word + ':*' for word in words)
+        term_queries.append(SearchQuery(term, config=SearchConfigForLanguage(F('language_code'))) |
+                            SearchQuery(prefixes, config='simple', search_type='raw'))
+    return term_queries
+
+
+def get_translation_model(translated_model):
+    return translated_model.translations.rel.related_model
+
+
+def search_translations(queryset, text_search_fields, terms):
+    term_queries = to_term_queries(terms)
+    if not term_queries:
+        return queryset
+
+    def find_full_text_matches(term_query):
+        return lambda translations: translations.filter(search_vector=term_query)
+
+    # Ranked by the terms each translation matches, as terms may match different fields
+    any_term_query = functools.reduce(operator.or_, term_queries)
+    return filter_and_rank_by_translations(queryset, text_search_fields,
+                                           [find_full_text_matches(term_query) for term_query in term_queries],
+                                           SearchRank(F('search_vector'), any_term_query))
+
+
+def fuzzy_search_translations(queryset, text_search_fields, terms, threshold):
+    # Matches names that contain words spelled similarly to the search terms, so that
+    # "fod bank" finds "Food Bank". The threshold is the least similarity from 0 to 1
+    terms = [term for term in terms if term]
+    if not terms:
+        return queryset
+
+    def find_similar_names(term):
+        return lambda translations: (translations.
+                                     filter(TrigramWordSimilar(Value(term), F('name'))).
+                                     annotate(similarity=TrigramWordSimilarity(Value(term), F('name'))).
+                                     filter(similarity__gte=threshold))
+
+    return filter_and_rank_by_translations(queryset, text_search_fields,
+                                           [find_similar_names(term) for term in terms],
+                                           TrigramWordSimilarity(Value(' '.join(terms)), F('name')))
+
+
+def filter_and_rank_by_translations(queryset, text_search_fields, term_matchers, rank):
+    # text_search_fields pairs an id field of the queryset with the translatable model it
+    # refers to. Each of the term_matchers filters translations by one search term, and
+    # rows match if every term matches some translation in any language of any of the
+    # fields, so that "food vancouver" finds food services in Vancouver. Matches are found
+    # with id subqueries rather than joins, so that no DISTINCT is needed. Matching rows are
+    # annotated with the best rank among the translations and sorted by it, best first
+    translation_querysets = [(id_field, get_translation_model(translated_model).objects.all())
+                             for id_field, translated_model in text_search_fields]
+    matches = Q()
+    for find_matches in term_matchers:
+        term_matches = Q()
+        for id_field, translations in translation_querysets:
+            term_matches |= Q(**{id_field + '__in': find_matches(translations).values('master_id')})
+        matches &= term_matches
+
+    ranks = [Coalesce(Subquery(translations.
+                               filter(master_id=OuterRef(id_field)).
+                               annotate(rank=rank).
+                               order_by('-rank').
+                               values('rank')[:1],
+                               output_field=FloatField()),
+                      Value(0.0))
+             for id_field, translations in translation_querysets]
+    best_rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+    # As double precision rather than the real of the rank functions, so that the rank
+    # read into a page cursor compares equal to the row it came from
+    return (queryset.
+            filter(matches).
+            annotate(**{SEARCH_RANK_FIELD: Cast(best_rank, FloatField())}).
+            order_by('-' + SEARCH_RANK_FIELD, 'pk'))
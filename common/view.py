@@ -1,44 +1,166 @@
+import time
+from django.conf import settings
+from django.views.decorators.http import condition
+from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.utils.urls import remove_query_param, replace_query_param
+from common.keyset_pagination import (get_keyset_ordering, order_by_keyset, filter_after_keyset,
+                                      get_keyset_values, encode_cursor, decode_cursor, estimate_count)
+from common.response_cache import (get_data_version, get_data_modified_time, build_etag,
+                                   get_cached_response_data, cache_response_data)
 
 class Pagination(PageNumberPagination):
+    # With pagination=cursor, pages are found from the sort keys of the last row of the
+    # previous page instead of by OFFSET, so deep pages are as fast as the first. Links
+    # are to the first and next pages only, and the Count header is exact, estimated or
+    # left out, as given by the count parameter
+    CURSOR_PAGINATION = 'cursor'
+    COUNT_MODES = ['exact', 'estimate', 'none']
+
     def __init__(self):
         self.page_query_param = 'page'
         self.page_size_query_param = 'per_page'
         self.max_page_size = 100
+        self.pagination_query_param = 'pagination'
+        self.cursor_query_param = 'cursor'
+        self.count_query_param = 'count'
+        self.cursor_page = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.pagination_query_param) != self.CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = get_keyset_ordering(queryset)
+        queryset = order_by_keyset(queryset, ordering)
+        self.cursor_count = self.get_cursor_count(queryset, request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = filter_after_keyset(queryset, ordering, decode_cursor(cursor, ordering))
+
+        rows = list(queryset[:page_size + 1])
+        self.cursor_page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            self.next_cursor = encode_cursor(ordering, get_keyset_values(self.cursor_page[-1], ordering))
+        return self.cursor_page
+
+    def get_cursor_count(self, queryset, request):
+        count_mode = request.query_params.get(self.count_query_param, 'exact')
+        if count_mode not in self.COUNT_MODES:
+            raise ParseError('Invalid value for count, must be one of ' + ', '.join(self.COUNT_MODES))
+        if count_mode == 'exact':
+            return queryset.count()
+        if count_mode == 'estimate':
+            return estimate_count(queryset)
+        return None
 
     def get_paginated_response(self, data):
+        if self.cursor_page is not None:
+            return self.build_response(data, self.get_cursor_links(), self.cursor_count)
+        return self.build_response(data, self.get_page_links(), self.page.paginator.count)
+
+    def build_response(self, data, links, count):
         response = Response(data)
+        # Kept for CachedResponseMixin, which builds the links again for each request
+        response.pagination_links = links
 
-        links = self.build_link_headers()
-        if links:
-            response['Link'] = links
+        link_header = build_link_header(self.request, links)
+        if link_header:
+            response['Link'] = link_header
 
-        count = self.page.paginator.count
         if count:
             response['Count'] = count
 
         return response
 
-    def build_link_headers(self):
-        links = [('first', self.get_first_link()),
-                 ('prev', self.get_previous_link()),
-                 ('next', self.get_next_link()),
-                 ('last', self.get_last_link())]
+    def get_page_links(self):
+        links = []
+        if self.page.has_previous():
+            previous_page_number = self.page.previous_page_number()
+            links.append(('first', self.page_query_param, None))
+            links.append(('prev', self.page_query_param, None if previous_page_number == 1 else previous_page_number))
+        if self.page.has_next():
+            links.append(('next', self.page_query_param, self.page.next_page_number()))
+            links.append(('last', self.page_query_param, self.page.paginator.num_pages))
+        return links
+
+    def get_cursor_links(self):
+        links = []
+        if self.request.query_params.get(self.cursor_query_param):
+            links.append(('first', self.cursor_query_param, None))
+        if self.next_cursor:
+            links.append(('next', self.cursor_query_param, self.next_cursor))
+        return links
+
+
+def build_link_header(request, links):
+    # Links are given as (relation, query parameter, value), and are to the URL of the
+    # request with the parameter set to the value, or removed when the value is None
+    url = request.build_absolute_uri()
+    headers = ['<{0}>; rel="{1}"'.format(remove_query_param(url, name) if value is None
+                                         else replace_query_param(url, name, value), relation)
+               for relation, name, value in links]
 
-        headers = ['<{0}>; rel="{1}"'.format(url, name) for name, url in links if url]
+    return ', '.join(headers) if headers else None
 
-        return ', '.join(headers) if headers else None
 
-    def get_first_link(self):
-        if not self.page.has_previous():
-            return None
-        url = self.request.build_absolute_uri()
-        return remove_query_param(url, self.page_query_param)
+class SerializerTimingMixin:
+    # Records the time from creating the serializer to finalizing the response, which read
+    # only viewsets spend evaluating the serializer data, for common.middleware to report
+    # apart from the rest of the view. Nothing is recorded for responses from the cache
+    def get_serializer(self, *args, **kwargs):
+        self.serializer_start_time = time.perf_counter()
+        return super().get_serializer(*args, **kwargs)
 
-    def get_last_link(self):
-        if not self.page.has_next():
-            return None
-        url = self.request.build_absolute_uri()
-        return replace_query_param(url, self.page_query_param, self.page.paginator.num_pages)
+    def finalize_response(self, request, response, *args, **kwargs):
+        start_time = getattr(self, 'serializer_start_time', None)
+        if start_time is not None:
+            # On the Django request, which is the one the middleware sees
+            request._request.serializer_time = time.perf_counter() - start_time
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    # For read only viewsets under /v1/, whose responses only change when data is imported.
+    # Responses are cached per data version, see common.response_cache.bump_data_version,
+    # and clients that send the ETag of the current version get 304 without any queries
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_conditional_response(self, get_response, request, *args, **kwargs):
+        def get_cached_response(request, *args, **kwargs):
+            return self.get_cached_response(get_response, request, *args, **kwargs)
+
+        if not settings.SEND_API_RESPONSE_ETAGS:
+            return get_cached_response(request, *args, **kwargs)
+        conditional_view = condition(etag_func=build_etag, last_modified_func=get_data_modified_time)
+        return conditional_view(get_cached_response)(request, *args, **kwargs)
+
+    def get_cached_response(self, get_response, request, *args, **kwargs):
+        if not settings.CACHE_API_RESPONSES:
+            return get_response(request, *args, **kwargs)
+
+        version = get_data_version()
+        cached_data = get_cached_response_data(request, version)
+        if cached_data is not None:
+            data, headers, links = cached_data
+            response = Response(data)
+            link_header = build_link_header(request, links)
+            if link_header:
+                response['Link'] = link_header
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        response = get_response(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache_response_data(request, response, version)
+        return response
@@ -67,6 +67,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'common.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -282,3 +283,43 @@ AUTOSLUG_SLUGIFY_FUNCTION = 'slugify.slugify'
 ADMIN_URL = r'^admin/'
 
 SRID = 4326
+
+# Directory where compute_text_similarity_scores saves the fitted TF-IDF vocabulary,
+# IDF weights and topic vectors, for scoring new text against topics without refitting.
+# The path is a symbolic link to the current version, saved next to it. In production it
+# must be on storage shared by the command and the web server processes, see the README
+TOPIC_MODEL_PATH = env('TOPIC_MODEL_PATH', default=str(ROOT_DIR.path('topic_model')))
+# Load the spaCy and topic models used by /v1/topics_for_text/ when each process starts,
+# rather than on its first request. This also slows down every management command
+PRELOAD_TOPICS_FOR_TEXT_MODELS = env.bool('PRELOAD_TOPICS_FOR_TEXT_MODELS', default=False)
+
+# Filter and sort service at location lists using the denormalized search records, which
+# are rebuilt by the importers and by the refresh_service_at_location_search_records command.
+# Rows without a record, as after changes since the last rebuild, are matched on the other tables
+USE_SERVICE_AT_LOCATION_SEARCH_RECORDS = env.bool('USE_SERVICE_AT_LOCATION_SEARCH_RECORDS', default=False)
+
+# Least similarity, from 0 to 1, between the search terms and some words in a name for
+# search_mode=fuzzy. Values below the pg_trgm.word_similarity_threshold of the database,
+# 0.6 unless changed, have no effect since the trigram index only finds names above that
+FUZZY_SEARCH_SIMILARITY_THRESHOLD = env.float('FUZZY_SEARCH_SIMILARITY_THRESHOLD', default=0.6)
+
+# Sorting services at location by both topic and proximity ranks only this many of the
+# nearest services with a score for the topic, 0 ranks all of them. Services further away
+# would only rank ahead of these if much more similar to the topic
+TOPIC_PROXIMITY_CANDIDATE_COUNT = env.int('TOPIC_PROXIMITY_CANDIDATE_COUNT', default=1000)
+
+# Cache responses of the read only /v1/ endpoints until the data changes, see
+# common.response_cache. Needs a cache shared by all processes, as in production
+CACHE_API_RESPONSES = env.bool('CACHE_API_RESPONSES', default=False)
+API_RESPONSE_CACHE_TIMEOUT = env.int('API_RESPONSE_CACHE_TIMEOUT', default=24 * 60 * 60)
+# Proximity and user location are rounded to this many decimals in cache keys, 4 is about 10 m
+API_RESPONSE_CACHE_COORDINATE_DECIMALS = env.int('API_RESPONSE_CACHE_COORDINATE_DECIMALS', default=4)
+# Send ETag and Last-Modified from the data version, and answer conditional requests
+# with 304 Not Modified. Also needs a cache shared by all processes
+SEND_API_RESPONSE_ETAGS = env.bool('SEND_API_RESPONSE_ETAGS', default=False)
+
+# Send query counts and times of /v1/ requests in a Server-Timing header, and keep totals
+# per route for the show_request_stats command. The totals are written to the cache at
+# most once per flush interval in seconds, per process
+INSTRUMENT_API_REQUESTS = env.bool('INSTRUMENT_API_REQUESTS', default=False)
+API_REQUEST_STATS_FLUSH_INTERVAL = env.int('API_REQUEST_STATS_FLUSH_INTERVAL', default=10)
@@ -1,5 +1,6 @@
 import logging
 from .base import *
+from .base import env
 
 # Raises ImproperlyConfigured exception if DJANGO_SECRET_KEY not in os.environ
 SECRET_KEY = env('DJANGO_SECRET_KEY')
@@ -78,6 +79,9 @@ CACHES = {
         }
     }
 }
+CACHE_API_RESPONSES = env.bool('CACHE_API_RESPONSES', default=True)
+SEND_API_RESPONSE_ETAGS = env.bool('SEND_API_RESPONSE_ETAGS', default=True)
+PRELOAD_TOPICS_FOR_TEXT_MODELS = env.bool('PRELOAD_TOPICS_FOR_TEXT_MODELS', default=True)
 
 LOGGING = {
     'version': 1,
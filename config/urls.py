@@ -13,10 +13,11 @@ from human_services.locations.viewsets import (LocationViewSet, LocationViewSetU
 from human_services.services_at_location.viewsets import ServiceAtLocationViewSet
 from human_services.services.viewsets import ServiceViewSet, ServiceTopicsViewSet
 from push_notifications.view_sets import create_or_update_push_notification_token
-from qa_tool.viewsets import AlgorithmViewSet, RelevancyScoreViewSet, SearchLocationViewSet
+from qa_tool.viewsets import (AlgorithmViewSet, RelevancyScoreViewSet, SearchLocationViewSet,
+                              AlgorithmServiceSimilarityScoreViewSet)
 from rest_framework import routers
 from rest_framework.authtoken import views
-from search.viewsets import TopicViewSet, RelatedTopicsViewSet, RelatedServicesViewSet
+from search.viewsets import TopicViewSet, RelatedTopicsViewSet, RelatedServicesViewSet, TopicsForTextViewSet
 
 
 def build_router():
@@ -44,6 +45,7 @@ def build_router():
     router.register(r'topics', TopicViewSet, basename='topics')
     router.register(r'topics/(?P<topic_id>[\w-]+)/related_topics', RelatedTopicsViewSet, basename='topics')
     router.register(r'topics/(?P<topic_id>[\w-]+)/related_services', RelatedServicesViewSet, basename='topics')
+    router.register(r'topics_for_text', TopicsForTextViewSet, basename='topics_for_text')
     router.register(r'content/alerts/(?P<locale>[\w-]+)', AlertViewSet, basename='alerts')
     router.register(r'content/alerts/(?P<locale>[\w-]+)/(?P<alert_id>[\w-]+)', AlertViewSet, basename='alerts')
 
@@ -55,6 +57,8 @@ def build_qa_tool_routes():
     router.register(r'algorithms', AlgorithmViewSet, basename='algorithms')
     router.register(r'algorithms/(?P<algorithm_id>[\w-]+)/relevancyscores',
                     RelevancyScoreViewSet, basename='relevancyscores')
+    router.register(r'algorithms/(?P<algorithm_id>[\w-]+)/topics/(?P<topic_id>[\w-]+)/related_services',
+                    AlgorithmServiceSimilarityScoreViewSet, basename='algorithmsimilarityscores')
     router.register(r'searchlocations', SearchLocationViewSet, basename='searchlocations')
     router.register(r'relevancyscores', RelevancyScoreViewSet, basename='relevancyscores')
 
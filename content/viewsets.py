@@ -3,10 +3,11 @@ from rest_framework import viewsets
 from common.filters import (AlertIdFilter)
 from content import models, serializers, documentation
 from content.convert_locale_code import convert_locale_code
+from common.view import CachedResponseMixin, SerializerTimingMixin
 
 # pylint: disable=too-many-ancestors
 @method_decorator(name='list', decorator=documentation.get_alerts_list_schema())
-class AlertViewSet(viewsets.ReadOnlyModelViewSet):
+class AlertViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = serializers.AlertSerializer
 
     filter_backends = (AlertIdFilter,)
@@ -14,4 +15,4 @@ class AlertViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         locale = self.kwargs['locale']
         converted_locale = convert_locale_code(locale)
-        return models.Alert.objects.language(converted_locale).all()
\ No newline at end of file
+        return models.Alert.objects.language(converted_locale).prefetch_related('translations')
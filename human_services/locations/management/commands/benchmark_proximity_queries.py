@@ -0,0 +1,127 @@
+import random
+import time
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from human_services.locations.models import Location, ServiceAtLocation
+from human_services.organizations.models import Organization
+from human_services.services.models import Service
+from search.models import Task, TaskServiceSimilarityScore
+
+# invoke as follows:
+# python manage.py benchmark_proximity_queries --locations 50000 200000 1000000 --budget 250
+
+BULK_CREATE_BATCH_SIZE = 10000
+
+BENCHMARK_TOPIC_ID = 'benchmark_topic'
+
+# Roughly British Columbia
+LONGITUDE_RANGE = (-139.0, -114.0)
+LATITUDE_RANGE = (48.3, 60.0)
+
+
+class Command(BaseCommand):
+    help = ('Measure response times of /v1/services_at_location/ with proximity sorting and filtering, '
+            'and with sorting by topic and proximity, for different numbers of locations. Locations are '
+            'generated at random inside a transaction that is rolled back, so the database is left '
+            'unchanged. Fails if the 95th percentile of sorting by topic and proximity is over budget')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations',
+                            dest='location_counts',
+                            type=int,
+                            nargs='+',
+                            default=[50000, 200000, 1000000],
+                            help='numbers of locations to measure with')
+        parser.add_argument('--requests',
+                            dest='request_count',
+                            type=int,
+                            default=100,
+                            help='number of requests to time for each number of locations and query')
+        parser.add_argument('--budget',
+                            dest='budget_ms',
+                            type=float,
+                            default=None,
+                            help=('largest acceptable 95th percentile response time in milliseconds '
+                                  'of sorting by topic and proximity, not checked if left out'))
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        over_budget = []
+        for location_count in options['location_counts']:
+            with transaction.atomic():
+                self.stdout.write('Creating {} locations...'.format(location_count))
+                create_services_at_random_locations(location_count)
+                for name, url_template in [('proximity', '/v1/services_at_location/?proximity={},{}'),
+                                           ('user_location', '/v1/services_at_location/?user_location={},{}'),
+                                           ('both', ('/v1/services_at_location/?proximity={0},{1}'
+                                                     '&user_location={0},{1}')),
+                                           ('topic_and_proximity', ('/v1/services_at_location/?proximity={0},{1}'
+                                                                    '&related_to_topic=' + BENCHMARK_TOPIC_ID))]:
+                    timings = time_requests(url_template, options['request_count'])
+                    p95 = percentile(timings, 95)
+                    self.stdout.write('{} locations, {}: p50 {:.1f} ms, p95 {:.1f} ms'.format(
+                        location_count, name, percentile(timings, 50), p95))
+                    if name == 'topic_and_proximity' and options['budget_ms'] is not None and \
+                            p95 > options['budget_ms']:
+                        over_budget.append(str(location_count))
+                transaction.set_rollback(True)
+
+        if over_budget:
+            raise CommandError('Sorting by topic and proximity over budget of {} ms for {} locations'.format(
+                options['budget_ms'], ', '.join(over_budget)))
+
+
+def create_services_at_random_locations(location_count):
+    organization = Organization(id='benchmark_organization')
+    organization.set_current_language('en')
+    organization.name = 'Benchmark organization'
+    organization.save()
+    service = Service(id='benchmark_service', organization=organization)
+    service.set_current_language('en')
+    service.name = 'Benchmark service'
+    service.save()
+    topic = Task(id=BENCHMARK_TOPIC_ID)
+    topic.set_current_language('en')
+    topic.name = 'Benchmark topic'
+    topic.save()
+    # All locations offer the one service scored for the topic, the worst case for ranking
+    TaskServiceSimilarityScore.objects.create(task=topic, service=service, similarity_score=0.5)
+
+    translation_model = Location.translations.rel.related_model
+    for start in range(0, location_count, BULK_CREATE_BATCH_SIZE):
+        ids = ['benchmark_location_{}'.format(i)
+               for i in range(start, min(start + BULK_CREATE_BATCH_SIZE, location_count))]
+        Location.objects.bulk_create(Location(id=location_id, organization=organization, point=a_random_point())
+                                     for location_id in ids)
+        translation_model.objects.bulk_create(translation_model(master_id=location_id, language_code='en',
+                                                                name=location_id)
+                                              for location_id in ids)
+        ServiceAtLocation.objects.bulk_create(ServiceAtLocation(service=service, location_id=location_id)
+                                              for location_id in ids)
+
+
+def a_random_point():
+    return Point(random.uniform(*LONGITUDE_RANGE), random.uniform(*LATITUDE_RANGE))
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def time_requests(url_template, request_count):
+    client = Client()
+    timings = []
+    for _ in range(request_count):
+        point = a_random_point()
+        url = url_template.format(point.x, point.y)
+        start_time = time.perf_counter()
+        response = client.get(url)
+        timings.append(1000 * (time.perf_counter() - start_time))
+        if response.status_code != 200:
+            raise CommandError('{} returned status {}'.format(url, response.status_code))
+    return timings
+
+
+def percentile(values, percent):
+    ordered_values = sorted(values)
+    index = min(len(ordered_values) - 1, int(len(ordered_values) * percent / 100))
+    return ordered_values[index]
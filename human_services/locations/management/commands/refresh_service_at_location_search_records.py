@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from human_services.locations.search_records import refresh_service_at_location_search_records
+from common.response_cache import bump_data_version
+
+# invoke as follows:
+# python manage.py refresh_service_at_location_search_records
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the denormalized search records used for listing services at location, '
+            'run after changing services, locations or taxonomy terms other than by importing')
+
+    def handle(self, *args, **options):
+        record_count = refresh_service_at_location_search_records()
+        bump_data_version()
+        self.stdout.write(self.style.SUCCESS('{} search records saved'.format(record_count)))
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 11:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0021_auto_20201215_0024'),
+    ]
+
+    operations = [
+        # The default spatial index on point is on the geometry, which does not help
+        # distance queries in meters. This index is on the geography of the point, as
+        # used for sorting and filtering by proximity in common.geography
+        migrations.RunSQL(
+            sql=('CREATE INDEX locations_location_point_geography_idx '
+                 'ON locations_location USING GIST ((point::geography))'),
+            reverse_sql='DROP INDEX locations_location_point_geography_idx',
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-18 11:40
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0009_auto_20201210_0121'),
+        ('services', '0013_auto_20201210_0123'),
+        ('locations', '0022_location_point_geography_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceAtLocationSearchRecord',
+            fields=[
+                ('service_at_location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_record', serialize=False, to='locations.serviceatlocation')),
+                ('service_name', models.CharField(max_length=255)),
+                ('service_description', models.TextField(blank=True, null=True)),
+                ('location_name', models.CharField(max_length=200)),
+                ('location_description', models.TextField(blank=True, null=True)),
+                ('organization_name', models.CharField(max_length=200)),
+                ('point', django.contrib.gis.db.models.fields.PointField(blank=True, null=True, srid=4326)),
+                ('region', models.CharField(db_index=True, max_length=200)),
+                ('taxonomy_terms', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=401), default=list, size=None)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='locations.location')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.service')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='serviceatlocationsearchrecord',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['taxonomy_terms'], name='search_record_taxonomy_gin'),
+        ),
+        # Same as the index on the geography of location points in migration 0022
+        migrations.RunSQL(
+            sql=('CREATE INDEX search_record_point_geography_idx '
+                 'ON locations_serviceatlocationsearchrecord USING GIST ((point::geography))'),
+            reverse_sql='DROP INDEX search_record_point_geography_idx',
+        ),
+    ]
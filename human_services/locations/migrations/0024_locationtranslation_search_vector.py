@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 14:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CREATE_SEARCH_VECTOR_TRIGGER_SQL = ['''
+CREATE TRIGGER locations_location_translation_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON locations_location_translation
+    FOR EACH ROW EXECUTE PROCEDURE update_translation_search_vector()
+''', '''
+UPDATE locations_location_translation SET search_vector = NULL
+''', '''
+CREATE INDEX locations_location_translation_search_vector_idx
+    ON locations_location_translation USING GIN (search_vector)
+''']
+
+DROP_SEARCH_VECTOR_TRIGGER_SQL = [
+    'DROP INDEX locations_location_translation_search_vector_idx',
+    'DROP TRIGGER locations_location_translation_search_vector_trigger ON locations_location_translation',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0023_serviceatlocationsearchrecord'),
+        ('services', '0014_servicetranslation_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationtranslation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The trigger function is created in services migration 0014
+        migrations.RunSQL(sql=CREATE_SEARCH_VECTOR_TRIGGER_SQL, reverse_sql=DROP_SEARCH_VECTOR_TRIGGER_SQL),
+    ]
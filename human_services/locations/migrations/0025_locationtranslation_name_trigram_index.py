@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 15:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0024_locationtranslation_search_vector'),
+        ('services', '0015_servicetranslation_name_trigram_index'),
+    ]
+
+    operations = [
+        # For fuzzy search on location names, the pg_trgm extension is created in
+        # services migration 0015
+        migrations.RunSQL(
+            sql=('CREATE INDEX locations_location_translation_name_trigram_idx '
+                 'ON locations_location_translation USING GIN (name gin_trgm_ops)'),
+            reverse_sql='DROP INDEX locations_location_translation_name_trigram_idx',
+        ),
+    ]
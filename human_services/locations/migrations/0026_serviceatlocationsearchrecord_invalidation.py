@@ -0,0 +1,84 @@
+# Generated by Django 3.2 on 2026-10-18 16:40
+
+from django.db import migrations
+
+
+# Deletes the search records whose column named by the first trigger argument equals the
+# column of the changed row named by the second, so that list queries match those services
+# at location on the other tables until the records are rebuilt
+CREATE_INVALIDATION_FUNCTIONS_SQL = ['''
+CREATE FUNCTION delete_stale_search_records() RETURNS trigger AS $$
+DECLARE
+    changed_row jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed_row := to_jsonb(OLD);
+    ELSE
+        changed_row := to_jsonb(NEW);
+    END IF;
+    EXECUTE format('DELETE FROM locations_serviceatlocationsearchrecord WHERE %I = $1', TG_ARGV[0])
+        USING changed_row ->> TG_ARGV[1];
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+''', '''
+CREATE FUNCTION delete_search_records_of_taxonomy_term() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM locations_serviceatlocationsearchrecord
+    WHERE service_id IN (SELECT service_id FROM services_service_taxonomy_terms
+                         WHERE taxonomyterm_id = OLD.id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+''']
+
+DROP_INVALIDATION_FUNCTIONS_SQL = [
+    'DROP FUNCTION delete_search_records_of_taxonomy_term()',
+    'DROP FUNCTION delete_stale_search_records()',
+]
+
+# (table, operations, search record column, column of the changed row)
+INVALIDATING_CHANGES = [
+    ('services_service', 'UPDATE', 'service_id', 'id'),
+    ('services_service_translation', 'INSERT OR UPDATE OR DELETE', 'service_id', 'master_id'),
+    ('services_service_taxonomy_terms', 'INSERT OR UPDATE OR DELETE', 'service_id', 'service_id'),
+    ('locations_location', 'UPDATE', 'location_id', 'id'),
+    ('locations_location_translation', 'INSERT OR UPDATE OR DELETE', 'location_id', 'master_id'),
+    ('organizations_organization_translation', 'INSERT OR UPDATE OR DELETE', 'organization_id', 'master_id'),
+]
+
+CREATE_INVALIDATION_TRIGGERS_SQL = [
+    '''
+CREATE TRIGGER {table}_search_record_trigger
+    AFTER {operations} ON {table}
+    FOR EACH ROW EXECUTE PROCEDURE delete_stale_search_records('{record_column}', '{row_column}')
+'''.format(table=table, operations=operations, record_column=record_column, row_column=row_column)
+    for table, operations, record_column, row_column in INVALIDATING_CHANGES
+] + ['''
+CREATE TRIGGER taxonomies_taxonomyterm_search_record_trigger
+    AFTER UPDATE ON taxonomies_taxonomyterm
+    FOR EACH ROW EXECUTE PROCEDURE delete_search_records_of_taxonomy_term()
+''']
+
+DROP_INVALIDATION_TRIGGERS_SQL = [
+    'DROP TRIGGER {table}_search_record_trigger ON {table}'.format(table=table)
+    for table, _, _, _ in INVALIDATING_CHANGES
+] + ['DROP TRIGGER taxonomies_taxonomyterm_search_record_trigger ON taxonomies_taxonomyterm']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0025_locationtranslation_name_trigram_index'),
+        ('organizations', '0010_organizationtranslation_search_vector'),
+        ('services', '0015_servicetranslation_name_trigram_index'),
+        ('taxonomies', '0008_auto_20210107_1944'),
+    ]
+
+    operations = [
+        # Search records are rebuilt in bulk after imports, and in between are deleted by
+        # the database when the rows they were copied from change, so that no stale record
+        # is used by common.filters
+        migrations.RunSQL(sql=CREATE_INVALIDATION_FUNCTIONS_SQL, reverse_sql=DROP_INVALIDATION_FUNCTIONS_SQL),
+        migrations.RunSQL(sql=CREATE_INVALIDATION_TRIGGERS_SQL, reverse_sql=DROP_INVALIDATION_TRIGGERS_SQL),
+    ]
@@ -1,4 +1,7 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core import validators
 from parler.models import TranslatableModel, TranslatedFields
 from human_services.organizations.models import Organization
@@ -19,7 +22,8 @@ class Location(ValidateOnSaveMixin, TranslatableModel):
     translations = TranslatedFields(
         name=models.CharField(max_length=200),
         alternate_name=models.CharField(blank=True, null=True, max_length=200),
-        description=models.TextField(blank=True, null=True)
+        description=models.TextField(blank=True, null=True),
+        search_vector=SearchVectorField(null=True, editable=False)
     )
 
     class Meta:
@@ -58,3 +62,27 @@ class LocationAddress(ValidateOnSaveMixin, models.Model):
             address=self.address,
             location=self.location
         )
+
+
+class ServiceAtLocationSearchRecord(models.Model):
+    # Denormalized copy of the fields that service at location lists are filtered and
+    # sorted by, one row per service at location, so that list queries do not need to
+    # join services, locations, organizations, translations and taxonomy terms. Rebuilt
+    # from the other tables by search_records.refresh_service_at_location_search_records(),
+    # and deleted by triggers when the rows they were copied from change
+    service_at_location = models.OneToOneField(ServiceAtLocation, on_delete=models.CASCADE,
+                                               primary_key=True, related_name='search_record')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+')
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='+')
+    service_name = models.CharField(max_length=255)
+    service_description = models.TextField(blank=True, null=True)
+    location_name = models.CharField(max_length=200)
+    location_description = models.TextField(blank=True, null=True)
+    organization_name = models.CharField(max_length=200)
+    point = models.PointField(blank=True, null=True)
+    region = models.CharField(max_length=200, db_index=True)
+    taxonomy_terms = ArrayField(models.CharField(max_length=401), default=list)
+
+    class Meta:
+        indexes = [GinIndex(fields=['taxonomy_terms'], name='search_record_taxonomy_gin')]
@@ -0,0 +1,52 @@
+from django.db import connection, transaction
+
+# Taxonomy terms are stored as taxonomy id and term name separated by this
+TAXONOMY_TERM_SEPARATOR = ':'
+
+SEARCH_RECORD_LANGUAGE = 'en'
+
+DELETE_SEARCH_RECORDS_SQL = 'DELETE FROM locations_serviceatlocationsearchrecord'
+
+INSERT_SEARCH_RECORDS_SQL = '''
+INSERT INTO locations_serviceatlocationsearchrecord (
+    service_at_location_id, service_id, location_id, organization_id,
+    service_name, service_description, location_name, location_description, organization_name,
+    point, region, taxonomy_terms)
+SELECT
+    service_at_location.id, service.id, location.id, service.organization_id,
+    COALESCE(service_translation.name, ''), service_translation.description,
+    COALESCE(location_translation.name, ''), location_translation.description,
+    COALESCE(organization_translation.name, ''),
+    location.point,
+    COALESCE(substring(service.id from '_([^_]*)$'), ''),
+    ARRAY(SELECT term.taxonomy_id || %(separator)s || term.name
+          FROM services_service_taxonomy_terms AS service_term
+          JOIN taxonomies_taxonomyterm AS term ON term.id = service_term.taxonomyterm_id
+          WHERE service_term.service_id = service.id
+          ORDER BY term.taxonomy_id, term.name)
+FROM locations_serviceatlocation AS service_at_location
+JOIN services_service AS service ON service.id = service_at_location.service_id
+JOIN locations_location AS location ON location.id = service_at_location.location_id
+LEFT JOIN services_service_translation AS service_translation
+    ON service_translation.master_id = service.id AND service_translation.language_code = %(language)s
+LEFT JOIN locations_location_translation AS location_translation
+    ON location_translation.master_id = location.id AND location_translation.language_code = %(language)s
+LEFT JOIN organizations_organization_translation AS organization_translation
+    ON organization_translation.master_id = service.organization_id
+    AND organization_translation.language_code = %(language)s
+'''
+
+
+def refresh_service_at_location_search_records():
+    # Rebuilds all records in one transaction, so that list queries see either the old
+    # or the new records. Returns the number of records
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_SEARCH_RECORDS_SQL)
+            cursor.execute(INSERT_SEARCH_RECORDS_SQL, {'separator': TAXONOMY_TERM_SEPARATOR,
+                                                       'language': SEARCH_RECORD_LANGUAGE})
+            return cursor.rowcount
+
+
+def to_search_record_taxonomy_term(taxonomy_id, name):
+    return taxonomy_id + TAXONOMY_TERM_SEPARATOR + name
@@ -0,0 +1,84 @@
+from django.test import TestCase
+from django.utils import translation
+from django.contrib.gis.geos import Point
+from human_services.locations.models import ServiceAtLocation, ServiceAtLocationSearchRecord
+from human_services.locations.search_records import refresh_service_at_location_search_records
+from human_services.locations.tests.helpers import LocationBuilder
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.services.tests.helpers import ServiceBuilder
+from taxonomies.tests.helpers import TaxonomyTermBuilder
+from common.testhelpers.random_test_values import a_string, a_region_specific_id
+
+
+class TestServiceAtLocationSearchRecords(TestCase):
+    def setUp(self):
+        translation.activate('en')
+        self.organization = OrganizationBuilder().create()
+        self.taxonomy_term = TaxonomyTermBuilder().create()
+        self.service = (ServiceBuilder(self.organization).
+                        with_id(a_region_specific_id('bc')).
+                        with_taxonomy_terms([self.taxonomy_term]).
+                        create())
+        self.location = LocationBuilder(self.organization).with_long_lat(-123.1, 49.2).create()
+        self.service_at_location = ServiceAtLocation.objects.create(service=self.service, location=self.location)
+
+    def test_creates_one_record_for_each_service_at_location(self):
+        other_location = LocationBuilder(self.organization).create()
+        ServiceAtLocation.objects.create(service=self.service, location=other_location)
+
+        record_count = refresh_service_at_location_search_records()
+
+        self.assertEqual(record_count, 2)
+        self.assertEqual(ServiceAtLocationSearchRecord.objects.count(), 2)
+
+    def test_copies_fields_from_service_location_and_organization(self):
+        refresh_service_at_location_search_records()
+
+        record = ServiceAtLocationSearchRecord.objects.get(service_at_location=self.service_at_location)
+        self.assertEqual(record.service_id, self.service.id)
+        self.assertEqual(record.location_id, self.location.id)
+        self.assertEqual(record.organization_id, self.organization.id)
+        self.assertEqual(record.service_name, self.service.name)
+        self.assertEqual(record.service_description, self.service.description)
+        self.assertEqual(record.location_name, self.location.name)
+        self.assertEqual(record.organization_name, self.organization.name)
+        self.assertEqual(record.point, Point(-123.1, 49.2))
+
+    def test_stores_region_from_end_of_service_id(self):
+        refresh_service_at_location_search_records()
+
+        record = ServiceAtLocationSearchRecord.objects.get(service_at_location=self.service_at_location)
+        self.assertEqual(record.region, 'bc')
+
+    def test_stores_taxonomy_terms_with_taxonomy_id(self):
+        refresh_service_at_location_search_records()
+
+        record = ServiceAtLocationSearchRecord.objects.get(service_at_location=self.service_at_location)
+        expected_term = '{}:{}'.format(self.taxonomy_term.taxonomy_id, self.taxonomy_term.name)
+        self.assertEqual(record.taxonomy_terms, [expected_term])
+
+    def test_replaces_records_with_current_data(self):
+        refresh_service_at_location_search_records()
+        new_name = a_string()
+        self.service.name = new_name
+        self.service.save()
+
+        refresh_service_at_location_search_records()
+
+        record = ServiceAtLocationSearchRecord.objects.get(service_at_location=self.service_at_location)
+        self.assertEqual(record.service_name, new_name)
+        self.assertEqual(ServiceAtLocationSearchRecord.objects.count(), 1)
+
+    def test_deletes_record_when_data_it_was_copied_from_changes(self):
+        refresh_service_at_location_search_records()
+        self.service.name = a_string()
+        self.service.save()
+
+        self.assertEqual(ServiceAtLocationSearchRecord.objects.count(), 0)
+
+    def test_deletes_record_when_taxonomy_term_is_renamed(self):
+        refresh_service_at_location_search_records()
+        self.taxonomy_term.name = a_string()
+        self.taxonomy_term.save()
+
+        self.assertEqual(ServiceAtLocationSearchRecord.objects.count(), 0)
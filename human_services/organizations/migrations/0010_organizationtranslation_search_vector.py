@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 14:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CREATE_SEARCH_VECTOR_TRIGGER_SQL = ['''
+CREATE TRIGGER organizations_organization_translation_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON organizations_organization_translation
+    FOR EACH ROW EXECUTE PROCEDURE update_translation_search_vector()
+''', '''
+UPDATE organizations_organization_translation SET search_vector = NULL
+''', '''
+CREATE INDEX organizations_organization_translation_search_vector_idx
+    ON organizations_organization_translation USING GIN (search_vector)
+''']
+
+DROP_SEARCH_VECTOR_TRIGGER_SQL = [
+    'DROP INDEX organizations_organization_translation_search_vector_idx',
+    'DROP TRIGGER organizations_organization_translation_search_vector_trigger ON organizations_organization_translation',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0009_auto_20201210_0121'),
+        ('services', '0014_servicetranslation_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizationtranslation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The trigger function is created in services migration 0014
+        migrations.RunSQL(sql=CREATE_SEARCH_VECTOR_TRIGGER_SQL, reverse_sql=DROP_SEARCH_VECTOR_TRIGGER_SQL),
+    ]
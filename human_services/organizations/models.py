@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core import validators
 from parler.models import TranslatableModel, TranslatedFields
@@ -10,7 +11,8 @@ class Organization(ValidateOnSaveMixin, TranslatableModel):
     translations = TranslatedFields(
         name=models.CharField(blank=False, max_length=200),
         alternate_name=models.CharField(blank=True, null=True, max_length=200),
-        description=models.TextField(blank=True, null=True)
+        description=models.TextField(blank=True, null=True),
+        search_vector=SearchVectorField(null=True, editable=False)
     )
 
     class Meta:
@@ -9,7 +9,9 @@ from common.filter_parameter_parsers import TaxonomyParser
 def get_service_list_schema():
     operation_description = 'Get a list of services'
     manual_parameters = ([documentation.get_taxonomy_terms_manual_parameter(),
-                          documentation.get_page_manual_parameter()])
+                          documentation.get_page_manual_parameter(),
+                          documentation.get_search_mode_manual_parameter()] +
+                         documentation.get_cursor_pagination_manual_parameters())
     responses = {
                     200: openapi.Response('A list of zero or more services', ServiceSerializer(many=True)),
                     400: ', '.join(TaxonomyParser.errors_to_list()),
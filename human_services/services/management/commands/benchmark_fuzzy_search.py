@@ -0,0 +1,99 @@
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from human_services.locations.management.commands.benchmark_proximity_queries import percentile
+from human_services.services.models import Service
+
+# invoke as follows, after importing the BC211 data:
+# python manage.py benchmark_fuzzy_search --requests 200 --budget 250
+
+ENDPOINTS = ['/v1/services/', '/v1/services_at_location/']
+
+
+class Command(BaseCommand):
+    help = ('Measure response times of fuzzy search on service names with spelling mistakes, '
+            'compared to full text search on the same names spelled correctly, using the data '
+            'in the database. Fails if the 95th percentile of fuzzy search is over budget')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests',
+                            dest='request_count',
+                            type=int,
+                            default=100,
+                            help='number of requests to time for each endpoint and search mode')
+        parser.add_argument('--budget',
+                            dest='budget_ms',
+                            type=float,
+                            default=250,
+                            help='largest acceptable 95th percentile response time in milliseconds')
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        names = get_random_service_names(options['request_count'])
+        if not names:
+            raise CommandError('No services to search for, import data first')
+        misspelled_names = [misspell(name) for name in names]
+
+        over_budget = []
+        for endpoint in ENDPOINTS:
+            for search_mode, search_texts in [('full_text', names), ('fuzzy', misspelled_names)]:
+                timings, hit_count = time_searches(endpoint, search_mode, search_texts, names)
+                p95 = percentile(timings, 95)
+                self.stdout.write('{}, {}: p50 {:.1f} ms, p95 {:.1f} ms, {} of {} names found'.format(
+                    endpoint, search_mode, percentile(timings, 50), p95, hit_count, len(names)))
+                if search_mode == 'fuzzy' and p95 > options['budget_ms']:
+                    over_budget.append(endpoint)
+
+        if over_budget:
+            raise CommandError('Fuzzy search over budget of {} ms for {}'.format(
+                options['budget_ms'], ', '.join(over_budget)))
+
+
+def get_random_service_names(count):
+    translations = Service.translations.rel.related_model.objects.filter(language_code='en')
+    names = list(translations.exclude(name='').values_list('name', flat=True))
+    return random.sample(names, min(count, len(names)))
+
+
+def misspell(name):
+    # Drop, double or swap a letter in one of the longer words, the kind of mistakes
+    # that full text search does not forgive
+    words = name.split()
+    long_word_indexes = [i for i, word in enumerate(words) if len(word) > 3]
+    if not long_word_indexes:
+        return name
+    word_index = random.choice(long_word_indexes)
+    word = words[word_index]
+    i = random.randrange(1, len(word) - 1)
+    mistake = random.choice(['drop', 'double', 'swap'])
+    if mistake == 'drop':
+        word = word[:i] + word[i + 1:]
+    elif mistake == 'double':
+        word = word[:i] + word[i] + word[i:]
+    else:
+        word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    words[word_index] = word
+    return ' '.join(words)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+def time_searches(endpoint, search_mode, search_texts, expected_names):
+    client = Client()
+    timings = []
+    hit_count = 0
+    for search_text, expected_name in zip(search_texts, expected_names):
+        parameters = {'search': search_text, 'search_mode': search_mode}
+        start_time = time.perf_counter()
+        response = client.get(endpoint, parameters, HTTP_ACCEPT_LANGUAGE='en')
+        timings.append(1000 * (time.perf_counter() - start_time))
+        if response.status_code != 200:
+            raise CommandError('{} with {} returned status {}'.format(endpoint, parameters,
+                                                                      response.status_code))
+        if any(get_service_name(row) == expected_name for row in response.json()):
+            hit_count += 1
+    return timings, hit_count
+
+
+def get_service_name(row):
+    return row['service']['name'] if 'service' in row else row['name']
@@ -0,0 +1,78 @@
+# Generated by Django 3.2 on 2026-10-18 14:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The text search configuration for each language, languages without one in
+# PostgreSQL are split into words without stemming
+CREATE_SEARCH_FUNCTIONS_SQL = ['''
+CREATE FUNCTION search_config_for_language(language_code text) RETURNS regconfig AS $$
+    SELECT CASE language_code
+        WHEN 'en' THEN 'english'::regconfig
+        WHEN 'fr' THEN 'french'::regconfig
+        ELSE 'simple'::regconfig
+    END
+$$ LANGUAGE SQL IMMUTABLE
+''', '''
+CREATE FUNCTION to_translation_search_vector(language_code text, name text,
+                                             alternate_name text, description text)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector(search_config_for_language(language_code), coalesce(name, '')) ||
+                     to_tsvector('simple', coalesce(name, '')), 'A') ||
+           setweight(to_tsvector(search_config_for_language(language_code), coalesce(alternate_name, '')) ||
+                     to_tsvector('simple', coalesce(alternate_name, '')), 'B') ||
+           setweight(to_tsvector(search_config_for_language(language_code), coalesce(description, '')) ||
+                     to_tsvector('simple', coalesce(description, '')), 'C')
+$$ LANGUAGE SQL IMMUTABLE
+''', '''
+CREATE FUNCTION update_translation_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_translation_search_vector(NEW.language_code, NEW.name,
+                                                      NEW.alternate_name, NEW.description);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+''']
+
+DROP_SEARCH_FUNCTIONS_SQL = [
+    'DROP FUNCTION update_translation_search_vector()',
+    'DROP FUNCTION to_translation_search_vector(text, text, text, text)',
+    'DROP FUNCTION search_config_for_language(text)',
+]
+
+CREATE_SEARCH_VECTOR_TRIGGER_SQL = ['''
+CREATE TRIGGER services_service_translation_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON services_service_translation
+    FOR EACH ROW EXECUTE PROCEDURE update_translation_search_vector()
+''', '''
+UPDATE services_service_translation SET search_vector = NULL
+''', '''
+CREATE INDEX services_service_translation_search_vector_idx
+    ON services_service_translation USING GIN (search_vector)
+''']
+
+DROP_SEARCH_VECTOR_TRIGGER_SQL = [
+    'DROP INDEX services_service_translation_search_vector_idx',
+    'DROP TRIGGER services_service_translation_search_vector_trigger ON services_service_translation',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0013_auto_20201210_0123'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicetranslation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The search vector is kept up to date by the database, so that it is also right
+        # for rows written by bulk imports and raw SQL. The functions are also used by
+        # the location and organization translations, and by queries in common.text_search
+        migrations.RunSQL(sql=CREATE_SEARCH_FUNCTIONS_SQL, reverse_sql=DROP_SEARCH_FUNCTIONS_SQL),
+        migrations.RunSQL(sql=CREATE_SEARCH_VECTOR_TRIGGER_SQL, reverse_sql=DROP_SEARCH_VECTOR_TRIGGER_SQL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 15:05
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0014_servicetranslation_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # For fuzzy search on service names, see TrigramWordSimilar in common.text_search
+        migrations.RunSQL(
+            sql=('CREATE INDEX services_service_translation_name_trigram_idx '
+                 'ON services_service_translation USING GIN (name gin_trgm_ops)'),
+            reverse_sql='DROP INDEX services_service_translation_name_trigram_idx',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from common.models import ValidateOnSaveMixin, RequiredCharField, OptionalCharField
 from django.core import validators
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from parler.models import TranslatableModel, TranslatedFields
 from human_services.organizations.models import Organization
@@ -17,7 +18,8 @@ class Service(ValidateOnSaveMixin, TranslatableModel):
                                             db_table='services_service_taxonomy_terms')
     translations = TranslatedFields(name=models.CharField(max_length=255),
                                     alternate_name=models.CharField(blank=True, null=True, max_length=255),
-                                    description=models.TextField(blank=True, null=True))
+                                    description=models.TextField(blank=True, null=True),
+                                    search_vector=SearchVectorField(null=True, editable=False))
     email = OptionalCharField(max_length=200, validators=[validators.EmailValidator()])
     website = OptionalCharField(max_length=255, validators=[validators.URLValidator()])
     last_verified_date = models.DateField(blank=True, null=True)
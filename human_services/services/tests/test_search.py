@@ -1,5 +1,7 @@
 from django.test import TestCase
 from django.core.exceptions import SuspiciousOperation
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import test as rest_test
 from rest_framework import status
 from common.testhelpers.random_test_values import a_string
@@ -197,7 +199,7 @@ class ServicesFullTextSearchTests(rest_test.APITestCase):
     def test_full_text_search_with_two_search_terms_implies_logical_and(self):
         first_name = a_string()
         second_name = a_string()
-        combined_name = first_name + second_name
+        combined_name = first_name + ' ' + second_name
         ServiceBuilder(self.organization).with_name(first_name).create()
         ServiceBuilder(self.organization).with_name(second_name).create()
         ServiceBuilder(self.organization).with_name(combined_name).create()
@@ -228,6 +230,61 @@ class ServicesFullTextSearchTests(rest_test.APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.json()), 0)
 
+    def test_full_text_search_finds_words_with_the_same_stem(self):
+        ServiceBuilder(self.organization).with_name('Housing support').create()
+
+        url = '/v1/services/?search=houses'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]['name'], 'Housing support')
+
+    # pylint: disable=invalid-name
+    def test_full_text_search_returns_match_on_name_before_match_on_description(self):
+        the_search_term = a_string()
+        ServiceBuilder(self.organization).with_description(the_search_term).create()
+        match_on_name = ServiceBuilder(self.organization).with_name(the_search_term).create()
+
+        url = '/v1/services/?search={0}'.format(the_search_term)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response.json()[0]['id'], match_on_name.id)
+
+    def test_full_text_search_results_can_be_sorted_by_other_fields(self):
+        the_search_term = a_string()
+        ServiceBuilder(self.organization).with_id('a').with_name(the_search_term).create()
+        ServiceBuilder(self.organization).with_id('b').with_description(the_search_term).create()
+
+        url = '/v1/services/?search={0}&sort_by=-id'.format(the_search_term)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([service['id'] for service in response.json()], ['b', 'a'])
+
+    def test_full_text_search_results_can_be_sorted_by_search_rank(self):
+        the_search_term = a_string()
+        ServiceBuilder(self.organization).with_id('a').with_name(the_search_term).create()
+        ServiceBuilder(self.organization).with_id('b').with_description(the_search_term).create()
+
+        url = '/v1/services/?search={0}&sort_by=search_rank'.format(the_search_term)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([service['id'] for service in response.json()], ['b', 'a'])
+
+    def test_full_text_search_uses_stored_search_vector(self):
+        ServiceBuilder(self.organization).create()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/v1/services/?search={0}'.format(a_string()))
+
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertIn('"services_service_translation"."search_vector" @@', sql)
+        self.assertNotIn('LIKE', sql)
+
     def test_can_combine_taxonomic_search_and_full_text_search(self):
         the_search_term = a_string()
         the_taxonomy_term = TaxonomyTermBuilder().create()
@@ -249,6 +306,56 @@ class ServicesFullTextSearchTests(rest_test.APITestCase):
         self.assertEqual(len(response.json()), 1)
         self.assertEqual(response.json()[0]['name'], a_service.name)
 
+
+class ServicesFuzzySearchTests(rest_test.APITestCase):
+    def setUp(self):
+        self.organization = OrganizationBuilder().create()
+
+    def test_fuzzy_search_returns_service_with_misspelled_name(self):
+        ServiceBuilder(self.organization).with_name('Surrey Food Bank').create()
+
+        url = '/v1/services/?search=fod,bank&search_mode=fuzzy'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]['name'], 'Surrey Food Bank')
+
+    def test_full_text_search_does_not_return_service_with_misspelled_name(self):
+        ServiceBuilder(self.organization).with_name('Surrey Food Bank').create()
+
+        url = '/v1/services/?search=fod,bank&search_mode=full_text'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 0)
+
+    def test_fuzzy_search_does_not_return_dissimilar_names(self):
+        ServiceBuilder(self.organization).with_name('Legal Clinic').create()
+
+        url = '/v1/services/?search=fod,bank&search_mode=fuzzy'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 0)
+
+    def test_fuzzy_search_returns_most_similar_name_first(self):
+        ServiceBuilder(self.organization).with_id('a').with_name('Youth Food Banking').create()
+        ServiceBuilder(self.organization).with_id('b').with_name('Food Bank').create()
+
+        url = '/v1/services/?search=food,bank&search_mode=fuzzy'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([service['id'] for service in response.json()], ['b', 'a'])
+
+    def test_returns_400_for_invalid_search_mode(self):
+        url = '/v1/services/?search=food&search_mode={0}'.format(a_string())
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class ServicesSorting(rest_test.APITestCase):
     def setUp(self):
         self.organization = OrganizationBuilder().create()
@@ -5,21 +5,26 @@ from common.filters import (SearchFilter, OrganizationIdFilter, LocationIdFilter
                             TaxonomyFilter, MultiFieldOrderingFilter)
 from search.models import TaskServiceSimilarityScore
 from search.serializers import RelatedTopicsForGivenServiceSerializer
+from common.view import CachedResponseMixin, SerializerTimingMixin
 
 # pylint: disable=too-many-ancestors
 @method_decorator(name='list', decorator=documentation.get_service_list_schema())
-class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = models.Service.objects.all()
+class ServiceViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = (models.Service.objects.
+                select_related('organization').
+                prefetch_related('translations').
+                prefetch_related('organization__translations'))
     serializer_class = serializers.ServiceSerializer
-    search_fields = ('translations__name', 'translations__description',)
-    filter_backends = (MultiFieldOrderingFilter, SearchFilter, OrganizationIdFilter,
+    text_search_fields = (('id', models.Service),)
+    # Searching sorts by relevance, sorting after searching lets sort_by override that
+    filter_backends = (SearchFilter, MultiFieldOrderingFilter, OrganizationIdFilter,
                        LocationIdFilter, TaxonomyFilter,)
     ordering_fields = '__all__'
 
 
 # pylint: disable=too-many-ancestors
 @method_decorator(name='list', decorator=documentation.get_topic_list_schema())
-class ServiceTopicsViewSet(viewsets.ReadOnlyModelViewSet):
+class ServiceTopicsViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         service_id = self.kwargs['service_id']
         return (TaskServiceSimilarityScore.objects.
@@ -13,7 +13,9 @@ def get_service_at_location_list_schema():
                           documentation.get_taxonomy_terms_manual_parameter(),
                           documentation.get_page_manual_parameter(),
                           documentation.get_related_to_topic_manual_parameter(),
-                          documentation.get_region_filter_manual_parameter()])
+                          documentation.get_region_filter_manual_parameter(),
+                          documentation.get_search_mode_manual_parameter()] +
+                         documentation.get_cursor_pagination_manual_parameters())
     responses = {
         200: openapi.Response('A list of zero or more services at locations',
                               ServiceAtLocationSerializer(many=True)),
@@ -9,7 +9,13 @@ from human_services.services.tests.helpers import ServiceBuilder
 from newcomers_guide.tests.helpers import create_topic
 from taxonomies.tests.helpers import TaxonomyTermBuilder
 from common.testhelpers.random_test_values import a_float, a_string, a_region_specific_id
+from common.tests.test_views import get_links
 from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+from human_services.locations.search_records import refresh_service_at_location_search_records
 from human_services.locations.models import ServiceAtLocation
 
 
@@ -59,6 +65,36 @@ class ServicesAtLocationApiTests(rest_test.APITestCase):
         self.assertEqual(json[2]['location']['name'], third_location.name)
         self.assertEqual(json[3]['location']['name'], fourth_location.name)
 
+    def test_can_page_by_proximity_with_cursor(self):
+        for longitude in [30, 0, 25, 10]:
+            location = LocationBuilder(self.organization).with_long_lat(longitude, longitude).create()
+            set_location_for_service(self.service.id, location.id)
+
+        url = '/v1/services_at_location/?proximity=0,0&pagination=cursor&per_page=3'
+        first_page = self.client.get(url)
+        next_url = first_page['Link'].split(';')[0].strip()[1:-1]
+        second_page = self.client.get(next_url)
+
+        longitudes = [row['location']['longitude'] for row in first_page.json() + second_page.json()]
+        self.assertEqual(longitudes, [0, 10, 25, 30])
+
+    def test_pages_by_proximity_with_cursor_through_locations_without_point(self):
+        for name, point in [('far', Point(30, 30)), ('no point', None), ('near', Point(0, 0)),
+                            ('also no point', None), ('middle', Point(10, 10))]:
+            location = LocationBuilder(self.organization).with_name(name).with_point(point).create()
+            set_location_for_service(self.service.id, location.id)
+
+        names = []
+        url = '/v1/services_at_location/?proximity=0,0&pagination=cursor&per_page=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names += [row['location']['name'] for row in response.json()]
+            url = get_links(response).get('next')
+
+        self.assertEqual(names[:3], ['near', 'middle', 'far'])
+        self.assertCountEqual(names[3:], ['no point', 'also no point'])
+
     def test_proximity_sorts_in_km_not_in_degrees(self):
         # using points far north where one degree distance east/west is
         # much shorter in km than one degree distance north/south
@@ -163,6 +199,17 @@ class ServicesAtLocationApiTests(rest_test.APITestCase):
         response = self.client.get(url_with_negative_radius)
         self.assertEqual(response.json()[0], 'Invalid value for radius_km, must be a positive number')
 
+    def test_proximity_queries_use_geography_operators_that_can_use_the_spatial_index(self):
+        url = '/v1/services_at_location/?proximity=-123.06,49.27&user_location=-123.06,49.27'
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('"point"::geography <->', sql)
+        self.assertIn('ST_DWithin("locations_location"."point"::geography', sql)
+
     def test_can_order_by_similarity_to_topic(self):
         topic_id = a_string()
         create_topic(topic_id)
@@ -401,6 +448,41 @@ class ServicesAtLocationApiTests(rest_test.APITestCase):
         self.assertEqual(json[0]['service']['name'], near_service.name)
         self.assertEqual(json[1]['service']['name'], far_service.name)
 
+    def create_service_at_longitude(self, longitude, topic_id, similarity_score, builder=None):
+        location = LocationBuilder(self.organization).with_long_lat(longitude, 0).create()
+        service = (builder or ServiceBuilder(self.organization)).with_location(location).create()
+        set_service_similarity_score(topic_id, service.id, similarity_score)
+        return service
+
+    @override_settings(TOPIC_PROXIMITY_CANDIDATE_COUNT=2)
+    def test_ranks_only_nearest_services_related_to_topic(self):
+        topic_id = a_string()
+        create_topic(topic_id)
+        near_service = self.create_service_at_longitude(0.0001, topic_id, 0.1)
+        less_near_service = self.create_service_at_longitude(0.0002, topic_id, 0.5)
+        self.create_service_at_longitude(0.0003, topic_id, 0.9)
+
+        url = ('/v1/services_at_location/?related_to_topic={0}&proximity=0,0'.format(topic_id))
+        json = self.client.get(url).json()
+
+        self.assertEqual([row['service']['name'] for row in json],
+                         [less_near_service.name, near_service.name])
+
+    @override_settings(TOPIC_PROXIMITY_CANDIDATE_COUNT=1)
+    def test_picks_nearest_services_related_to_topic_after_other_filters(self):
+        topic_id = a_string()
+        create_topic(topic_id)
+        taxonomy_terms = TaxonomyTermBuilder().create_many()
+        self.create_service_at_longitude(0.0001, topic_id, 0.5)
+        expected_service = self.create_service_at_longitude(
+            0.0002, topic_id, 0.5, ServiceBuilder(self.organization).with_taxonomy_terms(taxonomy_terms))
+
+        url = ('/v1/services_at_location/?related_to_topic={0}&proximity=0,0&taxonomy_terms={1}.{2}'.
+               format(topic_id, taxonomy_terms[0].taxonomy_id, taxonomy_terms[0].name))
+        json = self.client.get(url).json()
+
+        self.assertEqual([row['service']['name'] for row in json], [expected_service.name])
+
     def test_can_full_text_search_on_service_name(self):
         service_at_locations = ServiceAtLocationBuilder().create_many()
         service_name = service_at_locations[0].service.name
@@ -433,6 +515,28 @@ class ServicesAtLocationApiTests(rest_test.APITestCase):
         self.assertEqual(len(json), 1)
         self.assertEqual(json[0]['location']['description'], location_description)
 
+    def test_can_full_text_search_with_terms_split_across_service_and_location(self):
+        service = ServiceBuilder(self.organization).with_name('Community Food Bank').create()
+        location = LocationBuilder(self.organization).with_name('Vancouver Drop-in Centre').create()
+        set_location_for_service(service.id, location.id)
+        set_location_for_service(service.id, LocationBuilder(self.organization).with_name('Surrey Office').create().id)
+
+        json = self.client.get('/v1/services_at_location/?search=food,vancouver').json()
+
+        self.assertEqual(len(json), 1)
+        self.assertEqual(json[0]['service']['name'], 'Community Food Bank')
+        self.assertEqual(json[0]['location']['name'], 'Vancouver Drop-in Centre')
+
+    def test_can_fuzzy_search_on_misspelled_location_name(self):
+        location = LocationBuilder(self.organization).with_name('Newcomer Welcome Centre').create()
+        set_location_for_service(self.service.id, location.id)
+        set_location_for_service(self.service.id, LocationBuilder(self.organization).create().id)
+
+        json = self.client.get('/v1/services_at_location/?search=welcom,center&search_mode=fuzzy').json()
+
+        self.assertEqual(len(json), 1)
+        self.assertEqual(json[0]['location']['name'], 'Newcomer Welcome Centre')
+
     def test_can_filter_by_location_id(self):
         service_at_locations = ServiceAtLocationBuilder().create_many()
         expected_service_at_location = service_at_locations[0]
@@ -546,4 +650,97 @@ class ServicesAtLocationApiTests(rest_test.APITestCase):
 
         self.assertEqual(len(json), 1)
         self.assertEqual(json[0]['location']['id'], bc_service_at_location.location.id)
-        self.assertEqual(json[0]['service']['id'], bc_service_at_location.service.id)
\ No newline at end of file
+        self.assertEqual(json[0]['service']['id'], bc_service_at_location.service.id)
+
+
+@override_settings(USE_SERVICE_AT_LOCATION_SEARCH_RECORDS=True)
+class ServicesAtLocationFromSearchRecordsApiTests(rest_test.APITestCase):
+    def setUp(self):
+        translation.activate('en')
+        self.organization = OrganizationBuilder().create()
+
+    def create_service_at_location(self, service_builder, location):
+        service = service_builder.with_location(location).create()
+        return ServiceAtLocation.objects.get(service=service, location=location)
+
+    def test_can_filter_by_region(self):
+        location = LocationBuilder(self.organization).create()
+        self.create_service_at_location(ServiceBuilder(self.organization).with_id(a_region_specific_id('bc')),
+                                        location)
+        mb_service_at_location = self.create_service_at_location(
+            ServiceBuilder(self.organization).with_id(a_region_specific_id('mb')), location)
+        refresh_service_at_location_search_records()
+
+        json = self.client.get('/v1/services_at_location/?region=MB').json()
+
+        self.assertEqual([row['id'] for row in json], [mb_service_at_location.id])
+
+    def test_can_filter_by_taxonomy(self):
+        taxonomy_terms = TaxonomyTermBuilder().create_many()
+        location = LocationBuilder(self.organization).create()
+        expected = self.create_service_at_location(
+            ServiceBuilder(self.organization).with_taxonomy_terms(taxonomy_terms), location)
+        self.create_service_at_location(ServiceBuilder(self.organization), location)
+        refresh_service_at_location_search_records()
+
+        json = self.client.get('/v1/services_at_location/?taxonomy_terms={0}.{1}'.format(
+            taxonomy_terms[0].taxonomy_id, taxonomy_terms[0].name)).json()
+
+        self.assertEqual([row['id'] for row in json], [expected.id])
+
+    def test_can_order_by_proximity(self):
+        near_location = LocationBuilder(self.organization).with_long_lat(0.1, 0).create()
+        far_location = LocationBuilder(self.organization).with_long_lat(1.0, 0).create()
+        far = self.create_service_at_location(ServiceBuilder(self.organization), far_location)
+        near = self.create_service_at_location(ServiceBuilder(self.organization), near_location)
+        refresh_service_at_location_search_records()
+
+        json = self.client.get('/v1/services_at_location/?proximity=0,0').json()
+
+        self.assertEqual([row['id'] for row in json], [near.id, far.id])
+
+    def test_can_filter_by_proximity(self):
+        near_location = LocationBuilder(self.organization).with_long_lat(0.1, 0).create()
+        far_location = LocationBuilder(self.organization).with_long_lat(1.0, 0).create()
+        near = self.create_service_at_location(ServiceBuilder(self.organization), near_location)
+        self.create_service_at_location(ServiceBuilder(self.organization), far_location)
+        refresh_service_at_location_search_records()
+
+        json = self.client.get('/v1/services_at_location/?user_location=0,0').json()
+
+        self.assertEqual([row['id'] for row in json], [near.id])
+
+    def test_can_search_in_service_name(self):
+        location = LocationBuilder(self.organization).create()
+        name = a_string()
+        expected = self.create_service_at_location(ServiceBuilder(self.organization).with_name(name), location)
+        self.create_service_at_location(ServiceBuilder(self.organization), location)
+        refresh_service_at_location_search_records()
+
+        json = self.client.get('/v1/services_at_location/?search={}'.format(name)).json()
+
+        self.assertEqual([row['id'] for row in json], [expected.id])
+
+    def test_finds_service_at_location_added_since_records_were_rebuilt(self):
+        refresh_service_at_location_search_records()
+        taxonomy_term = TaxonomyTermBuilder().create()
+        expected = self.create_service_at_location(
+            ServiceBuilder(self.organization).with_id(a_region_specific_id('bc')).with_taxonomy_terms([taxonomy_term]),
+            LocationBuilder(self.organization).with_long_lat(0.1, 0).create())
+
+        url = '/v1/services_at_location/?region=BC&taxonomy_terms={0}.{1}&user_location=0,0'.format(
+            taxonomy_term.taxonomy_id, taxonomy_term.name)
+        json = self.client.get(url).json()
+
+        self.assertEqual([row['id'] for row in json], [expected.id])
+
+    def test_finds_service_at_location_whose_record_is_stale(self):
+        location = LocationBuilder(self.organization).with_long_lat(1.0, 0).create()
+        expected = self.create_service_at_location(ServiceBuilder(self.organization), location)
+        refresh_service_at_location_search_records()
+        location.point = Point(0.1, 0)
+        location.save()
+
+        json = self.client.get('/v1/services_at_location/?user_location=0,0').json()
+
+        self.assertEqual([row['id'] for row in json], [expected.id])
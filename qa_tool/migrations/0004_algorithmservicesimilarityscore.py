@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0013_auto_20201210_0123'),
+        ('search', '0012_merge_20200706_1831'),
+        ('qa_tool', '0003_merge_20200706_1812'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlgorithmServiceSimilarityScore',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity_score', models.FloatField()),
+                ('algorithm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='qa_tool.algorithm')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='services.service')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='search.task')),
+            ],
+            options={
+                'ordering': ['id'],
+                'unique_together': {('algorithm', 'topic', 'service')},
+            },
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.contrib.gis.db import models
 from common.models import (RequiredURLField,
                            OptionalTextField, RequiredCharField)
 from human_services.locations.models import ServiceAtLocation
+from human_services.services.models import Service
 from search.models import Task
 from users.models import User
 
@@ -35,3 +36,14 @@ class RelevancyScore(models.Model):
 
     class Meta:
         ordering = ["id"]
+
+
+class AlgorithmServiceSimilarityScore(models.Model):
+    algorithm = models.ForeignKey(Algorithm, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Task, on_delete=models.CASCADE)
+    service = models.ForeignKey(Service, on_delete=models.CASCADE)
+    similarity_score = models.FloatField()
+
+    class Meta:
+        unique_together = ('algorithm', 'topic', 'service')
+        ordering = ['id']
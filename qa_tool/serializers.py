@@ -22,3 +22,9 @@ class RelevancyScoreSerializer(serializers.ModelSerializer):
         model = models.RelevancyScore
         fields = ('id', 'value', 'time_stamp', 'algorithm',
                   'search_location', 'user', 'service_at_location', 'topic')
+
+
+class AlgorithmServiceSimilarityScoreSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.AlgorithmServiceSimilarityScore
+        fields = ('algorithm', 'topic', 'service', 'similarity_score')
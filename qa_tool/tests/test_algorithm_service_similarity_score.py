@@ -0,0 +1,38 @@
+from rest_framework import test as rest_test
+from rest_framework import status
+from human_services.organizations.tests.helpers import OrganizationBuilder
+from human_services.services.tests.helpers import ServiceBuilder
+from newcomers_guide.tests.helpers import create_topic
+from qa_tool.models import AlgorithmServiceSimilarityScore
+from qa_tool.tests.helpers import AlgorithmBuilder
+from common.testhelpers.random_test_values import a_string
+
+
+class AlgorithmServiceSimilarityScoresTests(rest_test.APITestCase):
+    def setUp(self):
+        self.algorithm = AlgorithmBuilder().create()
+        self.topic = create_topic(a_string())
+        organization = OrganizationBuilder().create()
+        self.more_related_service = ServiceBuilder(organization).create()
+        self.less_related_service = ServiceBuilder(organization).create()
+        AlgorithmServiceSimilarityScore(algorithm=self.algorithm, topic=self.topic,
+                                        service=self.less_related_service, similarity_score=0.1).save()
+        AlgorithmServiceSimilarityScore(algorithm=self.algorithm, topic=self.topic,
+                                        service=self.more_related_service, similarity_score=0.9).save()
+        self.url = '/qa/v1/algorithms/{}/topics/{}/related_services/'.format(self.algorithm.id, self.topic.id)
+
+    def test_returns_services_ordered_by_score(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([score['service'] for score in response.json()],
+                         [self.more_related_service.id, self.less_related_service.id])
+
+    def test_does_not_return_scores_for_other_algorithms(self):
+        other_algorithm = AlgorithmBuilder().create()
+        url = '/qa/v1/algorithms/{}/topics/{}/related_services/'.format(other_algorithm.id, self.topic.id)
+        response = self.client.get(url)
+        self.assertEqual(response.json(), [])
+
+    def test_cannot_post(self):
+        response = self.client.post(self.url, {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -68,3 +68,12 @@ class AlgorithmViewSet(viewsets.ReadOnlyModelViewSet):
 class SearchLocationViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = models.SearchLocation.objects.all()
     serializer_class = serializers.SearchLocationSerializer
+
+
+class AlgorithmServiceSimilarityScoreViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = serializers.AlgorithmServiceSimilarityScoreSerializer
+
+    def get_queryset(self):
+        return (models.AlgorithmServiceSimilarityScore.objects.
+                filter(algorithm=self.kwargs['algorithm_id'], topic=self.kwargs['topic_id']).
+                order_by('-similarity_score'))
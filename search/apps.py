@@ -1,5 +1,26 @@
+import logging
 from django.apps import AppConfig
+from django.conf import settings
+
+LOGGER = logging.getLogger(__name__)
 
 
 class SearchConfig(AppConfig):
     name = 'search'
+
+    def ready(self):
+        if settings.PRELOAD_TOPICS_FOR_TEXT_MODELS:
+            preload_topics_for_text_models()
+
+
+def preload_topics_for_text_models():
+    # Loads the models used by /v1/topics_for_text/ when the process starts rather than
+    # on its first request. A missing topic model is not an error, the endpoint answers
+    # 503 until compute_text_similarity_scores has saved one
+    from search.compute_similarities import load_spacy_model
+    from search.topic_model import get_current_topic_model
+    load_spacy_model()
+    try:
+        get_current_topic_model(settings.TOPIC_MODEL_PATH)
+    except (OSError, RuntimeError) as error:
+        LOGGER.warning('Topic model not preloaded: %s', error)
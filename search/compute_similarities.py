@@ -1,13 +1,37 @@
 import re
+import csv
+import collections
+import functools
+import hashlib
 import logging
+import time
+import tracemalloc
+import numpy
+import scipy.sparse
 import spacy
 import sklearn.preprocessing
-from textacy.vsm import Vectorizer
 from django.utils.text import slugify
 from spacy.lang.en.stop_words import STOP_WORDS as SPACY_STOP_WORDS
+from search.tokenization_cache import compute_cache_key
+from search.topic_model import build_topic_model
+from search.similarity_engines import SIMILARITY_ENGINES, DEFAULT_SIMILARITY_ENGINE
 
 LOGGER = logging.getLogger(__file__)
 
+# Number of service documents multiplied against the topic documents at a time, bounds
+# the size of the intermediate topic-by-service product
+SERVICE_CHUNK_SIZE = 5000
+
+SPACY_MODEL_NAME = 'en'
+
+# Only lemmas and token flags are used, lemmas depend on part-of-speech tags
+# so the tagger is needed, but the dependency parser and entity recognizer are not
+UNUSED_SPACY_PIPELINE_COMPONENTS = ['parser', 'ner']
+
+TOKENIZER_BATCH_SIZE = 1000
+
+EngineCost = collections.namedtuple('EngineCost', ['seconds', 'peak_memory_bytes', 'term_count'])
+
 
 def to_topic_ids_and_descriptions(topics, region):
     ids = []
@@ -39,12 +63,16 @@ def to_service_ids_and_descriptions(services, region):
     return (ids, descriptions)
 
 
-def compute_similarities_by_tf_idf(docs, topic_ids, service_ids, results_to_save, results_file):
-    if is_saving_intermediates_to_file(results_to_save, results_file):
-        return compute_similarities_and_save_intermediates(docs, topic_ids, service_ids,
-                                                           results_to_save, results_file)
-
-    return compute_similarities(docs)
+def compute_similarities_by_tf_idf(tokenized_docs, topic_ids, service_ids, results_to_save, results_file,
+                                   related_topic_count=None, related_service_count=None):
+    saving_intermediates = is_saving_intermediates_to_file(results_to_save, results_file)
+    vectorizer, term_matrix = SIMILARITY_ENGINES[DEFAULT_SIMILARITY_ENGINE].fit_term_matrix(tokenized_docs)
+    if saving_intermediates:
+        write_intermediary_results_as_csv(vectorizer, term_matrix, topic_ids,
+                                          service_ids, results_to_save, results_file)
+    similarities = compute_cosine_doc_similarities(term_matrix, len(topic_ids),
+                                                   related_topic_count, related_service_count)
+    return similarities, build_topic_model(vectorizer, term_matrix, topic_ids)
 
 
 def is_saving_intermediates_to_file(results_to_save, results_file):
@@ -63,24 +91,78 @@ def is_saving_intermediates_to_file(results_to_save, results_file):
     return False
 
 
-def compute_similarities(docs):
-    vectorizer = Vectorizer(tf_type='linear', apply_idf=True, idf_type='smooth', apply_dl=False)
-    term_matrix = compute_term_matrix(vectorizer, docs)
-    return compute_cosine_doc_similarities(term_matrix)
+def compute_similarities(docs, topic_count=None):
+    term_matrix = SIMILARITY_ENGINES[DEFAULT_SIMILARITY_ENGINE].compute_term_matrix(tokenize_documents(docs))
+    return compute_cosine_doc_similarities(term_matrix, topic_count)
+
+
+def compute_similarities_with_engine(engine, tokenized_docs, topic_count,
+                                     related_topic_count=None, related_service_count=None):
+    # Returns the similarities and what it cost to compute them, measured in one build: the
+    # time, which includes the overhead of tracing, and the peak memory allocated while
+    # building, as traced by Python, which includes numpy arrays
+    tracemalloc.start()
+    try:
+        start_time = time.perf_counter()
+        term_matrix = engine.compute_term_matrix(tokenized_docs)
+        similarities = compute_cosine_doc_similarities(term_matrix, topic_count,
+                                                       related_topic_count, related_service_count)
+        seconds = time.perf_counter() - start_time
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return similarities, EngineCost(seconds, peak_memory_bytes, term_matrix.shape[1])
+
+
+@functools.lru_cache(maxsize=None)
+def load_spacy_model():
+    # Loading the model takes seconds, so it is loaded once per process
+    return spacy.load(SPACY_MODEL_NAME, disable=UNUSED_SPACY_PIPELINE_COMPONENTS)
+
+
+def tokenize_text(text):
+    return to_lemmas(load_spacy_model()(text))
+
+
+def tokenize_documents(docs, workers=1, batch_size=TOKENIZER_BATCH_SIZE, cache=None):
+    nlp = load_spacy_model()
+    if cache is None:
+        return tokenize_with_spacy(nlp, docs, workers, batch_size)
+
+    tokenizer_version = compute_tokenizer_version(nlp)
+    keys = [compute_cache_key(doc, tokenizer_version) for doc in docs]
+    cached_tokens = cache.get_many(keys)
 
+    missing_indexes = [i for i, key in enumerate(keys) if key not in cached_tokens]
+    missing_docs = [docs[i] for i in missing_indexes]
+    new_tokens = tokenize_with_spacy(nlp, missing_docs, workers, batch_size)
+    new_tokens_by_key = {keys[i]: tokens for i, tokens in zip(missing_indexes, new_tokens)}
+    cache.set_many(new_tokens_by_key)
 
-def compute_similarities_and_save_intermediates(docs, topic_ids, service_ids, results_to_save, results_file):
-    vectorizer = Vectorizer(tf_type='linear', apply_idf=True, idf_type='smooth', apply_dl=False)
-    term_matrix = compute_term_matrix(vectorizer, docs)
-    write_intermediary_results_as_csv(vectorizer, term_matrix, topic_ids,
-                                      service_ids, results_to_save, results_file)
-    return compute_cosine_doc_similarities(term_matrix)
+    return [cached_tokens[key] if key in cached_tokens else new_tokens_by_key[key] for key in keys]
 
 
-def compute_term_matrix(vectorizer, docs):
-    nlp = spacy.load('en')
-    spacy_docs = [nlp(doc) for doc in docs]
-    tokenized_docs = ([token.lemma_.lower() for token in doc if not is_stop_word(token)] for doc in spacy_docs)
+def tokenize_with_spacy(nlp, docs, workers, batch_size):
+    spacy_docs = nlp.pipe(docs, batch_size=batch_size, n_process=workers)
+    return [to_lemmas(doc) for doc in spacy_docs]
+
+
+def compute_tokenizer_version(nlp):
+    # Cached tokens are only valid for the same model and the same stop words
+    version = hashlib.sha256()
+    version.update(spacy.__version__.encode('utf-8'))
+    version.update(nlp.meta.get('name', '').encode('utf-8'))
+    version.update(nlp.meta.get('version', '').encode('utf-8'))
+    version.update(' '.join(nlp.pipe_names).encode('utf-8'))
+    version.update(' '.join(sorted(STOPLIST)).encode('utf-8'))
+    return version.hexdigest()
+
+
+def to_lemmas(spacy_doc):
+    return [token.lemma_.lower() for token in spacy_doc if not is_stop_word(token)]
+
+
+def compute_term_matrix(vectorizer, tokenized_docs):
     return vectorizer.fit_transform(tokenized_docs)
 
 
@@ -107,54 +189,71 @@ STOPLIST = stop_list_all_lower_case()
 
 
 def write_intermediary_results_as_csv(vectorizer, term_matrix, topic_ids, service_ids, results_to_save, file_handle):
-    document_index = 0
-    score_matrix = term_matrix.toarray()
+    # Reads the non-zero scores of each row straight from the sparse matrix, densifying
+    # the matrix or looping over the whole vocabulary for each document does not scale
+    # to the full set of services
+    writer = csv.writer(file_handle, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    score_matrix = term_matrix.tocsr()
+    terms = vectorizer.terms_list
     document_ids = topic_ids + service_ids
-    for document_id in document_ids[0:results_to_save]:
-        write_intermediary_results_for_document(file_handle, vectorizer, score_matrix, document_index, document_id)
-        document_index += 1
+    for document_index, document_id in enumerate(document_ids[0:results_to_save]):
+        terms_with_scores = get_document_terms_sorted_by_scores(score_matrix, terms, document_index)
+        writer.writerow([document_id] + ['%s(%.2f)' % (term, score) for term, score in terms_with_scores])
     file_handle.close()
 
 
-def write_intermediary_results_for_document(file_handle, vectorizer, score_matrix, document_index, document_id):
-    file_handle.write('"')
-    file_handle.write(document_id)
-    file_handle.write('"')
-    write_terms_sorted_by_scores(file_handle, vectorizer, score_matrix, document_index)
-    file_handle.write('\n')
-
-
-def write_terms_sorted_by_scores(file_handle, vectorizer, score_matrix, document_index):
-    terms_with_scores = get_document_terms(vectorizer, score_matrix, document_index)
-    terms_sorted_by_score = sorted(terms_with_scores, key=lambda term: term[1], reverse=True)
-    write_comma_separated_terms_with_scores(file_handle, terms_sorted_by_score)
-
-
-def get_document_terms(vectorizer, score_matrix, document_index):
-    document_terms = []
-    for term_index in range(len(vectorizer.terms_list)):
-        score = score_matrix[document_index][term_index]
-        if score > 0:
-            term = vectorizer.terms_list[term_index]
-            document_terms.append((term, score))
-    return document_terms
-
-
-def write_comma_separated_terms_with_scores(file_handle, document_terms):
-    for term_with_score in document_terms:
-        term = term_with_score[0]
-        score = term_with_score[1]
-
-        file_handle.write(',"')
-        file_handle.write(term)
-        file_handle.write('(')
-        file_handle.write('%.2f' % score)
-        file_handle.write(')"')
-
-
-def compute_cosine_doc_similarities(matrix):
-    normalized_matrix = sklearn.preprocessing.normalize(matrix, axis=1)
-    return normalized_matrix * normalized_matrix.T
+def get_document_terms_sorted_by_scores(score_matrix, terms, document_index):
+    # Highest score first, terms with equal scores in vocabulary order
+    row_start = score_matrix.indptr[document_index]
+    row_end = score_matrix.indptr[document_index + 1]
+    term_indexes = score_matrix.indices[row_start:row_end]
+    scores = score_matrix.data[row_start:row_end]
+    positive = scores > 0
+    term_indexes = term_indexes[positive]
+    scores = scores[positive]
+    order = numpy.lexsort((term_indexes, -scores))
+    return [(terms[term_indexes[i]], scores[i]) for i in order]
+
+
+def compute_cosine_doc_similarities(matrix, topic_count=None, related_topic_count=None,
+                                    related_service_count=None):
+    # Only the rows for topics are ever used, so rather than computing the full
+    # (topics + services)^2 matrix, the topic rows are multiplied with the topic
+    # block and then with one chunk of services at a time. When counts are given,
+    # only the highest scores in each row of each block are kept, so the result
+    # stays sparse. The columns of the result are in the same order as the
+    # documents, i.e. topics followed by services.
+    normalized_matrix = sklearn.preprocessing.normalize(matrix.tocsr(), axis=1)
+    document_count = normalized_matrix.shape[0]
+    topic_count = document_count if topic_count is None else topic_count
+    topic_matrix = normalized_matrix[:topic_count]
+
+    # Each topic is most similar to itself, keep one extra score to allow for that
+    topics_to_keep = None if related_topic_count is None else related_topic_count + 1
+    blocks = [keep_highest_scores_in_each_row(topic_matrix * topic_matrix.T, topics_to_keep)]
+
+    for start in range(topic_count, document_count, SERVICE_CHUNK_SIZE):
+        service_matrix = normalized_matrix[start:start + SERVICE_CHUNK_SIZE]
+        block = topic_matrix * service_matrix.T
+        blocks.append(keep_highest_scores_in_each_row(block, related_service_count))
+
+    return scipy.sparse.hstack(blocks, format='csr')
+
+
+def keep_highest_scores_in_each_row(matrix, count):
+    matrix = scipy.sparse.csr_matrix(matrix)
+    if count is None:
+        return matrix
+    if count <= 0:
+        return scipy.sparse.csr_matrix(matrix.shape, dtype=matrix.dtype)
+    for row in range(matrix.shape[0]):
+        scores = matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]]
+        if len(scores) > count:
+            # Scores tied with the cutoff are kept, the caller decides among them
+            cutoff = numpy.partition(scores, -count)[-count]
+            scores[scores < cutoff] = 0
+    matrix.eliminate_zeros()
+    return matrix
 
 
 def remove_phone_numbers(description):
@@ -1,6 +1,7 @@
 from drf_yasg2 import openapi
 from drf_yasg2.utils import swagger_auto_schema
-from search.serializers import RelatedTaskSerializer, RelatedServiceSerializer
+from search.serializers import (RelatedTaskSerializer, RelatedServiceSerializer, TopicForTextSerializer,
+                                DEFAULT_TOPICS_FOR_TEXT_COUNT, MAX_TOPICS_FOR_TEXT_LENGTH)
 
 
 def get_related_topics_schema():
@@ -29,3 +30,31 @@ def get_related_services_schema():
     return swagger_auto_schema(operation_description=operation_description,
                                responses=responses,
                                )
+
+
+def get_topics_for_text_schema():
+    operation_description = ('Get a list of topics related to the given free text, sorted by relatedness. '
+                             'The text is scored against the topic model saved by the last run of '
+                             'compute_text_similarity_scores')
+    text_parameter = openapi.Parameter('text',
+                                       openapi.IN_QUERY,
+                                       description=('Free text to find related topics for, at most {} '
+                                                    'characters'.format(MAX_TOPICS_FOR_TEXT_LENGTH)),
+                                       type=openapi.TYPE_STRING,
+                                       required=True)
+    count_parameter = openapi.Parameter('count',
+                                        openapi.IN_QUERY,
+                                        description='Maximum number of topics to return',
+                                        type=openapi.TYPE_INTEGER,
+                                        default=DEFAULT_TOPICS_FOR_TEXT_COUNT)
+    responses = {
+        200: openapi.Response('A list of zero or more related topics',
+                              TopicForTextSerializer(many=True)),
+        400: 'text missing or too long, or invalid count',
+        503: 'topic model not available',
+    }
+
+    return swagger_auto_schema(operation_description=operation_description,
+                               manual_parameters=[text_parameter, count_parameter],
+                               responses=responses,
+                               )
@@ -0,0 +1,63 @@
+import time
+import scipy.sparse
+from django.core.management.base import BaseCommand
+from search.top_scores import find_highest_scores
+
+# invoke as follows, no database is needed:
+# python manage.py benchmark_top_scores --topics 5 --services 50000 --count 50
+
+
+class Command(BaseCommand):
+    help = ('Compare selecting the highest scores in each row of a random topic-by-service '
+            'similarity matrix by sorting a Python list of the row, as save_similarities used to '
+            'do, with search.top_scores.find_highest_scores')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--topics',
+                            dest='topic_count',
+                            type=int,
+                            default=5,
+                            help='number of rows in the similarity matrix')
+        parser.add_argument('--services',
+                            dest='service_count',
+                            type=int,
+                            default=50000,
+                            help='number of columns in the similarity matrix')
+        parser.add_argument('--count',
+                            dest='count',
+                            type=int,
+                            default=50,
+                            help='number of scores to keep for each topic')
+
+    def handle(self, *args, **options):
+        topic_count = options['topic_count']
+        service_count = options['service_count']
+        count = options['count']
+
+        similarities = scipy.sparse.random(topic_count, service_count, density=0.05, format='csr', random_state=0)
+        self.stdout.write('{} topics, {} services, keeping {} scores per topic'.format(
+            topic_count, service_count, count))
+
+        for name, select in [('sorting', select_by_sorting), ('partitioning', select_by_partitioning)]:
+            seconds, selected_count = time_selection(select, similarities, topic_count, service_count, count)
+            self.stdout.write('{:>12}: {:.2f} ms per topic, {} scores selected'.
+                              format(name, 1000 * seconds / topic_count, selected_count))
+
+
+def select_by_sorting(similarities, row, column_count, count):
+    scores = [similarities[row, j] for j in range(column_count)]
+    scores.sort(reverse=True)
+    cutoff = scores[min(count, len(scores)) - 1]
+    return [j for j in range(column_count) if similarities[row, j] >= cutoff]
+
+
+def select_by_partitioning(similarities, row, column_count, count):
+    return find_highest_scores(similarities[row, 0:column_count], count)
+
+
+def time_selection(select, similarities, topic_count, service_count, count):
+    start_time = time.time()
+    selected_count = 0
+    for row in range(topic_count):
+        selected_count += len(select(similarities, row, service_count, count))
+    return time.time() - start_time, selected_count
@@ -1,13 +1,26 @@
 import argparse
-from django.core.management.base import BaseCommand
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from newcomers_guide.read_data import read_topic_data
 from newcomers_guide.parse_data import parse_topic_files
 from human_services.services.models import Service
 from search.compute_similarities import (to_topic_ids_and_descriptions,
                                          to_service_ids_and_descriptions,
-                                         compute_similarities_by_tf_idf)
+                                         tokenize_documents,
+                                         compute_similarities_by_tf_idf,
+                                         compute_similarities_with_engine,
+                                         TOKENIZER_BATCH_SIZE)
+from search.tokenization_cache import TokenizationCache, DEFAULT_MAX_ENTRIES
+from search.topic_model import save_topic_model, load_topic_model
+from search.read_similarities import read_ids_one_per_line
 from search.save_similarities import (save_topic_similarities,
-                                      save_topic_service_similarity_scores)
+                                      save_topic_service_similarity_scores,
+                                      update_topic_service_similarity_scores,
+                                      save_algorithm_similarity_scores)
+from search.similarity_engines import SIMILARITY_ENGINES, DEFAULT_SIMILARITY_ENGINE
+from qa_tool.models import Algorithm
+from common.response_cache import bump_data_version
 
 
 class Command(BaseCommand):
@@ -16,7 +29,9 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('newcomers_guide_path',
                             metavar='newcomers_guide_path',
-                            help='path to root of Newcomers Guide folder structure')
+                            nargs='?',
+                            help=('path to root of Newcomers Guide folder structure, '
+                                  'not used with --changed_services'))
         parser.add_argument('--region',
                             metavar='region',
                             help='Help')
@@ -42,14 +57,138 @@ class Command(BaseCommand):
                             nargs='?',
                             type=argparse.FileType('w'),
                             help='path to file for saving word-scores, required if --save_intermediate_results is given')
+        parser.add_argument('--workers',
+                            dest='workers',
+                            type=int,
+                            default=1,
+                            help='number of processes to use for tokenizing topic and service descriptions')
+        parser.add_argument('--batch_size',
+                            dest='batch_size',
+                            type=int,
+                            default=TOKENIZER_BATCH_SIZE,
+                            help='number of descriptions passed to each tokenizing process at a time')
+        parser.add_argument('--tokenization_cache',
+                            dest='tokenization_cache',
+                            metavar='path',
+                            help=('path to file for caching tokenized descriptions between runs, '
+                                  'unchanged descriptions are not tokenized again'))
+        parser.add_argument('--tokenization_cache_size',
+                            dest='tokenization_cache_size',
+                            type=int,
+                            default=DEFAULT_MAX_ENTRIES,
+                            help='maximum number of tokenized descriptions to keep in the cache')
+        parser.add_argument('--topic_model',
+                            dest='topic_model',
+                            metavar='path',
+                            default=settings.TOPIC_MODEL_PATH,
+                            help=('path to directory for saving the fitted vocabulary, IDF weights and topic '
+                                  'vectors, read instead when --changed_services is given. Default is '
+                                  'the TOPIC_MODEL_PATH setting'))
+        parser.add_argument('--changed_services',
+                            dest='changed_services',
+                            metavar='path',
+                            help=('path to file containing ids of new or changed services, one service id per line. '
+                                  'Only these services are scored against the topics in the saved topic model, '
+                                  'and the related services of each topic are updated in place'))
+        parser.add_argument('--engine',
+                            dest='engine',
+                            choices=sorted(SIMILARITY_ENGINES.keys()),
+                            default=DEFAULT_SIMILARITY_ENGINE,
+                            help=('similarity engine to compute the scores with, engines other than the '
+                                  'default are only used with --algorithm'))
+        parser.add_argument('--algorithm',
+                            dest='algorithm',
+                            type=int,
+                            help=('id of a QA tool algorithm, the topic-service scores are stored for this '
+                                  'algorithm for comparison in the QA tool, instead of replacing the scores '
+                                  'used by the app'))
 
     def handle(self, *args, **options):
-        root_folder = options['newcomers_guide_path']
-        region = options['region']
+        cache = (TokenizationCache(options['tokenization_cache'], options['tokenization_cache_size'])
+                 if options['tokenization_cache'] else None)
+
+        if options['changed_services']:
+            self.update_similarities_for_services(options, cache)
+            bump_data_version()
+        elif options['algorithm'] is not None:
+            # Only writes the scores of the QA tool, whose responses are not cached
+            self.compute_algorithm_similarities(options, cache)
+        elif options['engine'] != DEFAULT_SIMILARITY_ENGINE:
+            raise CommandError('--algorithm is required with --engine {}'.format(options['engine']))
+        else:
+            self.compute_all_similarities(options, cache)
+            bump_data_version()
+
+        if cache:
+            print('Tokenization cache: {} hits, {} misses, {} entries'.
+                  format(cache.hits, cache.misses, cache.entry_count()))
+            cache.close()
+
+    def compute_all_similarities(self, options, cache):
         related_topic_count = options['related_topics']
         related_service_count = options['related_services']
         results_to_save = options['results_to_save']
         results_file = options['results_file']
+        topic_model_path = options['topic_model']
+
+        topic_ids, service_ids, tokenized_descriptions = self.read_and_tokenize_descriptions(options, cache)
+
+        print('Computing similarities...')
+        cosine_doc_similarities, topic_model = compute_similarities_by_tf_idf(tokenized_descriptions,
+                                                                              topic_ids,
+                                                                              service_ids,
+                                                                              results_to_save,
+                                                                              results_file,
+                                                                              related_topic_count,
+                                                                              related_service_count)
+        if topic_model_path:
+            print('Saving topic model to {}...'.format(topic_model_path))
+            save_topic_model(topic_model, topic_model_path)
+
+        print('Saving topic similarities...')
+        start_time = time.perf_counter()
+        saved_count = save_topic_similarities(topic_ids, cosine_doc_similarities, related_topic_count)
+        print_saved_records_rate(saved_count, start_time)
+
+        print('Saving topic-service similarities...')
+        start_time = time.perf_counter()
+        saved_count = save_topic_service_similarity_scores(topic_ids, service_ids,
+                                                           cosine_doc_similarities, related_service_count)
+        print_saved_records_rate(saved_count, start_time)
+
+    def compute_algorithm_similarities(self, options, cache):
+        algorithm_id = options['algorithm']
+        engine_name = options['engine']
+        related_service_count = options['related_services']
+
+        if not Algorithm.objects.filter(id=algorithm_id).exists():
+            raise CommandError('No QA tool algorithm with id {}'.format(algorithm_id))
+
+        topic_ids, service_ids, tokenized_descriptions = self.read_and_tokenize_descriptions(options, cache)
+
+        print('Computing similarities with {} engine...'.format(engine_name))
+        similarities, cost = compute_similarities_with_engine(SIMILARITY_ENGINES[engine_name],
+                                                              tokenized_descriptions,
+                                                              len(topic_ids),
+                                                              related_service_count=related_service_count)
+        print('{} terms, built in {:.1f} seconds using at most {:.1f} MB'.
+              format(cost.term_count, cost.seconds, cost.peak_memory_bytes / 2**20))
+
+        print('Saving topic-service similarities for algorithm {}...'.format(algorithm_id))
+        start_time = time.perf_counter()
+        saved_count = save_algorithm_similarity_scores(algorithm_id, topic_ids, service_ids,
+                                                       similarities, related_service_count)
+        print_saved_records_rate(saved_count, start_time)
+
+    def read_and_tokenize_descriptions(self, options, cache):
+        root_folder = options['newcomers_guide_path']
+        region = options['region']
+        related_service_count = options['related_services']
+        workers = options['workers']
+        batch_size = options['batch_size']
+
+        if not root_folder:
+            raise CommandError('newcomers_guide_path is required unless --changed_services is given')
 
         print('Reading topics...')
         topics = read_topic_descriptions(root_folder)
@@ -65,17 +204,52 @@ class Command(BaseCommand):
 
         descriptions = topic_descriptions + service_descriptions
 
-        print('{} services read, computing similarities...'.format(len(service_ids)))
-        cosine_doc_similarities = compute_similarities_by_tf_idf(descriptions,
-                                                                 topic_ids,
-                                                                 service_ids,
-                                                                 results_to_save,
-                                                                 results_file)
-
-        print('Saving {} topic similarities...'.format(len(topic_ids)*(len(topic_ids)-1)))
-        save_topic_similarities(topic_ids, cosine_doc_similarities, related_topic_count)
-        print('Saving {} topic-service similarities...'.format(len(topic_ids)*len(service_ids)))
-        save_topic_service_similarity_scores(topic_ids, service_ids, cosine_doc_similarities, related_service_count)
+        print('{} services read, tokenizing descriptions using {} workers...'.format(len(service_ids), workers))
+        tokenized_descriptions = tokenize_and_print_time(descriptions, workers, batch_size, cache)
+        return topic_ids, service_ids, tokenized_descriptions
+
+    def update_similarities_for_services(self, options, cache):
+        region = options['region']
+        related_service_count = options['related_services']
+        workers = options['workers']
+        batch_size = options['batch_size']
+        topic_model_path = options['topic_model']
+
+        print('Reading topic model from {}...'.format(topic_model_path))
+        topic_model = load_topic_model(topic_model_path)
+
+        changed_service_ids = read_ids_one_per_line(options['changed_services'])
+        services = Service.objects.filter(id__in=changed_service_ids)
+        service_ids, service_descriptions = to_service_ids_and_descriptions(services, region)
+        print('{} of {} changed services read, tokenizing descriptions using {} workers...'.format(
+            len(service_ids), len(changed_service_ids), workers))
+        tokenized_descriptions = tokenize_and_print_time(service_descriptions, workers, batch_size, cache)
+
+        print('Computing similarities to {} topics...'.format(len(topic_model.topic_ids)))
+        similarities = topic_model.compute_topic_similarities(tokenized_descriptions)
+
+        print('Updating topic-service similarities...')
+        created_count, deleted_count = update_topic_service_similarity_scores(topic_model.topic_ids,
+                                                                              service_ids,
+                                                                              similarities,
+                                                                              related_service_count)
+        print('{} records created, {} records deleted'.format(created_count, deleted_count))
+
+
+def tokenize_and_print_time(descriptions, workers, batch_size, cache):
+    start_time = time.perf_counter()
+    tokenized_descriptions = tokenize_documents(descriptions, workers, batch_size, cache)
+    print('{} descriptions tokenized in {:.1f} seconds'.format(len(tokenized_descriptions),
+                                                               time.perf_counter() - start_time))
+    return tokenized_descriptions
+
+
+def print_saved_records_rate(saved_count, start_time):
+    elapsed_seconds = time.perf_counter() - start_time
+    rate = saved_count / elapsed_seconds if elapsed_seconds > 0 else 0
+    print('{} records saved in {:.1f} seconds, {:.0f} records per second'.format(saved_count,
+                                                                                 elapsed_seconds,
+                                                                                 rate))
 
 
 def read_topic_descriptions(root_folder):
@@ -6,6 +6,7 @@ from django.core import exceptions
 from search.read_csv_data_from_file import read_csv_data_from_file
 from search.models import TaskServiceSimilarityScore
 from human_services.services.models import Service
+from common.response_cache import bump_data_version
 
 LOGGER = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ class Command(BaseCommand):
                 self.print_error(filename, error)
             except ValueError as error:
                 self.print_error(filename, error)
+        bump_data_version()
 
     def print_error(self, filename, error):
         error = '{filename}: {error_message}'.format(
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from search.models import Task, TaskServiceSimilarityScore, TaskSimilarityScore
+from common.response_cache import bump_data_version
 
 
 class Command(BaseCommand):
@@ -13,3 +14,4 @@ class Command(BaseCommand):
         TaskSimilarityScore.objects.all().delete()
         TaskServiceSimilarityScore.objects.all().delete()
         Task.objects.all().delete()
+        bump_data_version()
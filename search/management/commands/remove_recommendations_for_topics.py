@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from search.read_similarities import read_ids_one_per_line
 from search.remove_similarities_for_topics import remove_similarities_for_topics
+from common.response_cache import bump_data_version
 
 
 class Command(BaseCommand):
@@ -19,3 +20,4 @@ class Command(BaseCommand):
         topics_ids = read_ids_one_per_line(topics_list_path)
         print('Removing similarities for {} topics...'.format(len(topics_ids)))
         remove_similarities_for_topics(topics_ids)
+        bump_data_version()
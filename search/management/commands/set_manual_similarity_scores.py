@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from search.read_similarities import build_manual_similarity_map
 from search.save_similarities import save_manual_similarities
 from search.read_csv_data_from_file import read_csv_data_from_file
+from common.response_cache import bump_data_version
 
 
 class Command(BaseCommand):
@@ -20,3 +21,4 @@ class Command(BaseCommand):
         manual_similarities_map = build_manual_similarity_map(manual_similarities_csv)
         print('Saving manual topic-service similarities...')
         save_manual_similarities(manual_similarities_map)
+        bump_data_version()
@@ -4,9 +4,16 @@ from search.models import TaskServiceSimilarityScore
 LOGGER = logging.getLogger('remove_similarities_for_services')
 
 
-def remove_similarities_for_services(list_of_service_ids):
-    for service_id in list_of_service_ids:
-        result = TaskServiceSimilarityScore.objects.filter(service_id=service_id).delete()
-        number_of_records_deleted = result[0]
-        if number_of_records_deleted == 0:
-            LOGGER.warning('%s: Invalid service id', service_id)
+def remove_similarities_for_services(list_of_service_ids, score_filter=None, warn_about_services_without_scores=True):
+    # Deletes the scores of all the services in one query, only those matching the Q object
+    # score_filter if given, and returns the number of scores deleted
+    records = TaskServiceSimilarityScore.objects.filter(service_id__in=list_of_service_ids)
+    if score_filter is not None:
+        records = records.filter(score_filter)
+    if warn_about_services_without_scores:
+        services_with_scores = set(records.values_list('service_id', flat=True))
+        for service_id in list_of_service_ids:
+            if service_id not in services_with_scores:
+                LOGGER.warning('%s: Invalid service id', service_id)
+    result = records.delete()
+    return result[0]
@@ -1,58 +1,180 @@
+import itertools
 import logging
+import numpy
+from django.db import transaction
+from django.db.models import Q
 from search.models import Task, TaskSimilarityScore, TaskServiceSimilarityScore
 from human_services.services.models import Service
+from qa_tool.models import AlgorithmServiceSimilarityScore
+from search.remove_similarities_for_services import remove_similarities_for_services
+from search.top_scores import find_highest_scores, to_dense_row
 
 LOGGER = logging.getLogger(__name__)
 
+BULK_CREATE_BATCH_SIZE = 1000
+
+# Computed similarity scores are below this value, manual recommendations are given this score
+MANUAL_SIMILARITY_SCORE = 1.0
+
 
 def save_topic_similarities(ids, similarities, count):
     if count == 0:
-        return
+        return 0
 
-    for i in range(len(ids)):
-        similarities_for_topic = [similarities[i, j] for j in range(len(ids)) if i != j]
-        cutoff = compute_cutoff(similarities_for_topic, count)
-        for j in range(len(ids)):
-            score = similarities[i, j]
-            if i != j and score >= cutoff:
-                record = TaskSimilarityScore(first_task_id=ids[i],
-                                             second_task_id=ids[j],
-                                             similarity_score=score)
-                record.save()
+    records = build_topic_similarity_records(ids, similarities, count)
+    return save_records_in_bulk(TaskSimilarityScore, records)
 
 
-def compute_cutoff(scores, count):
-    scores.sort(reverse=True)
-    return scores[min(count, len(scores)) - 1]
+def build_topic_similarity_records(ids, similarities, count):
+    valid_ids = get_valid_ids(Task, ids, 'topic')
+    topic_count = len(ids)
+    for i in range(topic_count):
+        if ids[i] not in valid_ids:
+            continue
+        other_indexes = numpy.delete(numpy.arange(topic_count), i)
+        scores = to_dense_row(similarities[i, 0:topic_count])[other_indexes]
+        for k in find_highest_scores(scores, count):
+            j = other_indexes[k]
+            if ids[j] in valid_ids:
+                yield TaskSimilarityScore(first_task_id=ids[i],
+                                          second_task_id=ids[j],
+                                          similarity_score=float(scores[k]))
 
 
 def save_topic_service_similarity_scores(topic_ids, service_ids, similarities, count):
     if count == 0:
-        return
+        return 0
+
+    records = build_topic_service_similarity_records(topic_ids, service_ids, similarities, count)
+    return save_records_in_bulk(TaskServiceSimilarityScore, records)
 
+
+def build_topic_service_similarity_records(topic_ids, service_ids, similarities, count):
+    scores = find_highest_topic_service_scores(topic_ids, service_ids, similarities, count)
+    for topic_id, service_id, score in scores:
+        yield TaskServiceSimilarityScore(task_id=topic_id,
+                                         service_id=service_id,
+                                         similarity_score=score)
+
+
+def find_highest_topic_service_scores(topic_ids, service_ids, similarities, count):
+    valid_topic_ids = get_valid_ids(Task, topic_ids, 'topic')
+    valid_service_ids = get_valid_ids(Service, service_ids, 'service')
     topic_count = len(topic_ids)
     service_count = len(service_ids)
 
     # Assuming that the similarities are computed from a document vector
     # containing topic descriptions *followed by* service descriptions
-    def to_service_similarity_offset(service_index):
-        return topic_count + service_index
-
     for i in range(topic_count):
-        similarities_for_topic = [similarities[i, to_service_similarity_offset(j)]
-                                  for j in range(service_count)]
-        cutoff = compute_cutoff(similarities_for_topic, count)
-        for j in range(service_count):
-            score = similarities[i, to_service_similarity_offset(j)]
-            if score >= cutoff:
-                record = TaskServiceSimilarityScore(task_id=topic_ids[i],
-                                                    service_id=service_ids[j],
-                                                    similarity_score=score)
-                record.save()
+        if topic_ids[i] not in valid_topic_ids:
+            continue
+        scores = to_dense_row(similarities[i, topic_count:topic_count + service_count])
+        for j in find_highest_scores(scores, count):
+            if service_ids[j] in valid_service_ids:
+                yield topic_ids[i], service_ids[j], float(scores[j])
+
+
+def save_algorithm_similarity_scores(algorithm_id, topic_ids, service_ids, similarities, count):
+    # Scores computed with a similarity engine under evaluation, stored apart from the
+    # scores used by the app so that they can be compared in the QA tool. Replaces
+    # any scores stored earlier for the same algorithm
+    with transaction.atomic():
+        AlgorithmServiceSimilarityScore.objects.filter(algorithm_id=algorithm_id).delete()
+        if count == 0:
+            return 0
+        scores = find_highest_topic_service_scores(topic_ids, service_ids, similarities, count)
+        records = (AlgorithmServiceSimilarityScore(algorithm_id=algorithm_id,
+                                                   topic_id=topic_id,
+                                                   service_id=service_id,
+                                                   similarity_score=score)
+                   for topic_id, service_id, score in scores)
+        return save_records_in_bulk(AlgorithmServiceSimilarityScore, records)
+
+
+def get_valid_ids(model, ids, description):
+    # Validating the foreign keys once for all records, instead of once per
+    # record as ValidateOnSaveMixin.save() would
+    valid_ids = set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+    for invalid_id in set(ids) - valid_ids:
+        LOGGER.warning('%s: Failed to save similarities, no such %s', invalid_id, description)
+    return valid_ids
+
+
+def save_records_in_bulk(model, records):
+    saved_count = 0
+    with transaction.atomic():
+        while True:
+            batch = list(itertools.islice(records, BULK_CREATE_BATCH_SIZE))
+            if not batch:
+                return saved_count
+            model.objects.bulk_create(batch)
+            saved_count += len(batch)
+
+
+def update_topic_service_similarity_scores(topic_ids, service_ids, similarities, count):
+    # For updating after some services have changed, given scores between all topics and
+    # just those services, with one row per topic and one column per service. Computed
+    # scores for the given services are replaced, and for each topic the new scores
+    # compete with the stored ones for the top count places. Manual recommendations are
+    # left alone. Returns the number of records created and deleted.
+    valid_topic_ids = get_valid_ids(Task, topic_ids, 'topic')
+    valid_service_ids = get_valid_ids(Service, service_ids, 'service')
+    with transaction.atomic():
+        # New services have no scores, so no warning is given for them
+        deleted_count = remove_similarities_for_services(service_ids,
+                                                         Q(similarity_score__lt=MANUAL_SIMILARITY_SCORE),
+                                                         warn_about_services_without_scores=False)
+        stored_scores = get_stored_computed_scores_by_topic()
+        manual_pairs = get_manual_similarity_pairs()
+        records_to_create = []
+        record_ids_to_delete = []
+        for i, topic_id in enumerate(topic_ids):
+            if topic_id not in valid_topic_ids:
+                continue
+            new_scores = get_new_scores_for_topic(topic_id, similarities.getrow(i), service_ids,
+                                                  valid_service_ids, manual_pairs)
+            candidates = stored_scores.get(topic_id, []) + new_scores
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            for score, service_id, record_id in candidates[:count]:
+                if record_id is None:
+                    records_to_create.append(TaskServiceSimilarityScore(task_id=topic_id,
+                                                                        service_id=service_id,
+                                                                        similarity_score=score))
+            record_ids_to_delete += [record_id for _, _, record_id in candidates[count:] if record_id]
+
+        TaskServiceSimilarityScore.objects.filter(id__in=record_ids_to_delete).delete()
+        created_count = save_records_in_bulk(TaskServiceSimilarityScore, iter(records_to_create))
+    return created_count, deleted_count + len(record_ids_to_delete)
+
+
+def get_stored_computed_scores_by_topic():
+    result = {}
+    records = (TaskServiceSimilarityScore.objects.
+               filter(similarity_score__lt=MANUAL_SIMILARITY_SCORE).
+               values_list('similarity_score', 'service_id', 'id', 'task_id'))
+    for score, service_id, record_id, topic_id in records:
+        result.setdefault(topic_id, []).append((score, service_id, record_id))
+    return result
+
+
+def get_manual_similarity_pairs():
+    records = (TaskServiceSimilarityScore.objects.
+               filter(similarity_score__gte=MANUAL_SIMILARITY_SCORE).
+               values_list('task_id', 'service_id'))
+    return set(records)
+
+
+def get_new_scores_for_topic(topic_id, row, service_ids, valid_service_ids, manual_pairs):
+    result = []
+    for j, score in zip(row.indices, row.data):
+        service_id = service_ids[j]
+        if service_id in valid_service_ids and (topic_id, service_id) not in manual_pairs:
+            result.append((float(score), service_id, None))
+    return result
 
 
 def save_manual_similarities(manual_similarities):
-    manual_similarity_score = 1.0
+    manual_similarity_score = MANUAL_SIMILARITY_SCORE
     for topic_id, service_ids in manual_similarities.items():
         for service_id in service_ids:
             if is_topic_id_valid(topic_id) and is_service_id_valid(service_id):
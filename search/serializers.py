@@ -1,6 +1,13 @@
 from rest_framework import serializers
 from search import models
 
+DEFAULT_TOPICS_FOR_TEXT_COUNT = 10
+
+MAX_TOPICS_FOR_TEXT_COUNT = 100
+
+# In characters, longer text is rejected rather than tokenized
+MAX_TOPICS_FOR_TEXT_LENGTH = 2000
+
 
 class TopicSerializer(serializers.ModelSerializer):
     class Meta:
@@ -49,3 +56,9 @@ class RelatedTopicsForGivenServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.TaskServiceSimilarityScore
         fields = ('service_id', 'task_id', 'similarity_score')
+
+
+class TopicForTextSerializer(serializers.Serializer):
+    # pylint: disable=abstract-method
+    task_id = serializers.CharField()
+    similarity_score = serializers.FloatField()
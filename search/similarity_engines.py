@@ -0,0 +1,68 @@
+import numpy
+import scipy.sparse
+from textacy.vsm import Vectorizer
+
+# The engine of the scores used by the app and of the saved topic model
+DEFAULT_SIMILARITY_ENGINE = 'tfidf'
+
+
+class TfIdfEngine:
+    """Term frequency times smoothed inverse document frequency, optionally with
+    n-grams of consecutive tokens added as terms."""
+
+    def __init__(self, tf_type='linear', ngram_count=1):
+        self.tf_type = tf_type
+        self.ngram_count = ngram_count
+
+    def build_vectorizer(self):
+        return Vectorizer(tf_type=self.tf_type, apply_idf=True, idf_type='smooth', apply_dl=False)
+
+    def fit_term_matrix(self, tokenized_docs):
+        # Returns the fitted vectorizer along with the term matrix, for building a topic model
+        vectorizer = self.build_vectorizer()
+        term_matrix = vectorizer.fit_transform(to_ngrams(tokens, self.ngram_count) for tokens in tokenized_docs)
+        return vectorizer, term_matrix
+
+    def compute_term_matrix(self, tokenized_docs):
+        _, term_matrix = self.fit_term_matrix(tokenized_docs)
+        return term_matrix
+
+
+class Bm25Engine:
+    """Okapi BM25 term weights, where repeated terms count for less and less, and
+    terms in long documents count for less than terms in short ones."""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+    def compute_term_matrix(self, tokenized_docs):
+        vectorizer = Vectorizer(tf_type='linear', apply_idf=False, apply_dl=False)
+        counts = scipy.sparse.csr_matrix(vectorizer.fit_transform(tokenized_docs), dtype=numpy.float64)
+        document_count = counts.shape[0]
+        document_lengths = numpy.asarray(counts.sum(axis=1)).ravel()
+        average_length = document_lengths.mean() if document_count else 0
+        document_frequencies = numpy.bincount(counts.indices, minlength=counts.shape[1])
+        idf = numpy.log(1 + (document_count - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+        # One value per non-zero in the matrix
+        lengths = numpy.repeat(document_lengths, numpy.diff(counts.indptr))
+        length_norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        weights = idf[counts.indices] * counts.data * (self.k1 + 1) / (counts.data + length_norms)
+        return scipy.sparse.csr_matrix((weights, counts.indices, counts.indptr), shape=counts.shape)
+
+
+# Names are used on the command line, so changing them breaks scripts
+SIMILARITY_ENGINES = {
+    'tfidf': TfIdfEngine(),
+    'tfidf_log': TfIdfEngine(tf_type='log'),
+    'tfidf_bigrams': TfIdfEngine(ngram_count=2),
+    'bm25': Bm25Engine(),
+}
+
+
+def to_ngrams(tokens, ngram_count):
+    result = list(tokens)
+    for length in range(2, ngram_count + 1):
+        result += [' '.join(tokens[i:i + length]) for i in range(len(tokens) - length + 1)]
+    return result
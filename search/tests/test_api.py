@@ -1,3 +1,6 @@
+import os
+import tempfile
+from django.test import override_settings
 from django.utils import translation
 from rest_framework import test as rest_test
 from rest_framework import status
@@ -6,6 +9,9 @@ from search.models import Task, TaskSimilarityScore, TaskServiceSimilarityScore
 from human_services.organizations.tests.helpers import OrganizationBuilder
 from human_services.services.tests.helpers import ServiceBuilder
 from newcomers_guide.tests.helpers import create_topic
+from search.compute_similarities import compute_term_matrix, tokenize_documents
+from search.topic_model import build_topic_model, save_topic_model
+from search.similarity_engines import SIMILARITY_ENGINES, DEFAULT_SIMILARITY_ENGINE
 
 
 class TopicApiTests(rest_test.APITestCase):
@@ -181,3 +187,55 @@ class RelatesServicesApiTests(rest_test.APITestCase):
 
         self.assertEqual(response.json()[0]['service_id'], more_related_service.id)
         self.assertEqual(response.json()[1]['service_id'], less_related_service.id)
+
+
+class TopicsForTextApiTests(rest_test.APITestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'topic_model')
+        topic_ids = ['aligators', 'lollipops']
+        docs = ['aligator interloper and fumigator',
+                'different lollipop candybar and icecream',
+                'unrelated submarine']
+        vectorizer = SIMILARITY_ENGINES[DEFAULT_SIMILARITY_ENGINE].build_vectorizer()
+        term_matrix = compute_term_matrix(vectorizer, tokenize_documents(docs))
+        save_topic_model(build_topic_model(vectorizer, term_matrix, topic_ids), self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_topics_for_text(self, query):
+        with override_settings(TOPIC_MODEL_PATH=self.path):
+            return self.client.get('/v1/topics_for_text/?' + query)
+
+    def test_returns_topics_ordered_by_score(self):
+        response = self.get_topics_for_text('text=lollipops and icecream and an aligator')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([topic['task_id'] for topic in response.json()], ['lollipops', 'aligators'])
+        self.assertGreater(response.json()[0]['similarity_score'], response.json()[1]['similarity_score'])
+
+    def test_does_not_return_unrelated_topics(self):
+        response = self.get_topics_for_text('text=submarine')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+    def test_returns_at_most_count_topics(self):
+        response = self.get_topics_for_text('text=lollipops and an aligator&count=1')
+        self.assertEqual(len(response.json()), 1)
+
+    def test_returns_400_without_text(self):
+        response = self.get_topics_for_text('count=1')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_returns_400_on_too_long_text(self):
+        response = self.get_topics_for_text('text=' + 'aligator ' * 500)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_returns_400_on_invalid_count(self):
+        response = self.get_topics_for_text('text=aligator&count=many')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_returns_503_without_topic_model(self):
+        with override_settings(TOPIC_MODEL_PATH=os.path.join(self.directory.name, a_string())):
+            response = self.client.get('/v1/topics_for_text/?text=aligator')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -1,7 +1,16 @@
+import os
+import tempfile
+import scipy
 from django.test import TestCase
+from textacy.vsm import Vectorizer
 from search.compute_similarities import (to_topic_ids_and_descriptions,
                                          to_service_ids_and_descriptions,
-                                         compute_similarities)
+                                         compute_similarities,
+                                         tokenize_documents,
+                                         compute_cosine_doc_similarities,
+                                         keep_highest_scores_in_each_row,
+                                         compute_term_matrix,
+                                         write_intermediary_results_as_csv)
 from human_services.services.models import Service
 from human_services.organizations.tests.helpers import OrganizationBuilder
 from human_services.services.tests.helpers import ServiceBuilder
@@ -191,3 +200,114 @@ class TestTopicSimilarityScore(TestCase):
         ServiceBuilder(self.organization).with_description(description_with_numbers).create()
         _, descriptions = to_service_ids_and_descriptions(Service.objects.all(), None)
         self.assertIn(expected_description, descriptions[0])
+
+
+class TestTopicRowsOfSimilarityMatrix(TestCase):
+    def setUp(self):
+        self.strings = ['aligator interloper and fumigator',
+                        'different lollipop candybar and icecream',
+                        'likewise aligator interloper and fumigator',
+                        'lollipop and icecream',
+                        'unrelated submarine']
+
+    def test_computes_only_rows_for_topics(self):
+        topic_count = 2
+        similarity_matrix = compute_similarities(self.strings, topic_count)
+        self.assertEqual(similarity_matrix.shape, (2, 5))
+
+    def test_topic_rows_are_the_same_as_for_the_full_matrix(self):
+        topic_count = 2
+        full_matrix = compute_similarities(self.strings)
+        topic_rows = compute_similarities(self.strings, topic_count)
+        for i in range(topic_count):
+            for j in range(len(self.strings)):
+                self.assertAlmostEqual(topic_rows[i, j], full_matrix[i, j])
+
+    def test_keeps_only_the_highest_service_scores_in_each_row(self):
+        term_matrix = scipy.sparse.csr_matrix([[1, 1, 1, 1],
+                                               [1, 1, 1, 1],
+                                               [1, 0, 0, 0],
+                                               [1, 1, 0, 0],
+                                               [1, 1, 1, 0]])
+        topic_count = 1
+        related_topic_count = 0
+        related_service_count = 2
+
+        similarity_matrix = compute_cosine_doc_similarities(term_matrix, topic_count,
+                                                            related_topic_count, related_service_count)
+
+        self.assertGreater(similarity_matrix[0, 1], 0.99)
+        self.assertEqual(similarity_matrix[0, 2], 0)
+        self.assertEqual(similarity_matrix[0, 3], 0)
+        self.assertGreater(similarity_matrix[0, 4], 0.86)
+
+
+class TestKeepHighestScoresInEachRow(TestCase):
+    def test_keeps_given_number_of_scores(self):
+        matrix = scipy.sparse.csr_matrix([[1, 2, 3, 4],
+                                          [8, 7, 6, 5]])
+        result = keep_highest_scores_in_each_row(matrix, 2).toarray().tolist()
+        self.assertEqual(result, [[0, 0, 3, 4],
+                                  [8, 7, 0, 0]])
+
+    def test_keeps_all_scores_if_count_is_none(self):
+        matrix = scipy.sparse.csr_matrix([[1, 2, 3, 4]])
+        result = keep_highest_scores_in_each_row(matrix, None).toarray().tolist()
+        self.assertEqual(result, [[1, 2, 3, 4]])
+
+    def test_keeps_no_scores_if_count_is_zero(self):
+        matrix = scipy.sparse.csr_matrix([[1, 2, 3, 4]])
+        result = keep_highest_scores_in_each_row(matrix, 0)
+        self.assertEqual(result.nnz, 0)
+
+
+class TestTokenizeDocuments(TestCase):
+    def test_returns_lower_case_lemmas(self):
+        tokenized_docs = tokenize_documents(['The dogs were running'])
+        self.assertEqual(tokenized_docs, [['dog', 'run']])
+
+    def test_removes_stop_words_and_punctuation(self):
+        tokenized_docs = tokenize_documents(['aligator, and also (interloper) on Monday'])
+        self.assertEqual(tokenized_docs, [['aligator', 'interloper']])
+
+    def test_returns_one_token_list_per_document_in_order(self):
+        docs = ['aligator', 'interloper', 'fumigator']
+        tokenized_docs = tokenize_documents(docs, batch_size=2)
+        self.assertEqual(tokenized_docs, [['aligator'], ['interloper'], ['fumigator']])
+
+    def test_several_workers_give_the_same_result_as_one(self):
+        docs = ['aligator interloper and fumigator',
+                'different lollipop candybar and icecream',
+                'likewise aligator interloper and fumigator']
+        self.assertEqual(tokenize_documents(docs, workers=2, batch_size=1),
+                         tokenize_documents(docs, workers=1))
+
+
+class TestWriteIntermediaryResultsAsCsv(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.csv')
+        self.vectorizer = Vectorizer(tf_type='linear', apply_idf=False, apply_dl=False)
+        tokenized_docs = [['aligator', 'aligator', 'interloper'],
+                          ['lollipop', 'candybar'],
+                          ['submarine']]
+        self.term_matrix = compute_term_matrix(self.vectorizer, tokenized_docs)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_results(self, results_to_save):
+        write_intermediary_results_as_csv(self.vectorizer, self.term_matrix, ['topic'], ['first', 'second'],
+                                          results_to_save, open(self.path, 'w'))
+        with open(self.path) as file:
+            return file.read().splitlines()
+
+    def test_writes_terms_of_each_document_highest_score_first(self):
+        lines = self.write_results(3)
+        self.assertEqual(lines, ['"topic","aligator(2.00)","interloper(1.00)"',
+                                 '"first","candybar(1.00)","lollipop(1.00)"',
+                                 '"second","submarine(1.00)"'])
+
+    def test_writes_only_given_number_of_documents(self):
+        lines = self.write_results(1)
+        self.assertEqual(len(lines), 1)
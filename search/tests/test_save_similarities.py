@@ -1,13 +1,20 @@
 import logging
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db.models import Q
 from human_services.organizations.tests.helpers import OrganizationBuilder
 from human_services.services.tests.helpers import ServiceBuilder
 from search.save_similarities import (save_topic_similarities,
                                       save_topic_service_similarity_scores,
-                                      save_manual_similarities)
+                                      update_topic_service_similarity_scores,
+                                      save_manual_similarities,
+                                      save_algorithm_similarity_scores)
 from search.remove_similarities_for_topics import remove_similarities_for_topics
 from search.remove_similarities_for_services import remove_similarities_for_services
 from search.models import Task, TaskSimilarityScore, TaskServiceSimilarityScore
+from qa_tool.models import AlgorithmServiceSimilarityScore
+from qa_tool.tests.helpers import AlgorithmBuilder
 from common.testhelpers.random_test_values import a_string, a_float
 from newcomers_guide.tests.helpers import create_topic
 import scipy
@@ -110,6 +117,39 @@ class TestSavingTaskSimilarities(TestCase):
         self.assertEqual(records[6].second_task_id, ids[1])
         self.assertEqual(records[7].second_task_id, ids[2])
 
+    def test_returns_number_of_records_saved(self):
+        ids = [a_string() for i in range(4)]
+        create_topics(ids)
+        scores = scipy.sparse.csr_matrix(create_square_matrix_of_unique_floats(4))
+
+        saved_count = save_topic_similarities(ids, scores, 2)
+
+        self.assertEqual(saved_count, 8)
+
+    def test_does_not_save_records_for_non_existent_topic_ids(self):
+        logging.disable(logging.WARNING)
+        ids = [a_string() for i in range(4)]
+        create_topics(ids[0:3])
+        scores = scipy.sparse.csr_matrix(create_square_matrix_of_unique_floats(4))
+
+        save_topic_similarities(ids, scores, 3)
+        logging.disable(logging.NOTSET)
+
+        self.assertEqual(TaskSimilarityScore.objects.count(), 3 * 2)
+        self.assertEqual(TaskSimilarityScore.objects.filter(first_task_id=ids[3]).count(), 0)
+        self.assertEqual(TaskSimilarityScore.objects.filter(second_task_id=ids[3]).count(), 0)
+
+    def test_number_of_queries_does_not_grow_with_number_of_records(self):
+        ids = [a_string() for i in range(10)]
+        create_topics(ids)
+        scores = scipy.sparse.csr_matrix(create_square_matrix_of_unique_floats(10))
+
+        with CaptureQueriesContext(connection) as context:
+            save_topic_similarities(ids, scores, 5)
+
+        self.assertEqual(TaskSimilarityScore.objects.count(), 10 * 5)
+        self.assertLess(len(context.captured_queries), 10)
+
 
 class TestSavingTaskServiceSimilarities(TestCase):
     def setUp(self):
@@ -161,6 +201,18 @@ class TestSavingTaskServiceSimilarities(TestCase):
         self.assertEqual(records[4].similarity_score, 8.0)
         self.assertEqual(records[5].similarity_score, 9.0)
 
+    def test_saves_no_more_than_required_number_of_records_when_scores_are_equal(self):
+        scores = scipy.sparse.csr_matrix([[0, 0, 0, 0.5, 0.5, 0.5],
+                                          [0, 0, 0, 0, 0, 0],
+                                          [0, 0, 0, 0.2, 0.3, 0.3]])
+        records_to_save_per_row = 2
+        save_topic_service_similarity_scores(
+            self.three_topic_ids, self.three_service_ids, scores, records_to_save_per_row)
+
+        self.assertEqual(TaskServiceSimilarityScore.objects.count(), 3 * 2)
+        self.assertEqual(TaskServiceSimilarityScore.objects.filter(service_id=self.three_service_ids[2],
+                                                                   similarity_score=0.5).count(), 0)
+
     def test_saves_elements_with_topic_ids(self):
         scores = scipy.sparse.csr_matrix([[0, 0, 0, 1, 2, 3],
                                           [0, 0, 0, 4, 5, 6],
@@ -201,6 +253,124 @@ class TestSavingTaskServiceSimilarities(TestCase):
         self.assertEqual(records[4].service_id, self.three_service_ids[1])
         self.assertEqual(records[5].service_id, self.three_service_ids[2])
 
+    def test_does_not_save_records_for_non_existent_service_ids(self):
+        logging.disable(logging.WARNING)
+        service_ids = self.three_service_ids + [a_string()]
+        scores = scipy.sparse.csr_matrix([[0, 0, 0, 1, 2, 3, 4],
+                                          [0, 0, 0, 5, 6, 7, 8],
+                                          [0, 0, 0, 9, 10, 11, 12]])
+
+        save_topic_service_similarity_scores(self.three_topic_ids, service_ids, scores, 4)
+        logging.disable(logging.NOTSET)
+
+        self.assertEqual(TaskServiceSimilarityScore.objects.count(), 3 * 3)
+        self.assertEqual(TaskServiceSimilarityScore.objects.filter(service_id=service_ids[3]).count(), 0)
+
+
+class TestSavingAlgorithmSimilarities(TestCase):
+    def setUp(self):
+        organization = OrganizationBuilder().create()
+        self.topic_ids = [a_string() for i in range(2)]
+        create_topics(self.topic_ids)
+        self.service_ids = [ServiceBuilder(organization).create().id for i in range(3)]
+        self.scores = scipy.sparse.csr_matrix([[0, 0, 0.1, 0.2, 0.3],
+                                               [0, 0, 0.4, 0.5, 0.6]])
+        self.algorithm = AlgorithmBuilder().create()
+
+    def test_saves_highest_scores_for_algorithm(self):
+        saved_count = save_algorithm_similarity_scores(self.algorithm.id, self.topic_ids, self.service_ids,
+                                                       self.scores, 2)
+
+        self.assertEqual(saved_count, 4)
+        records = AlgorithmServiceSimilarityScore.objects.filter(algorithm=self.algorithm)
+        self.assertEqual(sorted(record.similarity_score for record in records), [0.2, 0.3, 0.5, 0.6])
+
+    def test_does_not_save_scores_used_by_the_app(self):
+        save_algorithm_similarity_scores(self.algorithm.id, self.topic_ids, self.service_ids, self.scores, 2)
+
+        self.assertEqual(TaskServiceSimilarityScore.objects.count(), 0)
+
+    def test_replaces_earlier_scores_for_the_same_algorithm_only(self):
+        other_algorithm = AlgorithmBuilder().create()
+        save_algorithm_similarity_scores(other_algorithm.id, self.topic_ids, self.service_ids, self.scores, 2)
+        save_algorithm_similarity_scores(self.algorithm.id, self.topic_ids, self.service_ids, self.scores, 2)
+
+        save_algorithm_similarity_scores(self.algorithm.id, self.topic_ids, self.service_ids, self.scores, 1)
+
+        self.assertEqual(AlgorithmServiceSimilarityScore.objects.filter(algorithm=self.algorithm).count(), 2)
+        self.assertEqual(AlgorithmServiceSimilarityScore.objects.filter(algorithm=other_algorithm).count(), 4)
+
+
+class TestUpdatingTaskServiceSimilarities(TestCase):
+    def setUp(self):
+        self.organization = OrganizationBuilder().create()
+        self.topic_id = a_string()
+        create_topics([self.topic_id])
+        services = [ServiceBuilder(self.organization).create() for i in range(3)]
+        self.stored_service_ids = [service.id for service in services]
+        for service_id, score in zip(self.stored_service_ids, [0.3, 0.4, 0.5]):
+            TaskServiceSimilarityScore(task_id=self.topic_id, service_id=service_id,
+                                       similarity_score=score).save()
+        self.new_service_id = ServiceBuilder(self.organization).create().id
+
+    def get_scores_by_service_id(self):
+        records = TaskServiceSimilarityScore.objects.filter(task_id=self.topic_id)
+        return {record.service_id: record.similarity_score for record in records}
+
+    def test_new_service_with_high_score_replaces_lowest_stored_score(self):
+        scores = scipy.sparse.csr_matrix([[0.45]])
+
+        update_topic_service_similarity_scores([self.topic_id], [self.new_service_id], scores, 3)
+
+        self.assertEqual(self.get_scores_by_service_id(), {self.stored_service_ids[1]: 0.4,
+                                                           self.stored_service_ids[2]: 0.5,
+                                                           self.new_service_id: 0.45})
+
+    def test_new_service_with_low_score_is_not_saved(self):
+        scores = scipy.sparse.csr_matrix([[0.1]])
+
+        update_topic_service_similarity_scores([self.topic_id], [self.new_service_id], scores, 3)
+
+        self.assertNotIn(self.new_service_id, self.get_scores_by_service_id())
+        self.assertEqual(TaskServiceSimilarityScore.objects.count(), 3)
+
+    def test_replaces_score_for_changed_service(self):
+        changed_service_id = self.stored_service_ids[0]
+        scores = scipy.sparse.csr_matrix([[0.9]])
+
+        update_topic_service_similarity_scores([self.topic_id], [changed_service_id], scores, 3)
+
+        self.assertEqual(self.get_scores_by_service_id()[changed_service_id], 0.9)
+        self.assertEqual(TaskServiceSimilarityScore.objects.count(), 3)
+
+    def test_removes_score_for_changed_service_that_is_no_longer_similar(self):
+        changed_service_id = self.stored_service_ids[2]
+        scores = scipy.sparse.csr_matrix([[0.0]])
+
+        update_topic_service_similarity_scores([self.topic_id], [changed_service_id], scores, 3)
+
+        self.assertNotIn(changed_service_id, self.get_scores_by_service_id())
+
+    def test_keeps_manual_recommendations(self):
+        manual_service_id = self.stored_service_ids[0]
+        save_manual_similarities({self.topic_id: [manual_service_id]})
+        scores = scipy.sparse.csr_matrix([[0.2, 0.6]])
+
+        update_topic_service_similarity_scores([self.topic_id], [manual_service_id, self.new_service_id],
+                                               scores, 3)
+
+        self.assertEqual(self.get_scores_by_service_id(), {manual_service_id: 1.0,
+                                                           self.stored_service_ids[1]: 0.4,
+                                                           self.stored_service_ids[2]: 0.5,
+                                                           self.new_service_id: 0.6})
+
+    def test_returns_number_of_records_created_and_deleted(self):
+        scores = scipy.sparse.csr_matrix([[0.45]])
+
+        result = update_topic_service_similarity_scores([self.topic_id], [self.new_service_id], scores, 3)
+
+        self.assertEqual(result, (1, 1))
+
 
 class TestSavingManualTaskServiceSimilarities(TestCase):
     def setUp(self):
@@ -341,6 +511,19 @@ class TestRemovingTaskTopicSimilarities(TestCase):
         records = TaskServiceSimilarityScore.objects.order_by('similarity_score')
         self.assertEqual(len(records), 0)
 
+    def test_can_remove_only_similarity_scores_matching_filter(self):
+        service = ServiceBuilder(self.organization).create()
+        computed_topic_id = a_string()
+        manual_topic_id = a_string()
+        create_topics([computed_topic_id, manual_topic_id])
+        TaskServiceSimilarityScore(task_id=computed_topic_id, service=service, similarity_score=0.5).save()
+        TaskServiceSimilarityScore(task_id=manual_topic_id, service=service, similarity_score=1.0).save()
+
+        deleted_count = remove_similarities_for_services([service.id], Q(similarity_score__lt=1.0))
+
+        self.assertEqual(deleted_count, 1)
+        self.assertEqual(TaskServiceSimilarityScore.objects.get().task_id, manual_topic_id)
+
     def test_can_remove_several_similarity_scores_for_the_same_topic(self):
         services = [ServiceBuilder(self.organization).create() for i in range(4)]
         the_topic_id = a_string()
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from search.compute_similarities import compute_similarities_with_engine
+from search.similarity_engines import SIMILARITY_ENGINES, Bm25Engine, to_ngrams
+
+
+class TestSimilarityEngines(TestCase):
+    def setUp(self):
+        self.tokenized_docs = [['aligator', 'interloper', 'fumigator'],
+                               ['lollipop', 'candybar', 'icecream'],
+                               ['aligator', 'interloper', 'fumigator', 'likewise'],
+                               ['unrelated', 'submarine']]
+
+    def test_all_engines_find_similar_document_most_similar(self):
+        for name, engine in SIMILARITY_ENGINES.items():
+            similarities, _ = compute_similarities_with_engine(engine, self.tokenized_docs, 2)
+            self.assertEqual(similarities.shape, (2, 4), name)
+            self.assertGreater(similarities[0, 2], similarities[0, 1], name)
+            self.assertGreater(similarities[0, 2], similarities[0, 3], name)
+            self.assertAlmostEqual(similarities[0, 0], 1.0, msg=name)
+
+    def test_reports_cost_of_computing_similarities(self):
+        _, cost = compute_similarities_with_engine(SIMILARITY_ENGINES['tfidf'], self.tokenized_docs, 2)
+        self.assertGreaterEqual(cost.seconds, 0)
+        self.assertGreater(cost.peak_memory_bytes, 0)
+        self.assertEqual(cost.term_count, 9)
+
+    def test_bigram_engine_adds_terms_for_consecutive_tokens(self):
+        _, cost = compute_similarities_with_engine(SIMILARITY_ENGINES['tfidf_bigrams'], self.tokenized_docs, 2)
+        self.assertEqual(cost.term_count, 9 + 6)
+
+    def test_bm25_weighs_repeated_terms_less_than_linearly(self):
+        matrix = Bm25Engine().compute_term_matrix([['aligator'], ['aligator', 'aligator', 'aligator', 'aligator'],
+                                                   ['submarine']])
+        self.assertLess(matrix.toarray()[1].max(), 4 * matrix.toarray()[0].max())
+
+
+class TestToNgrams(TestCase):
+    def test_returns_tokens_followed_by_joined_consecutive_tokens(self):
+        self.assertEqual(to_ngrams(['a', 'b', 'c'], 2), ['a', 'b', 'c', 'a b', 'b c'])
+
+    def test_returns_tokens_only_for_unigrams(self):
+        self.assertEqual(to_ngrams(['a', 'b'], 1), ['a', 'b'])
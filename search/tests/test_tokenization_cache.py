@@ -0,0 +1,82 @@
+import os
+import tempfile
+from django.test import TestCase
+from search.compute_similarities import tokenize_documents
+from search.tokenization_cache import TokenizationCache, compute_cache_key
+from common.testhelpers.random_test_values import a_string
+
+
+class TestTokenizationCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tokens.sqlite3')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_returns_stored_tokens(self):
+        key = a_string()
+        tokens = [a_string(), a_string()]
+        cache = TokenizationCache(self.path)
+        cache.set_many({key: tokens})
+        self.assertEqual(cache.get_many([key]), {key: tokens})
+
+    def test_does_not_return_missing_keys(self):
+        cache = TokenizationCache(self.path)
+        self.assertEqual(cache.get_many([a_string()]), {})
+
+    def test_counts_hits_and_misses(self):
+        key = a_string()
+        cache = TokenizationCache(self.path)
+        cache.set_many({key: [a_string()]})
+        cache.get_many([key, a_string(), a_string()])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_keeps_tokens_between_instances(self):
+        key = a_string()
+        tokens = [a_string()]
+        cache = TokenizationCache(self.path)
+        cache.set_many({key: tokens})
+        cache.close()
+
+        self.assertEqual(TokenizationCache(self.path).get_many([key]), {key: tokens})
+
+    def test_removes_least_recently_used_entries_when_full(self):
+        cache = TokenizationCache(self.path, max_entries=2)
+        cache.set_many({'first': ['a']})
+        cache.set_many({'second': ['b']})
+        cache.get_many(['first'])
+        cache.set_many({'third': ['c']})
+
+        self.assertEqual(cache.entry_count(), 2)
+        self.assertEqual(set(cache.get_many(['first', 'second', 'third']).keys()), {'first', 'third'})
+
+    def test_key_depends_on_tokenizer_version(self):
+        text = a_string()
+        self.assertNotEqual(compute_cache_key(text, a_string()), compute_cache_key(text, a_string()))
+
+
+class TestTokenizeDocumentsWithCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tokens.sqlite3')
+        self.docs = ['aligator interloper and fumigator',
+                     'different lollipop candybar and icecream']
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_gives_the_same_result_as_without_cache(self):
+        cache = TokenizationCache(self.path)
+        tokenize_documents(self.docs, cache=cache)
+        self.assertEqual(tokenize_documents(self.docs, cache=cache), tokenize_documents(self.docs))
+
+    def test_uses_cached_tokens_for_unchanged_documents(self):
+        tokenize_documents(self.docs, cache=TokenizationCache(self.path))
+
+        cache = TokenizationCache(self.path)
+        tokenize_documents(self.docs + ['unrelated submarine'], cache=cache)
+
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
@@ -0,0 +1,30 @@
+import unittest
+import scipy.sparse
+from search.top_scores import find_highest_scores
+
+
+class TestFindHighestScores(unittest.TestCase):
+    def test_returns_indexes_of_highest_scores_highest_first(self):
+        indexes = find_highest_scores([0.1, 0.5, 0.3, 0.9, 0.2], 3)
+        self.assertEqual(list(indexes), [3, 1, 2])
+
+    def test_returns_all_indexes_when_count_is_large(self):
+        indexes = find_highest_scores([0.1, 0.5, 0.3], 2000)
+        self.assertEqual(list(indexes), [1, 2, 0])
+
+    def test_returns_no_indexes_for_zero_count(self):
+        indexes = find_highest_scores([0.1, 0.5, 0.3], 0)
+        self.assertEqual(list(indexes), [])
+
+    def test_returns_no_more_than_count_indexes_when_scores_are_equal_at_cutoff(self):
+        indexes = find_highest_scores([0.2, 0.9, 0.2, 0.2, 0.2], 3)
+        self.assertEqual(list(indexes), [1, 0, 2])
+
+    def test_orders_equal_scores_by_index(self):
+        indexes = find_highest_scores([0.5, 0.5, 0.5, 0.5], 4)
+        self.assertEqual(list(indexes), [0, 1, 2, 3])
+
+    def test_includes_zero_scores_in_sparse_row(self):
+        row = scipy.sparse.csr_matrix([[0, 0.4, 0, 0.7]])
+        indexes = find_highest_scores(row, 3)
+        self.assertEqual(list(indexes), [3, 1, 0])
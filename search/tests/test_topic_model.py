@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from django.test import TestCase, override_settings
+from search.apps import preload_topics_for_text_models
+from search.compute_similarities import compute_term_matrix, tokenize_documents
+from search.topic_model import (build_topic_model, save_topic_model, load_topic_model, get_current_topic_model,
+                                load_topic_model_version, FORMAT_VERSION, MANIFEST_FILE_NAME)
+from search.similarity_engines import SIMILARITY_ENGINES, DEFAULT_SIMILARITY_ENGINE
+
+
+class TestTopicModel(TestCase):
+    def setUp(self):
+        self.topic_ids = ['aligators', 'lollipops']
+        self.docs = ['aligator interloper and fumigator',
+                     'different lollipop candybar and icecream',
+                     'likewise aligator interloper and fumigator',
+                     'unrelated submarine']
+        self.tokenized_docs = tokenize_documents(self.docs)
+        self.vectorizer = SIMILARITY_ENGINES[DEFAULT_SIMILARITY_ENGINE].build_vectorizer()
+        self.term_matrix = compute_term_matrix(self.vectorizer, self.tokenized_docs)
+
+    def test_document_vectors_are_the_same_as_from_fitted_vectorizer(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        vectors_from_model = model.compute_document_vectors(self.tokenized_docs)
+        vectors_from_vectorizer = model.topic_vectors
+
+        for i in range(len(self.topic_ids)):
+            for j in range(len(model.terms)):
+                self.assertAlmostEqual(vectors_from_model[i, j], vectors_from_vectorizer[i, j])
+
+    def test_computes_similarities_between_topics_and_new_documents(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        similarities = model.compute_topic_similarities([['aligator', 'fumigator'], ['candybar']])
+
+        self.assertEqual(similarities.shape, (2, 2))
+        self.assertGreater(similarities[0, 0], 0.5)
+        self.assertEqual(similarities[0, 1], 0)
+        self.assertEqual(similarities[1, 0], 0)
+        self.assertGreater(similarities[1, 1], 0)
+
+    def test_ignores_terms_not_in_vocabulary(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        similarities = model.compute_topic_similarities([['helicopter']])
+
+        self.assertEqual(similarities.nnz, 0)
+
+    def test_finds_related_topics_most_similar_first(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        related_topics = model.find_related_topics(['aligator', 'candybar', 'icecream', 'lollipop'], 2)
+
+        self.assertEqual([topic_id for topic_id, _ in related_topics], ['lollipops', 'aligators'])
+        self.assertGreater(related_topics[0][1], related_topics[1][1])
+
+    def test_does_not_find_more_related_topics_than_asked_for(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        related_topics = model.find_related_topics(['aligator', 'lollipop'], 1)
+
+        self.assertEqual(len(related_topics), 1)
+
+    def test_does_not_find_unrelated_topics(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+
+        related_topics = model.find_related_topics(['aligator'], 2)
+
+        self.assertEqual([topic_id for topic_id, _ in related_topics], ['aligators'])
+
+    def test_saved_model_can_be_loaded(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            save_topic_model(model, path)
+            loaded_model = load_topic_model(path)
+
+        self.assertEqual(loaded_model.topic_ids, self.topic_ids)
+        self.assertEqual(loaded_model.terms, model.terms)
+        self.assertEqual(list(loaded_model.idf), list(model.idf))
+        self.assertEqual((loaded_model.topic_vectors != model.topic_vectors).nnz, 0)
+
+    def test_saving_replaces_existing_model(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        smaller_model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids[0:1])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            save_topic_model(model, path)
+            save_topic_model(smaller_model, path)
+            loaded_model = load_topic_model(path)
+
+        self.assertEqual(loaded_model.topic_ids, self.topic_ids[0:1])
+
+    def test_saving_points_link_at_new_version_keeping_previous_one_only(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            for _ in range(3):
+                save_topic_model(model, path)
+            previous_version_path = os.path.realpath(path)
+            save_topic_model(model, path)
+
+            self.assertTrue(os.path.islink(path))
+            self.assertEqual(sorted(os.listdir(directory)),
+                             sorted(['model', os.path.basename(previous_version_path),
+                                     os.path.basename(os.path.realpath(path))]))
+
+    def test_saving_replaces_model_saved_as_plain_directory(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            os.makedirs(path)
+            save_topic_model(model, path)
+            loaded_model = load_topic_model(path)
+
+            self.assertTrue(os.path.islink(path))
+
+        self.assertEqual(loaded_model.topic_ids, self.topic_ids)
+
+    def test_does_not_load_model_with_different_format_version(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            save_topic_model(model, path)
+            manifest_path = os.path.join(path, MANIFEST_FILE_NAME)
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+            manifest['format_version'] = FORMAT_VERSION + 1
+            with open(manifest_path, 'w') as file:
+                json.dump(manifest, file)
+
+            with self.assertRaises(RuntimeError):
+                load_topic_model(path)
+
+    def test_current_model_is_loaded_again_when_replaced(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        smaller_model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids[0:1])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            save_topic_model(model, path)
+            first_model = get_current_topic_model(path)
+            self.assertIs(get_current_topic_model(path), first_model)
+
+            save_topic_model(smaller_model, path)
+            second_model = get_current_topic_model(path)
+
+        self.assertEqual(first_model.topic_ids, self.topic_ids)
+        self.assertEqual(second_model.topic_ids, self.topic_ids[0:1])
+
+    def test_preloaded_model_is_not_loaded_again(self):
+        model = build_topic_model(self.vectorizer, self.term_matrix, self.topic_ids)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model')
+            save_topic_model(model, path)
+            with override_settings(TOPIC_MODEL_PATH=path):
+                preload_topics_for_text_models()
+            loads_before = load_topic_model_version.cache_info().misses
+            get_current_topic_model(path)
+
+        self.assertEqual(load_topic_model_version.cache_info().misses, loads_before)
+
+    def test_preloading_without_saved_model_does_not_fail(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(TOPIC_MODEL_PATH=os.path.join(directory, 'model')):
+                preload_topics_for_text_models()
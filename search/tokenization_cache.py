@@ -0,0 +1,76 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+DEFAULT_MAX_ENTRIES = 200000
+
+# SQLite limits the number of parameters in one statement
+QUERY_CHUNK_SIZE = 500
+
+
+def compute_cache_key(text, tokenizer_version):
+    content = tokenizer_version + '\0' + text
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class TokenizationCache:
+    """On-disk store of token lists keyed by a hash of the tokenized text and of
+    everything that affects the tokenizing, so that unchanged descriptions do not
+    need to go through spaCy again. When the store grows beyond max_entries, the
+    least recently used entries are removed."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS tokens ('
+                                'key TEXT PRIMARY KEY, '
+                                'tokens TEXT NOT NULL, '
+                                'last_used REAL NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS tokens_last_used ON tokens (last_used)')
+        self.connection.commit()
+
+    def get_many(self, keys):
+        result = {}
+        unique_keys = list(set(keys))
+        for chunk in to_chunks(unique_keys, QUERY_CHUNK_SIZE):
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(
+                'SELECT key, tokens FROM tokens WHERE key IN ({})'.format(placeholders), chunk)
+            result.update({key: json.loads(tokens) for key, tokens in rows})
+        self.mark_as_used(result.keys())
+        self.hits += len(result)
+        self.misses += len(unique_keys) - len(result)
+        return result
+
+    def set_many(self, tokens_by_key):
+        now = time.time()
+        self.connection.executemany('INSERT OR REPLACE INTO tokens (key, tokens, last_used) VALUES (?, ?, ?)',
+                                    [(key, json.dumps(tokens), now) for key, tokens in tokens_by_key.items()])
+        self.evict_least_recently_used()
+        self.connection.commit()
+
+    def mark_as_used(self, keys):
+        now = time.time()
+        self.connection.executemany('UPDATE tokens SET last_used = ? WHERE key = ?',
+                                    [(now, key) for key in keys])
+        self.connection.commit()
+
+    def evict_least_recently_used(self):
+        excess_count = self.entry_count() - self.max_entries
+        if excess_count > 0:
+            self.connection.execute('DELETE FROM tokens WHERE key IN '
+                                    '(SELECT key FROM tokens ORDER BY last_used LIMIT ?)', (excess_count,))
+
+    def entry_count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM tokens').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+def to_chunks(items, chunk_size):
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
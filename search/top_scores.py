@@ -0,0 +1,28 @@
+import numpy
+import scipy.sparse
+
+
+def find_highest_scores(scores, count):
+    # Indexes of the count highest scores, highest score first. Equal scores are
+    # ordered by index, so when several scores are equal to the cutoff, the ones
+    # that make it in are well defined and no more than count are returned
+    scores = to_dense_row(scores)
+    count = min(count, len(scores))
+    if count <= 0:
+        return numpy.array([], dtype=numpy.intp)
+
+    if count < len(scores):
+        top_indexes = numpy.argpartition(-scores, count - 1)[:count]
+        cutoff = scores[top_indexes].min()
+        candidates = numpy.flatnonzero(scores >= cutoff)
+    else:
+        candidates = numpy.arange(len(scores))
+
+    order = numpy.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:count]]
+
+
+def to_dense_row(scores):
+    if scipy.sparse.issparse(scores):
+        return scores.toarray().ravel()
+    return numpy.asarray(scores, dtype=numpy.float64).ravel()
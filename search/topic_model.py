@@ -0,0 +1,167 @@
+import collections
+import datetime
+import functools
+import json
+import os
+import shutil
+import tempfile
+import numpy
+import scipy.sparse
+import sklearn.preprocessing
+
+# Increment when changing what is saved or how, so that out of date models are not loaded
+FORMAT_VERSION = 1
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+# Added to the model path for the directories of saved versions, next to the path
+VERSION_DIRECTORY_INFIX = '.version-'
+
+ARRAY_NAMES = ['topic_ids', 'terms', 'idf', 'topic_vectors_data', 'topic_vectors_indices', 'topic_vectors_indptr']
+
+
+class TopicModel:
+    """The parts of a fitted TF-IDF vectorizer needed to score new documents
+    against topics: the vocabulary, the IDF weight of each term and the
+    normalized term vector of each topic."""
+
+    def __init__(self, topic_ids, terms, idf, topic_vectors):
+        self.topic_ids = list(topic_ids)
+        self.terms = list(terms)
+        self.term_indexes = {term: index for index, term in enumerate(self.terms)}
+        self.idf = numpy.asarray(idf)
+        self.topic_vectors = scipy.sparse.csr_matrix(topic_vectors)
+
+    def compute_document_vectors(self, tokenized_docs):
+        # Same weighting as the vectorizer the model was built from, i.e. linear term
+        # frequency times IDF. Terms not in the vocabulary are ignored
+        tokenized_docs = list(tokenized_docs)
+        rows = []
+        columns = []
+        counts = []
+        for row, tokens in enumerate(tokenized_docs):
+            term_counts = collections.Counter(token for token in tokens if token in self.term_indexes)
+            for term, count in term_counts.items():
+                rows.append(row)
+                columns.append(self.term_indexes[term])
+                counts.append(count)
+        shape = (len(tokenized_docs), len(self.terms))
+        count_matrix = scipy.sparse.csr_matrix((counts, (rows, columns)), shape=shape, dtype=numpy.float64)
+        weighted_matrix = count_matrix * scipy.sparse.diags(self.idf)
+        return sklearn.preprocessing.normalize(weighted_matrix, axis=1)
+
+    def compute_topic_similarities(self, tokenized_docs):
+        # One row per topic, one column per document
+        document_vectors = self.compute_document_vectors(tokenized_docs)
+        return scipy.sparse.csr_matrix(self.topic_vectors * document_vectors.T)
+
+    def find_related_topics(self, tokens, count):
+        # Topics with a non-zero score, most similar first
+        scores = self.compute_topic_similarities([tokens]).toarray().ravel()
+        topic_indexes = numpy.flatnonzero(scores)
+        topic_indexes = topic_indexes[numpy.argsort(-scores[topic_indexes], kind='stable')][:count]
+        return [(self.topic_ids[i], float(scores[i])) for i in topic_indexes]
+
+
+def build_topic_model(vectorizer, term_matrix, topic_ids):
+    # textacy only exposes the IDF weights as a private diagonal matrix
+    idf = vectorizer._idf_diag.diagonal()  # pylint: disable=protected-access
+    topic_vectors = sklearn.preprocessing.normalize(term_matrix.tocsr()[:len(topic_ids)], axis=1)
+    return TopicModel(topic_ids, vectorizer.terms_list, idf, topic_vectors)
+
+
+def save_topic_model(model, path):
+    # Written to a new directory for each version, and the path is then a symbolic link
+    # atomically pointed at it, so that processes loading the model always find a complete
+    # one at the path
+    path = os.path.abspath(path.rstrip(os.sep))
+    version_path = tempfile.mkdtemp(prefix=os.path.basename(path) + VERSION_DIRECTORY_INFIX,
+                                    dir=os.path.dirname(path))
+    # Readable by the web server as well
+    os.chmod(version_path, 0o755)
+    arrays = {
+        'topic_ids': numpy.array(model.topic_ids, dtype=str),
+        'terms': numpy.array(model.terms, dtype=str),
+        'idf': numpy.asarray(model.idf, dtype=numpy.float64),
+        'topic_vectors_data': model.topic_vectors.data,
+        'topic_vectors_indices': model.topic_vectors.indices,
+        'topic_vectors_indptr': model.topic_vectors.indptr,
+    }
+    for name, array in arrays.items():
+        numpy.save(os.path.join(version_path, name + '.npy'), array)
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'topic_count': len(model.topic_ids),
+        'term_count': len(model.terms),
+    }
+    with open(os.path.join(version_path, MANIFEST_FILE_NAME), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    point_link_at_version(path, version_path)
+
+
+def point_link_at_version(link_path, version_path):
+    # os.replace() renames the new link over the old one in one step. The previous version
+    # is kept, as processes may still be loading it, and older ones are removed
+    previous_version_path = None
+    if os.path.islink(link_path):
+        previous_version_path = os.path.realpath(link_path)
+    elif os.path.isdir(link_path):
+        # A model saved as a plain directory, before versions were kept
+        previous_version_path = link_path + VERSION_DIRECTORY_INFIX + 'unversioned'
+        shutil.rmtree(previous_version_path, ignore_errors=True)
+        os.rename(link_path, previous_version_path)
+    temporary_link_path = link_path + '.link'
+    if os.path.lexists(temporary_link_path):
+        os.remove(temporary_link_path)
+    # Relative, so that the directory holding the model can be moved or mounted elsewhere
+    os.symlink(os.path.basename(version_path), temporary_link_path)
+    os.replace(temporary_link_path, link_path)
+    remove_old_versions(link_path, [version_path, previous_version_path])
+
+
+def remove_old_versions(link_path, kept_paths):
+    kept_paths = [os.path.realpath(path) for path in kept_paths if path]
+    directory = os.path.dirname(link_path)
+    prefix = os.path.basename(link_path) + VERSION_DIRECTORY_INFIX
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(prefix) and os.path.realpath(path) not in kept_paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_topic_model(path):
+    # The arrays are memory-mapped, so loading is fast and processes
+    # loading the same model share its pages. Read from the version the path points at,
+    # so that the files are all of one version even if a new one is saved meanwhile
+    path = os.path.realpath(path)
+    manifest = read_manifest(path)
+    arrays = {name: numpy.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ARRAY_NAMES}
+    shape = (manifest['topic_count'], manifest['term_count'])
+    topic_vectors = scipy.sparse.csr_matrix((arrays['topic_vectors_data'],
+                                             arrays['topic_vectors_indices'],
+                                             arrays['topic_vectors_indptr']), shape=shape)
+    return TopicModel(arrays['topic_ids'].tolist(), arrays['terms'].tolist(), arrays['idf'], topic_vectors)
+
+
+def get_current_topic_model(path):
+    # Kept in memory between calls and loaded again only when a new model has been
+    # saved to the path, which replaces the manifest file
+    manifest_status = os.stat(os.path.join(path, MANIFEST_FILE_NAME))
+    return load_topic_model_version(path, manifest_status.st_ino, manifest_status.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=1)
+def load_topic_model_version(path, manifest_inode, manifest_modified_time):
+    # pylint: disable=unused-argument
+    return load_topic_model(path)
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST_FILE_NAME)) as file:
+        manifest = json.load(file)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        message = ('Topic model in {} has format version {}, expected {}'.
+                   format(path, manifest.get('format_version'), FORMAT_VERSION))
+        raise RuntimeError(message)
+    return manifest
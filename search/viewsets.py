@@ -1,28 +1,74 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from django.conf import settings
 from django.utils.decorators import method_decorator
 from search import models, serializers, documentation
+from search.compute_similarities import tokenize_text
+from search.topic_model import get_current_topic_model
+from common.view import CachedResponseMixin, SerializerTimingMixin
 
 
-class TopicViewSet(viewsets.ReadOnlyModelViewSet):
+class TopicViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     queryset = models.Task.objects.all()
     serializer_class = serializers.TopicSerializer
 
 
 @method_decorator(name='list', decorator=documentation.get_related_topics_schema())
-class RelatedTopicsViewSet(viewsets.ReadOnlyModelViewSet):
+class RelatedTopicsViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         topic_id = self.kwargs['topic_id']
-        return models.TaskSimilarityScore.objects.filter(first_task=topic_id).order_by('-similarity_score')
+        return (models.TaskSimilarityScore.objects.
+                filter(first_task=topic_id).
+                select_related('second_task').
+                prefetch_related('second_task__translations').
+                order_by('-similarity_score'))
 
     serializer_class = serializers.RelatedTaskSerializer
 
 
 @method_decorator(name='list', decorator=documentation.get_related_services_schema())
-class RelatedServicesViewSet(viewsets.ReadOnlyModelViewSet):
+class RelatedServicesViewSet(CachedResponseMixin, SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         topic_id = self.kwargs['topic_id']
-        return models.TaskServiceSimilarityScore.objects.filter(task=topic_id).order_by('-similarity_score')
+        return (models.TaskServiceSimilarityScore.objects.
+                filter(task=topic_id).
+                select_related('service').
+                prefetch_related('service__translations').
+                order_by('-similarity_score'))
 
     serializer_class = serializers.RelatedServiceSerializer
+
+
+@method_decorator(name='list', decorator=documentation.get_topics_for_text_schema())
+class TopicsForTextViewSet(viewsets.ViewSet):
+
+    def list(self, request):
+        text = request.query_params.get('text', '')
+        if not text.strip():
+            raise ParseError('text is required')
+        if len(text) > serializers.MAX_TOPICS_FOR_TEXT_LENGTH:
+            raise ParseError('text must be at most {} characters'.format(serializers.MAX_TOPICS_FOR_TEXT_LENGTH))
+        count = self.parse_count(request.query_params.get('count'))
+
+        try:
+            topic_model = get_current_topic_model(settings.TOPIC_MODEL_PATH)
+        except (OSError, RuntimeError):
+            return Response('Topic model not available', status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        related_topics = topic_model.find_related_topics(tokenize_text(text), count)
+        records = [{'task_id': topic_id, 'similarity_score': score} for topic_id, score in related_topics]
+        return Response(serializers.TopicForTextSerializer(records, many=True).data)
+
+    def parse_count(self, count):
+        if count is None:
+            return serializers.DEFAULT_TOPICS_FOR_TEXT_COUNT
+        try:
+            count = int(count)
+        except ValueError as error:
+            raise ParseError('count must be an integer') from error
+        if count < 1 or count > serializers.MAX_TOPICS_FOR_TEXT_COUNT:
+            raise ParseError('count must be between 1 and {}'.format(serializers.MAX_TOPICS_FOR_TEXT_COUNT))
+        return count
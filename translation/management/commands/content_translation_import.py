@@ -7,6 +7,7 @@ import sys
 from translation.exceptions import ProtectedTranslationError
 from translation.import_progress import ImportProgress
 from translation.translatable_string import TranslatableString
+from common.response_cache import bump_data_version
 
 class Command(BaseCommand):
     help = _('Import a PO file with new content translations')
@@ -22,6 +23,7 @@ class Command(BaseCommand):
         in_file = options['file']
 
         self._import_po_file(in_file)
+        bump_data_version()
 
     def _import_po_file(self, in_file):
         po_file = polib.pofile(in_file.read())